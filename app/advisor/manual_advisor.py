@@ -1,6 +1,10 @@
 from __future__ import annotations
 
+import pandas as pd
+
+from app.core.bar_clock import closed_candles
 from app.data.market_data import MarketDataService
+from app.indicators.cache import FrameCache
 from app.indicators.engine import IndicatorEngine
 from app.models import TradeIdea
 from app.risk.risk_engine import RiskEngine
@@ -8,14 +12,25 @@ from app.strategy.market_structure import detect_structure
 
 
 class TradeAdvisor:
-    def __init__(self) -> None:
-        self.market_data = MarketDataService()
+    def __init__(self, market_data: MarketDataService | None = None, frame_cache: FrameCache | None = None) -> None:
+        self.market_data = market_data or MarketDataService()
+        self.frame_cache = frame_cache or FrameCache()
         self.indicators = IndicatorEngine()
         self.risk = RiskEngine()
 
     def advise(self, symbol: str, direction: str, entry: float, timeframe: str = "15") -> TradeIdea:
         candles = self.market_data.fetch_candles(symbol=symbol, interval=timeframe, limit=300)
-        frame = self.indicators.calculate(candles)
+        return self._build_idea(symbol, direction, entry, timeframe, candles)
+
+    async def advise_async(self, symbol: str, direction: str, entry: float, timeframe: str = "15") -> TradeIdea:
+        candles = await self.market_data.fetch_candles_async(symbol=symbol, interval=timeframe, limit=300)
+        return self._build_idea(symbol, direction, entry, timeframe, candles)
+
+    def _build_idea(self, symbol: str, direction: str, entry: float, timeframe: str, candles: pd.DataFrame) -> TradeIdea:
+        closed = closed_candles(candles, timeframe)
+        frame = self.frame_cache.get_or_compute(
+            symbol, timeframe, closed, "advisor", lambda: self.indicators.calculate(closed, features="advisor")
+        )
         last = frame.iloc[-1]
         structure = detect_structure(frame)
 
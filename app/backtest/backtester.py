@@ -1,23 +1,249 @@
 from __future__ import annotations
 
+import heapq
+from dataclasses import dataclass, field
+
+import numpy as np
 import pandas as pd
 
+from app.config import settings
+from app.data.series_store import SeriesStore
+from app.execution.fill_simulator import FillSimulator
 from app.indicators.engine import IndicatorEngine
+from app.models import TradeRecord
 from app.strategy.signal_engine import SignalEngine
 
 
+@dataclass(slots=True)
+class _OpenTrade:
+    direction: str
+    signal_entry: float
+    entry: float
+    stop_loss: float
+    targets: tuple[float, float, float]
+    size: float
+    remaining: float
+    opened_at: pd.Timestamp
+    gross: float = 0.0
+    fees: float = 0.0
+    exit_value: float = 0.0
+    slippage: float = 0.0
+    events: list[str] = field(default_factory=list)
+
+
 class Backtester:
-    def __init__(self) -> None:
+    """Event-driven backtest over a single pass of the bars.
+
+    Signals open a position at the bar close; exits are resolved intrabar from high/low on the
+    following bars. Each position scales out in thirds at TP1/TP2/TP3, and when one bar touches
+    both the stop and a target the stop is assumed to fill first. Market fills (entries, stops)
+    pay the fixed ``slippage_bps`` unless a ``FillSimulator`` with a depth profile is given.
+    """
+
+    def __init__(
+        self,
+        signal_engine: SignalEngine | None = None,
+        initial_equity: float = 100.0,
+        warmup: int = 220,
+        fee_bps: float | None = None,
+        slippage_bps: float | None = None,
+        max_open_positions: int | None = None,
+        risk_per_trade_pct: float | None = None,
+        fill_simulator: FillSimulator | None = None,
+    ) -> None:
         self.indicators = IndicatorEngine()
-        self.engine = SignalEngine()
+        self.engine = signal_engine or SignalEngine()
+        self.initial_equity = initial_equity
+        self.warmup = warmup
+        self.fee = (settings.backtest_fee_bps if fee_bps is None else fee_bps) / 10_000
+        self.slippage = (settings.backtest_slippage_bps if slippage_bps is None else slippage_bps) / 10_000
+        self.max_open_positions = settings.max_open_positions if max_open_positions is None else max_open_positions
+        self.risk_per_trade_pct = settings.risk_per_trade_pct if risk_per_trade_pct is None else risk_per_trade_pct
+        if fill_simulator is not None and fill_simulator.profile is None:
+            raise ValueError("Backtester fill_simulator needs a depth profile (call set_profile with an order book first)")
+        self.fill_simulator = fill_simulator
 
     def run(self, symbol: str, candles: pd.DataFrame) -> dict:
-        df = self.indicators.calculate(candles)
-        trades, equity = 0, 100.0
-        for i in range(220, len(df)):
-            window = df.iloc[: i + 1]
-            sig = self.engine.evaluate(symbol, window)
-            if sig:
-                trades += 1
-                equity += 0.8  # placeholder deterministic assumption
-        return {"symbol": symbol, "trades": trades, "ending_equity": round(equity, 2)}
+        df = self.indicators.calculate(candles, features="signal")
+        return self.simulate(symbol, df, self.engine.evaluate_all(df))
+
+    def run_stored(
+        self,
+        symbol: str,
+        interval: str,
+        start: str | pd.Timestamp | None = None,
+        end: str | pd.Timestamp | None = None,
+        store: SeriesStore | None = None,
+    ) -> dict:
+        """Backtest archived candles of ``symbol``/``interval`` between ``start`` and ``end``."""
+        candles = (store or SeriesStore()).read(symbol, interval, start, end, columns=["open", "high", "low", "close", "volume"])
+        if candles.empty:
+            raise ValueError(f"No stored candles for {symbol} {interval} in the requested range")
+        return self.run(symbol, candles)
+
+    def simulate(self, symbol: str, df: pd.DataFrame, signals: pd.DataFrame) -> dict:
+        """Replay ``signals`` (output of ``SignalEngine.evaluate_all`` for ``df``) as trades.
+
+        Only signal bars are visited: each opened trade is resolved ahead with a vectorized scan for
+        its exit bar, and closes are applied in (exit bar, open order) before the next signal.
+        """
+        timestamps = df["timestamp"]
+        bars = {col: df[col].to_numpy(dtype=float) for col in ("open", "high", "low", "close")}
+        active = signals["signal"].to_numpy(dtype=bool).copy()
+        active[: self.warmup] = False
+        rows = np.flatnonzero(active)
+        directions = signals["direction"].to_numpy()[rows].tolist()
+        levels = signals[["entry", "stop_loss", "tp1", "tp2", "tp3"]].to_numpy(dtype=float)[rows].tolist()
+
+        equity = self.initial_equity
+        curve = [equity]
+        ledger: list[TradeRecord] = []
+        closing: list[tuple[int, int, _OpenTrade]] = []
+
+        def settle(trade: _OpenTrade, exit_bar: int) -> None:
+            nonlocal equity
+            record = self._record(symbol, trade, timestamps.iloc[min(exit_bar, len(timestamps) - 1)])
+            equity += record.pnl
+            ledger.append(record)
+            curve.append(equity)
+
+        for seq, (i, direction, (entry, stop, tp1, tp2, tp3)) in enumerate(zip(rows.tolist(), directions, levels)):
+            while closing and closing[0][0] <= i:
+                exit_bar, _, trade = heapq.heappop(closing)
+                settle(trade, exit_bar)
+            if len(closing) >= self.max_open_positions or equity <= 0:
+                continue
+            trade = self._open(direction, entry, stop, (tp1, tp2, tp3), equity, timestamps.iloc[i])
+            if trade is not None:
+                heapq.heappush(closing, (self._resolve(trade, i, bars), seq, trade))
+
+        while closing:
+            exit_bar, _, trade = heapq.heappop(closing)
+            settle(trade, exit_bar)
+
+        return self._summary(symbol, ledger, curve)
+
+    def _resolve(self, trade: _OpenTrade, opened: int, bars: dict[str, np.ndarray]) -> int:
+        """Fill ``trade`` from the bars after ``opened``; returns its exit bar (the bar count if still open at the end)."""
+        long = trade.direction == "LONG"
+        opens, highs, lows = bars["open"], bars["high"], bars["low"]
+        n = len(opens)
+        favour, against = (highs, lows) if long else (lows, highs)
+
+        def reached(values: np.ndarray, level: float, upward: bool) -> np.ndarray:
+            return values >= level if upward else values <= level
+
+        # First bar that touches the stop or the farthest target, scanning ahead in growing chunks.
+        farthest = max(trade.targets) if long else min(trade.targets)
+        start, width, stop_bar, final_bar = opened + 1, 64, n, n
+        while start < n:
+            end = min(n, start + width)
+            stop_hits = np.flatnonzero(reached(against[start:end], trade.stop_loss, not long))
+            final_hits = np.flatnonzero(reached(favour[start:end], farthest, long))
+            if len(stop_hits) or len(final_hits):
+                stop_bar = start + int(stop_hits[0]) if len(stop_hits) else n
+                final_bar = start + int(final_hits[0]) if len(final_hits) else n
+                break
+            start, width = end, width * 2
+
+        # Targets fill in order, several in the same bar when price runs through them.
+        window = favour[opened + 1 : min(stop_bar, final_bar) + 1]
+        pos = 0
+        for k, target in enumerate(trade.targets):
+            hits = np.flatnonzero(reached(window[pos:], target, long))
+            if not len(hits):
+                break
+            pos += int(hits[0])
+            bar = opened + 1 + pos
+            if bar >= stop_bar:
+                break
+            price = max(opens[bar], target) if long else min(opens[bar], target)
+            self._fill(trade, float(price), trade.size / 3 if k < 2 else trade.remaining)
+            trade.events.append(f"tp{k + 1}")
+            if k == 2:
+                return bar
+
+        if stop_bar < n:
+            # Stop orders fill at market: at the open on a gap through the stop, with slippage.
+            price = min(opens[stop_bar], trade.stop_loss) if long else max(opens[stop_bar], trade.stop_loss)
+            self._fill(trade, self._market(trade, float(price), trade.remaining, exit=True), trade.remaining)
+            trade.events.append("sl")
+            return stop_bar
+        self._fill(trade, self._market(trade, float(bars["close"][-1]), trade.remaining, exit=True), trade.remaining)
+        trade.events.append("end")
+        return n
+
+    def _open(
+        self,
+        direction: str,
+        entry: float,
+        stop: float,
+        targets: tuple[float, float, float],
+        equity: float,
+        ts: pd.Timestamp,
+    ) -> _OpenTrade | None:
+        risk_per_unit = abs(entry - stop)
+        if risk_per_unit <= 0:
+            return None
+        size = equity * self.risk_per_trade_pct / 100 / risk_per_unit
+        trade = _OpenTrade(direction, entry, entry, stop, targets, size, size, ts)
+        trade.entry = self._market(trade, entry, size, exit=False)
+        trade.fees = trade.entry * size * self.fee
+        return trade
+
+    def _market(self, trade: _OpenTrade, price: float, qty: float, exit: bool) -> float:
+        """Fill price of a market order for ``qty`` decided at ``price``; the cost is added to ``trade.slippage``."""
+        buy = (trade.direction == "LONG") != exit
+        if self.fill_simulator is not None:
+            filled = self.fill_simulator.fill("buy" if buy else "sell", qty, reference=price).price
+        else:
+            filled = price * (1 + self.slippage) if buy else price * (1 - self.slippage)
+        trade.slippage += (filled - price) * qty if buy else (price - filled) * qty
+        return filled
+
+    def _fill(self, trade: _OpenTrade, price: float, qty: float) -> None:
+        sign = 1.0 if trade.direction == "LONG" else -1.0
+        trade.gross += sign * (price - trade.entry) * qty
+        trade.fees += price * qty * self.fee
+        trade.exit_value += price * qty
+        trade.remaining -= qty
+
+    @staticmethod
+    def _record(symbol: str, trade: _OpenTrade, closed_at: pd.Timestamp) -> TradeRecord:
+        pnl = trade.gross - trade.fees
+        risk = trade.size * abs(trade.signal_entry - trade.stop_loss)
+        return TradeRecord(
+            symbol=symbol,
+            direction=trade.direction,
+            entry=trade.entry,
+            exit=trade.exit_value / trade.size,
+            size=trade.size,
+            stop_loss=trade.stop_loss,
+            opened_at=trade.opened_at,
+            closed_at=closed_at,
+            pnl=pnl,
+            fees=trade.fees,
+            r_multiple=pnl / risk if risk else 0.0,
+            exit_reason="+".join(trade.events),
+            slippage=trade.slippage,
+        )
+
+    def _summary(self, symbol: str, ledger: list[TradeRecord], curve: list[float]) -> dict:
+        equity = np.asarray(curve)
+        peak = np.maximum.accumulate(equity)
+        drawdown = float(((peak - equity) / peak).max()) * 100 if len(equity) else 0.0
+        wins = sum(1 for trade in ledger if trade.pnl > 0)
+        return {
+            "symbol": symbol,
+            "trades": len(ledger),
+            "wins": wins,
+            "losses": len(ledger) - wins,
+            "winrate": round(wins / len(ledger) * 100, 2) if ledger else 0.0,
+            "ending_equity": round(curve[-1], 2),
+            "return_pct": round((curve[-1] / self.initial_equity - 1) * 100, 2),
+            "max_drawdown_pct": round(drawdown, 2),
+            "fees": round(sum(trade.fees for trade in ledger), 4),
+            "slippage": round(sum(trade.slippage for trade in ledger), 4),
+            "ledger": ledger,
+            "equity_curve": curve,
+        }
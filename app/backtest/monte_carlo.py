@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+
+from app.config import settings
+from app.models import PerformanceSnapshot, TradeRecord
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def _percentiles(values: np.ndarray) -> dict[str, float]:
+    return {f"p{p}": float(v) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+
+
+def resample_r(r_multiples: np.ndarray, paths: int, method: str, rng: np.random.Generator) -> np.ndarray:
+    """(paths x trades) matrix of R-multiples: bootstrap draws with replacement, permutation shuffles."""
+    if method == "bootstrap":
+        return r_multiples[rng.integers(0, len(r_multiples), size=(paths, len(r_multiples)))]
+    if method == "permutation":
+        return rng.permuted(np.broadcast_to(r_multiples, (paths, len(r_multiples))), axis=1)
+    raise ValueError(f"Unknown resampling method: {method}")
+
+
+def monte_carlo(
+    trades: Sequence[TradeRecord] | Sequence[float],
+    paths: int = 10_000,
+    method: str = "bootstrap",
+    risk_per_trade_pct: float | None = None,
+    initial_equity: float = 100.0,
+    ruin_pct: float = 50.0,
+    chunk_size: int = 20_000,
+    seed: int | None = None,
+) -> dict:
+    """Resample a trade ledger (or raw R-multiples) into ``paths`` equity paths.
+
+    Each trade moves equity by ``r_multiple * risk_per_trade_pct`` percent, compounding like the
+    backtester's risk-based sizing. Paths are generated in NumPy batches of ``chunk_size``; a path is
+    ruined once equity falls ``ruin_pct`` percent below ``initial_equity``. Equity bands are taken
+    per trade step from the first batch.
+    """
+    r = np.asarray([t.r_multiple if isinstance(t, TradeRecord) else t for t in trades], dtype=float)
+    if not len(r):
+        raise ValueError("Monte Carlo needs at least one trade")
+    risk = (settings.risk_per_trade_pct if risk_per_trade_pct is None else risk_per_trade_pct) / 100
+    ruin_level = initial_equity * (1 - ruin_pct / 100)
+    rng = np.random.default_rng(seed)
+
+    ending = np.empty(paths)
+    drawdown = np.empty(paths)
+    ruined = 0
+    bands = None
+    for start in range(0, paths, chunk_size):
+        n = min(chunk_size, paths - start)
+        growth = np.maximum(1 + resample_r(r, n, method, rng) * risk, 0.0)
+        equity = initial_equity * np.cumprod(growth, axis=1)
+        peak = np.maximum(np.maximum.accumulate(equity, axis=1), initial_equity)
+        ending[start : start + n] = equity[:, -1]
+        drawdown[start : start + n] = ((peak - equity) / peak).max(axis=1) * 100
+        ruined += int((equity.min(axis=1) <= ruin_level).sum())
+        if bands is None:
+            steps = np.percentile(equity, PERCENTILES, axis=0)
+            bands = {f"p{p}": [initial_equity, *row.tolist()] for p, row in zip(PERCENTILES, steps)}
+
+    return {
+        "paths": paths,
+        "trades": len(r),
+        "method": method,
+        "risk_per_trade_pct": risk * 100,
+        "ending_equity": _percentiles(ending),
+        "max_drawdown_pct": {**_percentiles(drawdown), "mean": float(drawdown.mean())},
+        "risk_of_ruin": ruined / paths,
+        "prob_loss": float((ending < initial_equity).mean()),
+        "bands": bands,
+    }
+
+
+def performance_snapshot(trades: Sequence[TradeRecord], result: dict, snapshot: PerformanceSnapshot | None = None) -> PerformanceSnapshot:
+    """Fill a PerformanceSnapshot from a ledger and its ``monte_carlo`` result (median curve, p95 drawdown)."""
+    snapshot = snapshot or PerformanceSnapshot()
+    wins = sum(1 for trade in trades if trade.pnl > 0)
+    snapshot.total_trades = len(trades)
+    snapshot.wins = wins
+    snapshot.losses = len(trades) - wins
+    snapshot.winrate = round(wins / len(trades) * 100, 2) if trades else 0.0
+    snapshot.equity_curve = [round(value, 4) for value in result["bands"]["p50"]]
+    snapshot.drawdown_pct = round(result["max_drawdown_pct"]["p95"], 2)
+    return snapshot
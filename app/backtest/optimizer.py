@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import bisect
+import itertools
+import os
+import random
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import fields
+
+import pandas as pd
+
+from app.backtest.backtester import Backtester
+from app.indicators.engine import IndicatorEngine
+from app.risk.risk_engine import RiskParams
+from app.strategy.signal_engine import SignalEngine, SignalParams
+
+SIGNAL_FIELDS = frozenset(f.name for f in fields(SignalParams))
+RISK_FIELDS = frozenset(f.name for f in fields(RiskParams))
+METRICS = ("trades", "wins", "winrate", "expectancy", "return_pct", "max_drawdown_pct")
+
+
+def split_params(combo: Mapping[str, object]) -> tuple[SignalParams, RiskParams]:
+    unknown = set(combo) - SIGNAL_FIELDS - RISK_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown strategy parameters: {sorted(unknown)}")
+    signal = SignalParams(**{k: v for k, v in combo.items() if k in SIGNAL_FIELDS})
+    risk = RiskParams(**{k: v for k, v in combo.items() if k in RISK_FIELDS})
+    return signal, risk
+
+
+def grid_search(space: Mapping[str, Sequence]) -> Iterator[dict]:
+    names = list(space)
+    for values in itertools.product(*(space[name] for name in names)):
+        yield dict(zip(names, values))
+
+
+def random_search(space: Mapping[str, Sequence], samples: int, seed: int | None = None) -> Iterator[dict]:
+    rng = random.Random(seed)
+    for _ in range(samples):
+        yield {name: rng.choice(list(values)) for name, values in space.items()}
+
+
+def aggregate(results: Sequence[dict]) -> dict:
+    """Pooled metrics over per-symbol ``Backtester.simulate`` results."""
+    ledger = [trade for result in results for trade in result["ledger"]]
+    trades = len(ledger)
+    wins = sum(result["wins"] for result in results)
+    return {
+        "trades": trades,
+        "wins": wins,
+        "winrate": round(wins / trades * 100, 2) if trades else 0.0,
+        "expectancy": sum(trade.r_multiple for trade in ledger) / trades if trades else 0.0,
+        "return_pct": round(sum(result["return_pct"] for result in results) / len(results), 2) if results else 0.0,
+        "max_drawdown_pct": max((result["max_drawdown_pct"] for result in results), default=0.0),
+    }
+
+
+def evaluate_params(
+    frames: Mapping[str, pd.DataFrame],
+    combo: Mapping[str, object],
+    backtest_kwargs: Mapping | None = None,
+    windows: Mapping[str, tuple[int, int]] | None = None,
+) -> dict:
+    """Backtest one parameter combination on precomputed indicator frames; returns the combo plus metrics.
+
+    ``windows`` restricts each symbol to rows ``[start, end)``; signals are evaluated with a few bars
+    of lead-in so structure and liquidity lookbacks match the full-history pass.
+    """
+    signal_params, risk_params = split_params(combo)
+    engine = SignalEngine(signal_params, risk_params)
+    backtester = Backtester(signal_engine=engine, **(backtest_kwargs or {}))
+    lead_in = max(5, signal_params.liquidity_lookback)
+
+    results = []
+    for symbol, df in frames.items():
+        if windows is None:
+            results.append(backtester.simulate(symbol, df, engine.evaluate_all(df)))
+            continue
+        start, end = windows[symbol]
+        lo = max(0, start - lead_in)
+        padded = df.iloc[lo:end]
+        results.append(backtester.simulate(symbol, padded.iloc[start - lo :], engine.evaluate_all(padded).iloc[start - lo :]))
+    return {**combo, **aggregate(results)}
+
+
+# Worker-process state, set once per worker by the pool initializer so the frames are not re-sent per task.
+_FRAMES: Mapping[str, pd.DataFrame] = {}
+_BACKTEST_KWARGS: Mapping = {}
+
+
+def _init_worker(frames: Mapping[str, pd.DataFrame], backtest_kwargs: Mapping) -> None:
+    global _FRAMES, _BACKTEST_KWARGS
+    _FRAMES, _BACKTEST_KWARGS = frames, backtest_kwargs
+
+
+def _run_chunk(chunk: list[dict]) -> list[dict]:
+    return [evaluate_params(_FRAMES, combo, _BACKTEST_KWARGS) for combo in chunk]
+
+
+class ResultsTable:
+    """Sweep results kept ranked by ``objective`` as they arrive."""
+
+    def __init__(self, objective: str = "return_pct", descending: bool = True, min_trades: int = 0) -> None:
+        self.objective = objective
+        self.descending = descending
+        self.min_trades = min_trades
+        self.rows: list[dict] = []
+        self.rejected = 0
+
+    def _rank(self, row: dict) -> float:
+        value = float(row[self.objective])
+        return -value if self.descending else value
+
+    def add(self, row: dict) -> None:
+        if row["trades"] < self.min_trades:
+            self.rejected += 1
+            return
+        bisect.insort(self.rows, row, key=self._rank)
+
+    def top(self, n: int = 10) -> list[dict]:
+        return self.rows[:n]
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.rows)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+class Optimizer:
+    """Grid/random sweep of SignalParams/RiskParams fields over a process pool.
+
+    Indicators are computed once per symbol here and handed to each worker at start-up; every
+    combination then only re-runs the vectorized signal pass and the trade simulation.
+    """
+
+    def __init__(
+        self,
+        candles: Mapping[str, pd.DataFrame],
+        objective: str = "return_pct",
+        workers: int | None = None,
+        chunk_size: int = 8,
+        min_trades: int = 0,
+        backtest_kwargs: Mapping | None = None,
+    ) -> None:
+        if objective not in METRICS:
+            raise ValueError(f"Unknown objective: {objective}")
+        indicators = IndicatorEngine()
+        self.frames = {symbol: indicators.calculate(df, features="signal") for symbol, df in candles.items()}
+        self.objective = objective
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        self.min_trades = min_trades
+        self.backtest_kwargs = dict(backtest_kwargs or {})
+
+    def _chunks(self, combos: Iterable[dict]) -> Iterator[list[dict]]:
+        it = iter(combos)
+        while chunk := list(itertools.islice(it, self.chunk_size)):
+            for combo in chunk:
+                split_params(combo)  # fail fast in the parent on typos
+            yield chunk
+
+    def stream(self, combos: Iterable[dict]) -> Iterator[dict]:
+        """Yield result rows in completion order; at most ``2 * workers`` chunks are in flight."""
+        chunks = self._chunks(combos)
+        if self.workers == 1:
+            for chunk in chunks:
+                yield from (evaluate_params(self.frames, combo, self.backtest_kwargs) for combo in chunk)
+            return
+
+        with ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.frames, self.backtest_kwargs)) as pool:
+            pending: set[Future] = set()
+            for chunk in itertools.chain(chunks, [None]):
+                if chunk is not None:
+                    pending.add(pool.submit(_run_chunk, chunk))
+                    if len(pending) < 2 * self.workers:
+                        continue
+                while pending and (chunk is None or len(pending) >= 2 * self.workers):
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from future.result()
+
+    def run(self, combos: Iterable[dict], on_result: Callable[[dict, ResultsTable], None] | None = None) -> ResultsTable:
+        table = ResultsTable(self.objective, descending=self.objective != "max_drawdown_pct", min_trades=self.min_trades)
+        for row in self.stream(combos):
+            table.add(row)
+            if on_result is not None:
+                on_result(row, table)
+        return table
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import heapq
+from collections import Counter
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from app.backtest.backtester import Backtester, _OpenTrade
+from app.config import settings
+from app.models import TradeRecord
+
+END_OF_DATA = np.iinfo(np.int64).max
+
+
+@dataclass(slots=True)
+class _Book:
+    symbol: str
+    bars: dict[str, np.ndarray]
+    times: np.ndarray
+    timestamps: pd.Series
+    signals: pd.DataFrame
+
+
+class PortfolioBacktester(Backtester):
+    """Backtest a universe on one shared clock with global position and risk limits.
+
+    Each symbol contributes a time-ordered stream of its signal bars; ``heapq.merge`` interleaves
+    them so equal timestamps arrive together, strongest confidence first. Exits are resolved per
+    trade from that symbol's own bars and applied before any entry at the same or a later time.
+    """
+
+    def __init__(
+        self,
+        *args,
+        max_positions_per_symbol: int = 1,
+        max_portfolio_risk_pct: float | None = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.max_positions_per_symbol = max_positions_per_symbol
+        self.max_portfolio_risk_pct = settings.portfolio_max_risk_pct if max_portfolio_risk_pct is None else max_portfolio_risk_pct
+
+    def run_portfolio(self, candles: Mapping[str, pd.DataFrame]) -> dict:
+        frames = {symbol: self.indicators.calculate(df, features="signal") for symbol, df in candles.items()}
+        return self.simulate_portfolio(frames)
+
+    def simulate_portfolio(self, frames: Mapping[str, pd.DataFrame], signals: Mapping[str, pd.DataFrame] | None = None) -> dict:
+        books = {
+            symbol: _Book(
+                symbol=symbol,
+                bars={col: df[col].to_numpy(dtype=float) for col in ("open", "high", "low", "close")},
+                times=pd.DatetimeIndex(df["timestamp"]).as_unit("ns").asi8,
+                timestamps=df["timestamp"],
+                signals=signals[symbol] if signals is not None else self.engine.evaluate_all(df),
+            )
+            for symbol, df in frames.items()
+        }
+
+        equity = self.initial_equity
+        curve = [equity]
+        ledger: list[TradeRecord] = []
+        closing: list[tuple[int, int, str, int, _OpenTrade]] = []
+        per_symbol: Counter[str] = Counter()
+        open_risk = 0.0
+        skipped: Counter[str] = Counter()
+        max_concurrent = 0
+
+        def settle(exit_bar: int, symbol: str, trade: _OpenTrade) -> None:
+            nonlocal equity, open_risk
+            book = books[symbol]
+            record = self._record(symbol, trade, book.timestamps.iloc[min(exit_bar, len(book.times) - 1)])
+            equity += record.pnl
+            open_risk -= record.size * abs(trade.signal_entry - trade.stop_loss)
+            per_symbol[symbol] -= 1
+            ledger.append(record)
+            curve.append(equity)
+
+        events = heapq.merge(*(self._events(book) for book in books.values()))
+        for seq, (ts, _, symbol, row, direction, levels) in enumerate(events):
+            while closing and closing[0][0] <= ts:
+                _, _, name, exit_bar, trade = heapq.heappop(closing)
+                settle(exit_bar, name, trade)
+
+            if len(closing) >= self.max_open_positions:
+                skipped["max_open_positions"] += 1
+                continue
+            if per_symbol[symbol] >= self.max_positions_per_symbol:
+                skipped["max_positions_per_symbol"] += 1
+                continue
+            if equity <= 0:
+                skipped["equity"] += 1
+                continue
+            new_risk = equity * self.risk_per_trade_pct / 100
+            if (open_risk + new_risk) / equity * 100 > self.max_portfolio_risk_pct + 1e-9:
+                skipped["max_portfolio_risk_pct"] += 1
+                continue
+
+            entry, stop, tp1, tp2, tp3 = levels
+            book = books[symbol]
+            trade = self._open(direction, entry, stop, (tp1, tp2, tp3), equity, book.timestamps.iloc[row])
+            if trade is None:
+                continue
+            exit_bar = self._resolve(trade, row, book.bars)
+            exit_ts = int(book.times[exit_bar]) if exit_bar < len(book.times) else END_OF_DATA
+            heapq.heappush(closing, (exit_ts, seq, symbol, exit_bar, trade))
+            open_risk += trade.size * abs(trade.signal_entry - trade.stop_loss)
+            per_symbol[symbol] += 1
+            max_concurrent = max(max_concurrent, len(closing))
+
+        while closing:
+            _, _, name, exit_bar, trade = heapq.heappop(closing)
+            settle(exit_bar, name, trade)
+
+        result = self._summary("PORTFOLIO", ledger, curve)
+        result["symbols"] = {
+            symbol: {
+                "trades": sum(1 for trade in ledger if trade.symbol == symbol),
+                "pnl": round(sum(trade.pnl for trade in ledger if trade.symbol == symbol), 4),
+            }
+            for symbol in books
+        }
+        result["skipped"] = dict(skipped)
+        result["max_concurrent"] = max_concurrent
+        return result
+
+    def _events(self, book: _Book) -> Iterator[tuple[int, float, str, int, str, list[float]]]:
+        """Time-ordered signal bars of one symbol as (ts, -confidence, symbol, row, direction, levels)."""
+        active = book.signals["signal"].to_numpy(dtype=bool).copy()
+        active[: self.warmup] = False
+        rows = np.flatnonzero(active)
+        confidence = book.signals["confidence"].to_numpy(dtype=float)
+        directions = book.signals["direction"].to_numpy()
+        levels = book.signals[["entry", "stop_loss", "tp1", "tp2", "tp3"]].to_numpy(dtype=float)
+        for row in rows.tolist():
+            yield int(book.times[row]), -float(confidence[row]), book.symbol, row, directions[row], levels[row].tolist()
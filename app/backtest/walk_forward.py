@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import os
+from collections.abc import Iterable, Mapping
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from app.backtest.optimizer import METRICS, ResultsTable, evaluate_params, split_params
+from app.indicators.engine import IndicatorEngine
+
+Window = dict[str, tuple[int, int]]
+
+# Worker-process state, set once per worker by the pool initializer.
+_FRAMES: Mapping[str, pd.DataFrame] = {}
+_BACKTEST_KWARGS: Mapping = {}
+
+
+def _init_worker(frames: Mapping[str, pd.DataFrame], backtest_kwargs: Mapping) -> None:
+    global _FRAMES, _BACKTEST_KWARGS
+    _FRAMES, _BACKTEST_KWARGS = frames, backtest_kwargs
+
+
+def _bar_times(df: pd.DataFrame) -> np.ndarray:
+    return pd.DatetimeIndex(df["timestamp"]).as_unit("ns").asi8
+
+
+def run_fold(
+    frames: Mapping[str, pd.DataFrame],
+    combos: list[dict],
+    train: Window,
+    test: Window,
+    objective: str,
+    min_trades: int,
+    backtest_kwargs: Mapping,
+) -> dict:
+    """Pick the best combo on ``train`` and score it on ``test`` (both row windows per symbol)."""
+    table = ResultsTable(objective, descending=objective != "max_drawdown_pct", min_trades=min_trades)
+    for combo in combos:
+        table.add(evaluate_params(frames, combo, backtest_kwargs, train))
+    if not table.rows:
+        return {"params": None, "train": None, "test": None}
+    best = table.rows[0]
+    params = {name: best[name] for name in best if name not in METRICS}
+    test_row = evaluate_params(frames, params, backtest_kwargs, test)
+    return {
+        "params": params,
+        "train": {name: best[name] for name in METRICS},
+        "test": {name: test_row[name] for name in METRICS},
+    }
+
+
+def _run_fold_task(fold: dict, combos: list[dict], objective: str, min_trades: int) -> dict:
+    return {**fold, **run_fold(_FRAMES, combos, fold["train_rows"], fold["test_rows"], objective, min_trades, _BACKTEST_KWARGS)}
+
+
+class WalkForward:
+    """Rolling train/test evaluation: optimize on each train window, score on the window after it.
+
+    Indicators are computed once on the full history and every fold works on row slices of those
+    frames, so overlapping windows share the same computation. Folds run in a process pool.
+    """
+
+    def __init__(
+        self,
+        candles: Mapping[str, pd.DataFrame],
+        train_bars: int,
+        test_bars: int,
+        step_bars: int | None = None,
+        objective: str = "return_pct",
+        min_trades: int = 0,
+        workers: int | None = None,
+        backtest_kwargs: Mapping | None = None,
+    ) -> None:
+        if objective not in METRICS:
+            raise ValueError(f"Unknown objective: {objective}")
+        if train_bars <= 0 or test_bars <= 0:
+            raise ValueError("train_bars and test_bars must be positive")
+        indicators = IndicatorEngine()
+        self.frames = {symbol: indicators.calculate(df, features="signal") for symbol, df in candles.items()}
+        self.train_bars = train_bars
+        self.test_bars = test_bars
+        self.step_bars = step_bars or test_bars
+        self.objective = objective
+        self.min_trades = min_trades
+        self.workers = workers or os.cpu_count() or 1
+        # Frames are already warm, so fold windows need no extra warm-up bars.
+        self.backtest_kwargs = {"warmup": 0, **(backtest_kwargs or {})}
+
+    def folds(self) -> list[dict]:
+        """Fold boundaries on the merged bar timeline, mapped to row windows per symbol."""
+        times = {symbol: _bar_times(df) for symbol, df in self.frames.items()}
+        timeline = np.unique(np.concatenate(list(times.values()))) if times else np.array([], dtype=np.int64)
+        folds = []
+        start = 0
+        while start + self.train_bars + self.test_bars <= len(timeline):
+            edges = (start, start + self.train_bars, start + self.train_bars + self.test_bars)
+            bounds = [timeline[edge] if edge < len(timeline) else np.iinfo(np.int64).max for edge in edges]
+            fold = {
+                "fold": len(folds),
+                "train_start": pd.Timestamp(timeline[edges[0]], tz="UTC"),
+                "test_start": pd.Timestamp(timeline[edges[1]], tz="UTC"),
+                "test_end": pd.Timestamp(timeline[edges[2] - 1], tz="UTC"),
+                "train_rows": {},
+                "test_rows": {},
+            }
+            for symbol, ts in times.items():
+                lo, mid, hi = np.searchsorted(ts, bounds).tolist()
+                fold["train_rows"][symbol] = (lo, mid)
+                fold["test_rows"][symbol] = (mid, hi)
+            folds.append(fold)
+            start += self.step_bars
+        return folds
+
+    def run(self, combos: Iterable[dict]) -> dict:
+        combos = list(combos)
+        for combo in combos:
+            split_params(combo)
+        folds = self.folds()
+
+        if self.workers == 1 or len(folds) <= 1:
+            results = [
+                {**fold, **run_fold(self.frames, combos, fold["train_rows"], fold["test_rows"], self.objective, self.min_trades, self.backtest_kwargs)}
+                for fold in folds
+            ]
+        else:
+            with ProcessPoolExecutor(
+                min(self.workers, len(folds)), initializer=_init_worker, initargs=(self.frames, self.backtest_kwargs)
+            ) as pool:
+                futures = [pool.submit(_run_fold_task, fold, combos, self.objective, self.min_trades) for fold in folds]
+                results = sorted((future.result() for future in as_completed(futures)), key=lambda row: row["fold"])
+
+        for row in results:
+            row.pop("train_rows")
+            row.pop("test_rows")
+        return {"folds": results, "aggregate": self._aggregate(results)}
+
+    @staticmethod
+    def _aggregate(folds: list[dict]) -> dict:
+        tested = [fold["test"] for fold in folds if fold["test"] is not None]
+        trades = sum(test["trades"] for test in tested)
+        wins = sum(test["wins"] for test in tested)
+        compounded = float(np.prod([1 + test["return_pct"] / 100 for test in tested])) if tested else 1.0
+        return {
+            "folds": len(folds),
+            "tested_folds": len(tested),
+            "profitable_folds": sum(1 for test in tested if test["return_pct"] > 0),
+            "trades": trades,
+            "winrate": round(wins / trades * 100, 2) if trades else 0.0,
+            "expectancy": sum(test["expectancy"] * test["trades"] for test in tested) / trades if trades else 0.0,
+            "return_pct": round((compounded - 1) * 100, 2),
+            "max_drawdown_pct": max((test["max_drawdown_pct"] for test in tested), default=0.0),
+        }
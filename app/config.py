@@ -11,14 +11,48 @@ class Settings(BaseSettings):
     bybit_api_key: str = ""
     bybit_api_secret: str = ""
     bybit_testnet: bool = True
+    bybit_http_timeout_sec: float = 10.0
+    bybit_http_retries: int = 3
+    bybit_http_pool_size: int = 20
     telegram_token: str = ""
     telegram_chat_id: str = ""
     telegram_admin_user_id: str = ""
     confidence_threshold: float = 90.0
     risk_per_trade_pct: float = 0.5
     max_open_positions: int = 3
+    portfolio_max_risk_pct: float = 2.0
+    backtest_fee_bps: float = 5.5
+    backtest_slippage_bps: float = 2.0
+    fill_latency_ms: float = 150.0
+    fill_latency_jitter_ms: float = 50.0
+    fill_volatility_bps_per_sec: float = 2.0
     scan_interval_sec: int = 20
+    scan_concurrency: int = 8
+    scan_symbol_timeout_sec: float = 30.0
+    bar_close_grace_sec: float = 2.0
     history_db_path: str = "data/trading_history.db"
+    history_batch_size: int = 100
+    history_flush_interval_sec: float = 0.5
+    history_queue_max: int = 10000
+    history_retry_backoff_sec: float = 0.25
+    history_retry_backoff_max_sec: float = 5.0
+    outcome_expiry_hours: float = 72.0
+    paper_state_path: str = "data/paper_positions.json"
+    paper_initial_equity: float = 100.0
+    liquidity_tolerance_bps: float = 0.0
+    liquidity_tick_size: float = 0.0
+    frame_cache_max_entries: int = 256
+    frame_cache_max_mb: float = 64.0
+    candle_cache_dir: str = "data/candles"
+    candle_cache_max_bars: int = 1000
+    series_store_enabled: bool = True
+    series_store_dir: str = "data/series"
+    series_indicator_columns: str = "ema_21,ema_200,rsi,adx,atr,macd_hist,bb_width,vwap"
+    backfill_requests_per_sec: float = 8.0
+    backfill_concurrency: int = 4
+    backfill_page_size: int = 1000
+    backfill_flush_rows: int = 50000
+    backfill_checkpoint_path: str = "data/backfill_state.json"
     dashboard_poll_sec: int = 8
 
 
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from app.data.candle_store import INTERVAL_MS
+
+# Bybit weekly bars open on Monday 00:00 UTC; the epoch is a Thursday.
+WEEK_OFFSET_MS = 4 * 86_400_000
+
+
+def _offset_ms(interval: str) -> int:
+    return WEEK_OFFSET_MS if interval == "W" else 0
+
+
+def current_bar_open(interval: str, now: datetime | None = None) -> pd.Timestamp | None:
+    step = INTERVAL_MS.get(interval)
+    if step is None:
+        return None
+    now = now or datetime.now(timezone.utc)
+    offset = _offset_ms(interval)
+    now_ms = int(now.timestamp() * 1000)
+    return pd.Timestamp((now_ms - offset) // step * step + offset, unit="ms", tz="UTC")
+
+
+def last_closed_bar_open(interval: str, now: datetime | None = None) -> pd.Timestamp | None:
+    opened = current_bar_open(interval, now)
+    if opened is None:
+        return None
+    return opened - pd.Timedelta(milliseconds=INTERVAL_MS[interval])
+
+
+def seconds_to_next_close(interval: str, now: datetime | None = None) -> float | None:
+    now = now or datetime.now(timezone.utc)
+    opened = current_bar_open(interval, now)
+    if opened is None:
+        return None
+    closes_at = opened + pd.Timedelta(milliseconds=INTERVAL_MS[interval])
+    return max((closes_at - pd.Timestamp(now)).total_seconds(), 0.0)
+
+
+def closed_candles(candles: pd.DataFrame, interval: str, now: datetime | None = None) -> pd.DataFrame:
+    """Drop the still-forming bar(s); unknown intervals are returned unchanged."""
+    step = INTERVAL_MS.get(interval)
+    if step is None or candles.empty:
+        return candles
+    now = pd.Timestamp(now or datetime.now(timezone.utc))
+    done = candles["timestamp"] + pd.Timedelta(milliseconds=step) <= now
+    if done.all():
+        return candles
+    return candles[done].reset_index(drop=True)
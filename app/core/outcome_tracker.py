@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from app.config import settings
+from app.data.candle_store import INTERVAL_MS
+from app.models import Signal
+from app.storage.history_store import HistoryStore
+
+TRIM_BARS = 4096
+
+
+@dataclass(slots=True)
+class _Tracked:
+    symbol: str
+    created_at: str  # history key together with symbol
+    direction: str
+    entry: float
+    stop_loss: float
+    targets: tuple[float, float, float]
+    since: int  # ns; the first candle at or after this open time is the first one checked
+    expires: int  # ns
+    start: int = -1  # bar index of that first candle once activated
+    tp_hits: int = 0
+
+
+@dataclass(slots=True)
+class _SymbolBook:
+    """Unresolved signals of one symbol, keyed so the next level a candle can cross is on top."""
+
+    pending: list[tuple[int, int]] = field(default_factory=list)  # (since, key)
+    expiries: list[tuple[int, int]] = field(default_factory=list)  # (expires, key)
+    long_stops: list[tuple[float, int]] = field(default_factory=list)  # -stop
+    long_targets: list[tuple[float, int, int]] = field(default_factory=list)  # target
+    short_stops: list[tuple[float, int]] = field(default_factory=list)  # stop
+    short_targets: list[tuple[float, int, int]] = field(default_factory=list)  # -target
+    live: dict[int, _Tracked] = field(default_factory=dict)
+    highs: list[float] = field(default_factory=list)
+    lows: list[float] = field(default_factory=list)
+    offset: int = 0  # bar index of highs[0]
+    last_ts: int | None = None
+
+
+class OutcomeTracker:
+    """Resolve stored signals against closed candles: stop, TP1-TP3 or expiry, with MAE/MFE in R.
+
+    A candle only pops the heap entries whose stop/target levels its high/low crossed (the stop
+    first when a candle spans both, as in the backtester), so the work per candle does not depend
+    on history size. Highs/lows are kept from the oldest unresolved signal on, and MAE/MFE are
+    taken over a signal's bars once, when it resolves. The outcome is the highest target reached
+    (``tp1``..``tp3``), ``sl`` when stopped before TP1, or ``expired``; ``r_multiple`` assumes the
+    backtester's exits in thirds with the stop left in place and expiry at the last close.
+    """
+
+    def __init__(self, history: HistoryStore, timeframe: str | None = None, expiry_hours: float | None = None) -> None:
+        self.history = history
+        self.timeframe = timeframe or settings.default_timeframe
+        self.step_ns = INTERVAL_MS[self.timeframe] * 1_000_000
+        self.expiry = timedelta(hours=settings.outcome_expiry_hours if expiry_hours is None else expiry_hours)
+        self._books: dict[str, _SymbolBook] = {}
+        self._keys = itertools.count()
+        self.resolved = 0
+
+    def load(self) -> int:
+        """Track the unresolved signals still inside the expiry window (e.g. after a restart)."""
+        rows = self.history.open_signals(datetime.utcnow() - self.expiry)
+        for row in rows:
+            self._add(
+                row["symbol"],
+                row["created_at"],
+                row["direction"],
+                row["entry"],
+                row["stop_loss"],
+                (row["tp1"], row["tp2"], row["tp3"]),
+                datetime.fromisoformat(row["created_at"]),
+            )
+        return len(rows)
+
+    def track(self, signal: Signal) -> None:
+        self._add(
+            signal.symbol,
+            signal.created_at.isoformat(),
+            signal.direction,
+            signal.entry,
+            signal.stop_loss,
+            (signal.tp1, signal.tp2, signal.tp3),
+            signal.created_at,
+        )
+
+    def _add(
+        self,
+        symbol: str,
+        key_created_at: str,
+        direction: str,
+        entry: float,
+        stop_loss: float,
+        targets: tuple[float, float, float],
+        created_at: datetime,
+    ) -> None:
+        created = pd.Timestamp(created_at)
+        created = created.tz_localize("UTC") if created.tzinfo is None else created.tz_convert("UTC")
+        # The candle that was forming when the signal was created is the first one it can resolve on.
+        since = created.value // self.step_ns * self.step_ns
+        tracked = _Tracked(
+            symbol=symbol,
+            created_at=key_created_at,
+            direction=direction,
+            entry=entry,
+            stop_loss=stop_loss,
+            targets=targets,
+            since=since,
+            expires=int((created + self.expiry).value),
+        )
+        key = next(self._keys)
+        book = self._books.setdefault(symbol, _SymbolBook())
+        book.live[key] = tracked
+        heapq.heappush(book.pending, (since, key))
+        heapq.heappush(book.expiries, (tracked.expires, key))
+
+    async def update(self, symbol: str, candles: pd.DataFrame) -> list[dict]:
+        """Feed closed ``candles`` (only bars newer than the last one seen are used) and store resolutions."""
+        outcomes = self.on_candles(symbol, candles)
+        if outcomes:
+            await asyncio.to_thread(self.history.save_outcomes, outcomes)
+        return outcomes
+
+    def on_candles(self, symbol: str, candles: pd.DataFrame) -> list[dict]:
+        book = self._books.get(symbol)
+        if book is None or not book.live or candles.empty:
+            return []
+        times = pd.DatetimeIndex(candles["timestamp"]).as_unit("ns").asi8
+        if book.last_ts is not None:
+            first = book.last_ts + 1
+        else:
+            first = book.pending[0][0]  # nothing active yet: replay from the oldest signal's candle
+        outcomes: list[dict] = []
+        rows = candles[["high", "low", "close"]].to_numpy(dtype=float)
+        for i in range(int(times.searchsorted(first)), len(times)):
+            high, low, close = rows[i]
+            outcomes.extend(self.on_candle(symbol, int(times[i]), high, low, close))
+        return outcomes
+
+    def on_candle(self, symbol: str, ts: int, high: float, low: float, close: float) -> list[dict]:
+        """Apply one closed candle (open time ``ts`` in ns) and return the signals it resolved."""
+        book = self._books.get(symbol)
+        if book is None:
+            return []
+        book.highs.append(high)
+        book.lows.append(low)
+        bar = book.offset + len(book.highs) - 1
+        book.last_ts = ts
+
+        while book.pending and book.pending[0][0] <= ts:
+            _, key = heapq.heappop(book.pending)
+            tracked = book.live.get(key)
+            if tracked is None:
+                continue
+            tracked.start = bar
+            if tracked.direction == "LONG":
+                heapq.heappush(book.long_stops, (-tracked.stop_loss, key))
+            else:
+                heapq.heappush(book.short_stops, (tracked.stop_loss, key))
+            self._push_target(book, key, tracked)
+
+        outcomes: list[dict] = []
+        while book.long_stops and -book.long_stops[0][0] >= low:
+            self._resolve(book, heapq.heappop(book.long_stops)[1], "stop", ts, bar, close, outcomes)
+        while book.short_stops and book.short_stops[0][0] <= high:
+            self._resolve(book, heapq.heappop(book.short_stops)[1], "stop", ts, bar, close, outcomes)
+        while book.long_targets and book.long_targets[0][0] <= high:
+            _, key, hits = heapq.heappop(book.long_targets)
+            self._take_profit(book, key, hits, ts, bar, close, outcomes)
+        while book.short_targets and -book.short_targets[0][0] >= low:
+            _, key, hits = heapq.heappop(book.short_targets)
+            self._take_profit(book, key, hits, ts, bar, close, outcomes)
+        while book.expiries and book.expiries[0][0] <= ts:
+            key = heapq.heappop(book.expiries)[1]
+            if key in book.live and book.live[key].start < 0:
+                del book.live[key]  # expired before any candle covered it; left unresolved
+            elif key in book.live:
+                self._resolve(book, key, "expired", ts, bar, close, outcomes)
+
+        if not book.live or len(book.highs) > TRIM_BARS:
+            self._trim(book)
+        return outcomes
+
+    @staticmethod
+    def _push_target(book: _SymbolBook, key: int, tracked: _Tracked) -> None:
+        target = tracked.targets[tracked.tp_hits]
+        if tracked.direction == "LONG":
+            heapq.heappush(book.long_targets, (target, key, tracked.tp_hits))
+        else:
+            heapq.heappush(book.short_targets, (-target, key, tracked.tp_hits))
+
+    def _take_profit(self, book: _SymbolBook, key: int, hits: int, ts: int, bar: int, close: float, outcomes: list[dict]) -> None:
+        tracked = book.live.get(key)
+        if tracked is None or tracked.tp_hits != hits:
+            return
+        tracked.tp_hits += 1
+        if tracked.tp_hits == 3:
+            self._resolve(book, key, "tp3", ts, bar, close, outcomes)
+        else:
+            self._push_target(book, key, tracked)
+
+    def _resolve(self, book: _SymbolBook, key: int, reason: str, ts: int, bar: int, close: float, outcomes: list[dict]) -> None:
+        tracked = book.live.pop(key, None)
+        if tracked is None:
+            return
+        hits = tracked.tp_hits
+        sign = 1.0 if tracked.direction == "LONG" else -1.0
+        risk = abs(tracked.entry - tracked.stop_loss) or float("nan")
+        window = slice(tracked.start - book.offset, bar - book.offset + 1)
+        high, low = max(book.highs[window]), min(book.lows[window])
+        favourable, adverse = (high - tracked.entry, tracked.entry - low) if sign > 0 else (tracked.entry - low, high - tracked.entry)
+
+        exit_price = tracked.stop_loss if reason == "stop" else close
+        taken = sum(sign * (target - tracked.entry) / risk for target in tracked.targets[:hits])
+        r_multiple = (taken + (3 - hits) * sign * (exit_price - tracked.entry) / risk) / 3
+
+        closed_at = ts + self.step_ns
+        created = pd.Timestamp(tracked.created_at)
+        created = created.tz_localize("UTC") if created.tzinfo is None else created
+        self.resolved += 1
+        outcomes.append(
+            {
+                "symbol": tracked.symbol,
+                "created_at": tracked.created_at,
+                "direction": tracked.direction,
+                "outcome": f"tp{hits}" if hits else ("sl" if reason == "stop" else "expired"),
+                "tp_hits": hits,
+                "r_multiple": round(r_multiple, 4),
+                "mae_r": round(max(adverse, 0.0) / risk, 4),
+                "mfe_r": round(max(favourable, 0.0) / risk, 4),
+                "time_to_outcome_sec": (closed_at - created.value) / 1e9,
+                "resolved_at": pd.Timestamp(closed_at, unit="ns", tz="UTC").isoformat(),
+            }
+        )
+
+    @staticmethod
+    def _trim(book: _SymbolBook) -> None:
+        """Drop bars older than every active signal and heap entries of resolved ones."""
+        for name in ("pending", "expiries", "long_stops", "long_targets", "short_stops", "short_targets"):
+            entries = [entry for entry in getattr(book, name) if entry[1] in book.live]
+            heapq.heapify(entries)
+            setattr(book, name, entries)
+        starts = [tracked.start for tracked in book.live.values() if tracked.start >= 0]
+        keep_from = min(starts, default=book.offset + len(book.highs)) - book.offset
+        if keep_from > 0:
+            del book.highs[:keep_from]
+            del book.lows[:keep_from]
+            book.offset += keep_from
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "tracked_signals": float(sum(len(book.live) for book in self._books.values())),
+            "resolved_signals": float(self.resolved),
+        }
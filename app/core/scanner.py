@@ -1,70 +1,187 @@
 from __future__ import annotations
 
 import asyncio
+import threading
 from dataclasses import asdict
 
+import pandas as pd
+
 from app.config import settings
+from app.core.bar_clock import closed_candles, last_closed_bar_open, seconds_to_next_close
+from app.core.outcome_tracker import OutcomeTracker
 from app.data.market_data import MarketDataService
-from app.indicators.engine import IndicatorEngine
+from app.execution.paper import PaperExecutionEngine
+from app.indicators.cache import FrameCache
+from app.indicators.streaming import StreamingIndicatorHub
+from app.models import Signal
 from app.storage.history_store import HistoryStore
+from app.storage.write_queue import HistoryWriter
 from app.strategy.signal_engine import SignalEngine
 from app.telegram.bot import TelegramNotifier
 
 
 class ScannerService:
-    def __init__(self, notifier: TelegramNotifier, history: HistoryStore) -> None:
-        self.market = MarketDataService()
-        self.indicators = IndicatorEngine()
+    def __init__(
+        self,
+        notifier: TelegramNotifier,
+        history: HistoryStore,
+        market: MarketDataService | None = None,
+        frame_cache: FrameCache | None = None,
+        paper: PaperExecutionEngine | None = None,
+        writer: HistoryWriter | None = None,
+        outcomes: OutcomeTracker | None = None,
+    ) -> None:
+        self.market = market or MarketDataService()
+        self.frame_cache = frame_cache
+        self.paper = paper
+        self.indicators = StreamingIndicatorHub()
         self.signal_engine = SignalEngine()
         self.notifier = notifier
         self.history = history
+        self.writer = writer
+        self.outcomes = outcomes
         self.running = False
         self.latest: dict[str, dict] = {}
+        self._processed_bar: dict[tuple[str, str], pd.Timestamp | None] = {}
+        # Taken and released by the worker thread around the analysis: ``wait_for`` cannot stop a
+        # running thread, so the symbol is skipped until a timed-out analysis has finished. A job
+        # cancelled while still queued in the executor never takes the lock.
+        self._analysis_locks: dict[tuple[str, str], threading.Lock] = {}
 
     async def run_forever(self) -> None:
         self.running = True
         symbols = [s.strip() for s in settings.default_symbols.split(",") if s.strip()]
+        semaphore = asyncio.Semaphore(max(settings.scan_concurrency, 1))
         while self.running:
+            await asyncio.gather(*(self._scan_guarded(symbol, semaphore) for symbol in symbols))
+            await asyncio.sleep(self._sleep_seconds())
+
+    @staticmethod
+    def _sleep_seconds() -> float:
+        to_close = seconds_to_next_close(settings.default_timeframe)
+        if to_close is None:
+            return float(settings.scan_interval_sec)
+        return max(min(float(settings.scan_interval_sec), to_close + settings.bar_close_grace_sec), 1.0)
+
+    async def _scan_guarded(self, symbol: str, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
             try:
-                for symbol in symbols:
-                    candles = self.market.fetch_candles(symbol, settings.default_timeframe, 300)
-                    frame = self.indicators.calculate(candles)
-                    last = frame.iloc[-1]
-                    orderbook = self.market.fetch_orderbook(symbol)
-                    liquidity = {
-                        "swing_high": float(frame["high"].tail(50).max()),
-                        "swing_low": float(frame["low"].tail(50).min()),
-                        "fvg_up": bool(last["fvg_up"] > 0),
-                        "fvg_down": bool(last["fvg_down"] > 0),
-                    }
-                    signal = self.signal_engine.evaluate(symbol, frame)
-
-                    self.latest[symbol] = {
-                        "symbol": symbol,
-                        "timeframe": settings.default_timeframe,
-                        "timestamp": last["timestamp"].isoformat(),
-                        "price": float(last["close"]),
-                        "bias": "bullish" if last["ema_21"] > last["ema_200"] else "bearish",
-                        "orderbook": orderbook,
-                        "liquidity": liquidity,
-                        "indicators": {
-                            "rsi": float(last["rsi"]),
-                            "adx": float(last["adx"]),
-                            "atr": float(last["atr"]),
-                            "macd_hist": float(last["macd_hist"]),
-                            "bb_width": float(last["bb_width"]),
-                            "vwap": float(last["vwap"]),
-                        },
-                        "candles": candles.tail(200).to_dict(orient="records"),
-                        "signal": asdict(signal) if signal else None,
-                    }
-
-                    if signal:
-                        self.history.save_signal(signal, meta={"timeframe": settings.default_timeframe, "source": "scanner"})
-                        await self.notifier.send_signal(signal)
+                await asyncio.wait_for(self.scan_symbol(symbol), timeout=settings.scan_symbol_timeout_sec)
+            except asyncio.TimeoutError:
+                await self.notifier.send_event(f"Scanner timeout: {symbol} took longer than {settings.scan_symbol_timeout_sec}s")
             except Exception as exc:
-                await self.notifier.send_event(f"Scanner error: {exc}")
-            await asyncio.sleep(settings.scan_interval_sec)
+                await self.notifier.send_event(f"Scanner error ({symbol}): {exc}")
+
+    async def scan_symbol(self, symbol: str) -> None:
+        timeframe = settings.default_timeframe
+        expected_bar = last_closed_bar_open(timeframe)
+        key = (symbol, timeframe)
+        lock = self._analysis_locks.setdefault(key, threading.Lock())
+        if lock.locked():
+            return
+        if expected_bar is not None and symbol in self.latest and self._processed_bar.get(key) == expected_bar:
+            await self._refresh_quotes(symbol)
+            return
+
+        candles, orderbook = await asyncio.gather(
+            self.market.fetch_candles_async(symbol, timeframe, 300),
+            self.market.fetch_orderbook_async(symbol),
+        )
+        closed = closed_candles(candles, timeframe)
+        if self.outcomes is not None:
+            await self.outcomes.update(symbol, closed)
+        analysis = await asyncio.to_thread(self._analyze_locked, lock, symbol, timeframe, closed)
+        if analysis is None:
+            return
+        frame, signal = analysis
+        last = frame.iloc[-1]
+        liquidity = {
+            "swing_high": float(frame["high"].tail(50).max()),
+            "swing_low": float(frame["low"].tail(50).min()),
+            "fvg_up": bool(last["fvg_up"] > 0),
+            "fvg_down": bool(last["fvg_down"] > 0),
+        }
+
+        self.latest[symbol] = {
+            "symbol": symbol,
+            "timeframe": settings.default_timeframe,
+            "timestamp": last["timestamp"].isoformat(),
+            "price": float(candles["close"].iloc[-1]),
+            "bias": "bullish" if last["ema_21"] > last["ema_200"] else "bearish",
+            "orderbook": orderbook,
+            "liquidity": liquidity,
+            "indicators": {
+                "rsi": float(last["rsi"]),
+                "adx": float(last["adx"]),
+                "atr": float(last["atr"]),
+                "macd_hist": float(last["macd_hist"]),
+                "bb_width": float(last["bb_width"]),
+                "vwap": float(last["vwap"]),
+            },
+            "candles": candles.tail(200).to_dict(orient="records"),
+            "signal": asdict(signal) if signal else None,
+        }
+        if expected_bar is None or last["timestamp"] >= expected_bar:
+            self._processed_bar[key] = expected_bar
+        await self._update_paper(symbol, self.latest[symbol]["price"], orderbook)
+
+        if signal:
+            meta = {"timeframe": settings.default_timeframe, "source": "scanner"}
+            if self.writer is not None:
+                await self.writer.submit(signal, meta)
+            else:
+                await asyncio.to_thread(self.history.save_signal, signal, meta)
+            if self.outcomes is not None:
+                self.outcomes.track(signal)
+            await self.notifier.send_signal(signal)
+            if self.paper is not None and len(self.paper.positions) < settings.max_open_positions:
+                size = self.paper.risk_size(signal)
+                if size > 0:  # no stop distance or no equity left: nothing to risk
+                    self.paper.open_from_signal(signal, size=size, orderbook=orderbook)
+
+    async def _refresh_quotes(self, symbol: str) -> None:
+        price, orderbook = await asyncio.gather(
+            self.market.fetch_last_price_async(symbol),
+            self.market.fetch_orderbook_async(symbol),
+        )
+        self.latest[symbol]["price"] = price
+        self.latest[symbol]["orderbook"] = orderbook
+        await self._update_paper(symbol, price, orderbook)
+
+    async def _update_paper(self, symbol: str, price: float, orderbook: dict) -> None:
+        if self.paper is None:
+            return
+        for fill in self.paper.on_price(symbol, price, orderbook=orderbook):
+            await self.notifier.send_event(
+                f"Paper {fill['kind'].upper()} {symbol} {fill['direction']} @ {fill['price']:.4f} qty={fill['qty']:.6f} pnl={fill['pnl']:+.4f}"
+            )
+
+    def _analyze_locked(
+        self, lock: threading.Lock, symbol: str, timeframe: str, candles: pd.DataFrame
+    ) -> tuple[pd.DataFrame, Signal | None] | None:
+        if not lock.acquire(blocking=False):
+            return None  # a previous, timed-out analysis of this symbol is still running
+        try:
+            return self._analyze(symbol, timeframe, candles)
+        finally:
+            lock.release()
+
+    def _analyze(self, symbol: str, timeframe: str, candles: pd.DataFrame) -> tuple[pd.DataFrame, Signal | None]:
+        frame = self.indicators.sync(symbol, timeframe, candles, features="dashboard")
+        if self.frame_cache is not None and not frame.empty:
+            self.frame_cache.put(symbol, timeframe, frame["timestamp"].iloc[-1], "dashboard", frame)
+        self._archive_indicators(symbol, timeframe, frame)
+        return frame, self.signal_engine.evaluate(symbol, frame)
+
+    def _archive_indicators(self, symbol: str, timeframe: str, frame: pd.DataFrame) -> None:
+        """Append the closed bars not yet archived to the series store's ``indicators`` dataset."""
+        series = self.market.series
+        if series is None or frame.empty:
+            return
+        columns = [c for c in (name.strip() for name in settings.series_indicator_columns.split(",")) if c in frame.columns]
+        last = series.last_timestamp(symbol, timeframe, kind="indicators")
+        rows = frame if last is None else frame[frame["timestamp"] > last]
+        series.append(symbol, timeframe, rows[["timestamp", *columns]], kind="indicators")
 
     def stop(self) -> None:
         self.running = False
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from app.config import settings
+from app.data.bybit_async import AsyncBybitClient
+from app.data.candle_store import INTERVAL_MS
+from app.data.market_data import parse_klines
+from app.data.series_store import SeriesStore
+
+
+def _ms(value: datetime | str | int | None) -> int:
+    """Epoch milliseconds; ints are taken as milliseconds already, None means now."""
+    if isinstance(value, int):
+        return value
+    stamp = pd.Timestamp.now(tz="UTC") if value is None else pd.Timestamp(value)
+    if stamp.tzinfo is None:
+        stamp = stamp.tz_localize("UTC")
+    return int(stamp.value // 1_000_000)
+
+
+class TokenBucket:
+    """Async token bucket: ``rate`` requests per second with bursts of up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class Backfiller:
+    """Page klines backwards from ``end`` to ``start`` for many symbol/interval pairs into a SeriesStore.
+
+    Pairs run concurrently (``concurrency``) and share one request budget. Pages are buffered and
+    written every ``flush_rows`` rows; the checkpoint records, per pair, the ``cursor`` (next page
+    ends there) only after its rows are stored, so an interrupted run resumes without gaps. A
+    finished pair is only extended further back by later runs; newer bars come from the live fetch.
+    """
+
+    def __init__(
+        self,
+        client: AsyncBybitClient | None = None,
+        store: SeriesStore | None = None,
+        checkpoint_path: str | None = None,
+        requests_per_sec: float | None = None,
+        concurrency: int | None = None,
+        page_size: int | None = None,
+        flush_rows: int | None = None,
+    ) -> None:
+        self.client = client or AsyncBybitClient(enabled=True)
+        self.store = store or SeriesStore()
+        self.checkpoint_path = Path(checkpoint_path or settings.backfill_checkpoint_path)
+        self.limiter = TokenBucket(requests_per_sec or settings.backfill_requests_per_sec)
+        self.concurrency = max(concurrency or settings.backfill_concurrency, 1)
+        self.page_size = page_size or settings.backfill_page_size
+        self.flush_rows = flush_rows or settings.backfill_flush_rows
+        self.state: dict[str, dict] = self._load()
+
+    async def run(
+        self,
+        symbols: list[str],
+        intervals: list[str],
+        start: datetime | str | int,
+        end: datetime | str | int | None = None,
+    ) -> dict[str, dict]:
+        start_ms, end_ms = _ms(start), _ms(end)
+        if start_ms >= end_ms:
+            raise ValueError(f"Backfill start must be before end: {start} >= {end}")
+        for interval in intervals:
+            if interval not in INTERVAL_MS:
+                raise ValueError(f"Unsupported interval: {interval}")
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def guarded(symbol: str, interval: str) -> None:
+            async with semaphore:
+                try:
+                    await self._backfill(symbol, interval, start_ms, end_ms)
+                except Exception as exc:
+                    self.state[f"{symbol}:{interval}"]["error"] = str(exc)
+                    self._save()
+
+        await asyncio.gather(*(guarded(symbol, interval) for symbol in symbols for interval in intervals))
+        return {f"{s}:{i}": dict(self.state[f"{s}:{i}"]) for s in symbols for i in intervals}
+
+    async def _backfill(self, symbol: str, interval: str, start_ms: int, end_ms: int) -> None:
+        key = f"{symbol}:{interval}"
+        state = self.state.get(key)
+        if state is not None and state["done"] and state["start"] <= start_ms:
+            return
+        if state is None:
+            state = self.state[key] = {"start": start_ms, "cursor": end_ms, "rows": 0, "pages": 0, "done": False}
+        state.update(start=start_ms, done=False, error=None)
+
+        cursor = state["cursor"]
+        buffer: list[pd.DataFrame] = []
+        buffered = 0
+        try:
+            while cursor >= start_ms:
+                await self.limiter.acquire()
+                raw = await self.client.get_klines(symbol, interval, limit=self.page_size, start=start_ms, end=cursor)
+                state["pages"] += 1
+                if not raw:
+                    break
+                page = parse_klines(raw)
+                oldest = int(page["timestamp"].iloc[0].value // 1_000_000)
+                if oldest > cursor:
+                    break  # nothing at or before the cursor
+                buffer.append(page)
+                buffered += len(page)
+                cursor = oldest - 1
+                if len(raw) < self.page_size:
+                    break  # reached ``start`` or the symbol's listing
+                if buffered >= self.flush_rows:
+                    await self._flush(symbol, interval, state, buffer, cursor)
+                    buffer, buffered = [], 0
+            state["done"] = True
+        finally:
+            # Also on errors: the pages received so far are stored and the cursor points past them.
+            await self._flush(symbol, interval, state, buffer, cursor)
+
+    async def _flush(self, symbol: str, interval: str, state: dict, buffer: list[pd.DataFrame], cursor: int) -> None:
+        if buffer:
+            frame = pd.concat(buffer, ignore_index=True)
+            await asyncio.to_thread(self.store.append, symbol, interval, frame)
+            state["rows"] += len(frame)
+        state["cursor"] = cursor
+        self._save()
+
+    def progress(self) -> dict[str, dict]:
+        return {key: dict(value) for key, value in self.state.items()}
+
+    def _load(self) -> dict[str, dict]:
+        try:
+            return json.loads(self.checkpoint_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self) -> None:
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.checkpoint_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.state, indent=2), encoding="utf-8")
+        os.replace(tmp, self.checkpoint_path)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+async def _main(args: argparse.Namespace) -> dict[str, dict]:
+    backfiller = Backfiller(requests_per_sec=args.rate, concurrency=args.concurrency)
+    try:
+        return await backfiller.run(
+            [s.strip() for s in args.symbols.split(",") if s.strip()],
+            [i.strip() for i in args.intervals.split(",") if i.strip()],
+            args.start,
+            args.end,
+        )
+    finally:
+        await backfiller.aclose()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Download historical Bybit klines into the series store (resumable).")
+    parser.add_argument("--symbols", default=settings.default_symbols, help="comma-separated, default: DEFAULT_SYMBOLS")
+    parser.add_argument("--intervals", default=settings.default_timeframe, help="comma-separated Bybit intervals")
+    parser.add_argument("--start", required=True, help="oldest bar to fetch, e.g. 2022-01-01")
+    parser.add_argument("--end", default=None, help="newest bar to fetch (default: now)")
+    parser.add_argument("--rate", type=float, default=None, help="requests per second")
+    parser.add_argument("--concurrency", type=int, default=None)
+    args = parser.parse_args(argv)
+    print(json.dumps(asyncio.run(_main(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
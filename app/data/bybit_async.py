@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, List
+
+import httpx
+
+from app.config import settings
+
+MAINNET_URL = "https://api.bybit.com"
+TESTNET_URL = "https://api-testnet.bybit.com"
+RETRYABLE_RET_CODES = {10002, 10006, 10016}
+
+
+class AsyncBybitClient:
+    """Non-blocking client for the public v5 market endpoints over one pooled keep-alive session."""
+
+    def __init__(
+        self,
+        base_url: str | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        enabled: bool | None = None,
+    ) -> None:
+        # Market data is public; ``enabled`` only overrides the "no keys -> synthetic data" switch.
+        self.enabled = bool(settings.bybit_api_key and settings.bybit_api_secret) if enabled is None else enabled
+        self.base_url = base_url or (TESTNET_URL if settings.bybit_testnet else MAINNET_URL)
+        self.retries = max(settings.bybit_http_retries, 0)
+        self._transport = transport
+        self._session: httpx.AsyncClient | None = None
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._session is None or self._session.is_closed:
+            pool = settings.bybit_http_pool_size
+            self._session = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(settings.bybit_http_timeout_sec),
+                limits=httpx.Limits(max_connections=pool, max_keepalive_connections=pool),
+                transport=self._transport,
+            )
+        return self._session
+
+    async def _get(self, path: str, params: dict[str, Any]) -> dict[str, Any]:
+        last_error: Exception | None = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(min(0.25 * 2 ** (attempt - 1), 4.0))
+            try:
+                response = await self._client().get(path, params=params)
+                if response.status_code == 429 or response.status_code >= 500:
+                    last_error = RuntimeError(f"Bybit HTTP {response.status_code} on {path}")
+                    continue
+                response.raise_for_status()
+                payload = response.json()
+            except (httpx.TransportError, httpx.DecodingError) as exc:
+                last_error = exc
+                continue
+            code = payload.get("retCode", 0)
+            if code == 0:
+                return payload
+            last_error = RuntimeError(f"Bybit retCode={code} on {path}: {payload.get('retMsg', '')}")
+            if code not in RETRYABLE_RET_CODES:
+                break
+        raise last_error or RuntimeError(f"Bybit request failed: {path}")
+
+    async def get_klines(
+        self,
+        symbol: str,
+        interval: str = "15",
+        limit: int = 300,
+        start: int | None = None,
+        end: int | None = None,
+    ) -> List[Dict[str, Any]]:
+        """Newest-first klines; ``start``/``end`` (ms) bound the bar open times."""
+        if not self.enabled:
+            return []
+        params: dict[str, Any] = {"category": "linear", "symbol": symbol, "interval": interval, "limit": limit}
+        if start is not None:
+            params["start"] = start
+        if end is not None:
+            params["end"] = end
+        response = await self._get("/v5/market/kline", params)
+        return response.get("result", {}).get("list", [])
+
+    async def get_last_price(self, symbol: str) -> float | None:
+        if not self.enabled:
+            return None
+        response = await self._get("/v5/market/tickers", {"category": "linear", "symbol": symbol})
+        result = response.get("result", {}).get("list", [])
+        if not result:
+            return None
+        return float(result[0]["lastPrice"])
+
+    async def get_orderbook(self, symbol: str, limit: int = 50) -> dict[str, Any]:
+        if not self.enabled:
+            return {}
+        response = await self._get("/v5/market/orderbook", {"category": "linear", "symbol": symbol, "limit": limit})
+        return response.get("result", {})
+
+    async def aclose(self) -> None:
+        if self._session is not None:
+            await self._session.aclose()
+            self._session = None
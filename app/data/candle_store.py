@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from app.config import settings
+
+INTERVAL_MS: dict[str, int] = {
+    "1": 60_000,
+    "3": 180_000,
+    "5": 300_000,
+    "15": 900_000,
+    "30": 1_800_000,
+    "60": 3_600_000,
+    "120": 7_200_000,
+    "240": 14_400_000,
+    "360": 21_600_000,
+    "720": 43_200_000,
+    "D": 86_400_000,
+    "W": 604_800_000,
+}
+
+
+class CandleStore:
+    """Per symbol/interval candle cache: in-memory hot tier over on-disk pickles."""
+
+    def __init__(self, root: str | None = None, max_bars: int | None = None) -> None:
+        self.root = Path(root or settings.candle_cache_dir)
+        self.max_bars = max_bars or settings.candle_cache_max_bars
+        self._hot: dict[tuple[str, str], pd.DataFrame] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, symbol: str, interval: str) -> Path:
+        return self.root / f"{symbol}_{interval}.pkl"
+
+    def load(self, symbol: str, interval: str) -> pd.DataFrame | None:
+        key = (symbol, interval)
+        with self._lock:
+            cached = self._hot.get(key)
+            if cached is not None:
+                return cached
+            path = self._path(symbol, interval)
+            if not path.exists():
+                return None
+            try:
+                cached = pd.read_pickle(path)
+            except Exception:
+                return None
+            self._hot[key] = cached
+            return cached
+
+    def bars_to_fetch(self, symbol: str, interval: str, limit: int, now: datetime | None = None) -> int:
+        """How many of the newest bars must be requested to bring the cache up to date."""
+        cached = self.load(symbol, interval)
+        step_ms = INTERVAL_MS.get(interval)
+        if cached is None or step_ms is None or len(cached) < limit:
+            return limit
+        now = now or datetime.now(timezone.utc)
+        last_ms = int(cached["timestamp"].iloc[-1].value // 1_000_000)
+        now_ms = int(now.timestamp() * 1000)
+        # The last stored bar may have been the forming one, so it is always re-requested.
+        elapsed = max(now_ms - last_ms, 0) // step_ms + 1
+        return int(min(max(elapsed, 1), limit))
+
+    def merge(self, symbol: str, interval: str, fresh: pd.DataFrame) -> pd.DataFrame:
+        cached = self.load(symbol, interval)
+        step_ms = INTERVAL_MS.get(interval)
+        if cached is not None and not fresh.empty and step_ms is not None:
+            gap = fresh["timestamp"].iloc[0] - cached["timestamp"].iloc[-1]
+            if gap > pd.Timedelta(milliseconds=step_ms):
+                cached = None  # stale cache that no longer connects to the fresh window
+        if cached is not None and not fresh.empty:
+            merged = pd.concat([cached, fresh], ignore_index=True)
+            merged = merged.drop_duplicates(subset="timestamp", keep="last").sort_values("timestamp")
+        elif cached is not None:
+            merged = cached
+        else:
+            merged = fresh.sort_values("timestamp")
+        merged = merged.tail(self.max_bars).reset_index(drop=True)
+        with self._lock:
+            self._hot[(symbol, interval)] = merged
+            self._save(symbol, interval, merged)
+        return merged
+
+    def _save(self, symbol: str, interval: str, frame: pd.DataFrame) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(symbol, interval)
+        tmp = path.with_suffix(".tmp")
+        frame.to_pickle(tmp)
+        os.replace(tmp, path)
@@ -1,48 +1,96 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timedelta
 
 import numpy as np
 import pandas as pd
 
+from app.config import settings
+from app.data.bybit_async import AsyncBybitClient
 from app.data.bybit_client import BybitClient
+from app.data.candle_store import CandleStore
+from app.data.series_store import SeriesStore
+
+KLINE_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+
+
+def parse_klines(raw: list) -> pd.DataFrame:
+    """Bybit kline rows (newest first, string fields) as an ascending OHLCV frame."""
+    frame = pd.DataFrame([k[:6] for k in raw], columns=KLINE_COLUMNS)
+    frame["timestamp"] = pd.to_datetime(frame["timestamp"].astype("int64"), unit="ms", utc=True)
+    for col in KLINE_COLUMNS[1:]:
+        frame[col] = frame[col].astype(float)
+    return frame.sort_values("timestamp").reset_index(drop=True)
 
 
 class MarketDataService:
-    def __init__(self) -> None:
+    def __init__(self, store: CandleStore | None = None, series: SeriesStore | None = None) -> None:
         self.client = BybitClient()
+        self.async_client = AsyncBybitClient()
+        self.store = store or CandleStore()
+        self.series = series or (SeriesStore() if settings.series_store_enabled else None)
 
     def fetch_candles(self, symbol: str, interval: str = "15", limit: int = 300) -> pd.DataFrame:
-        raw = self.client.get_klines(symbol, interval, limit)
+        if not self.client.enabled:
+            return self._synthetic_data(limit)
+        missing = self.store.bars_to_fetch(symbol, interval, limit)
+        raw = self.client.get_klines(symbol, interval, missing)
+        return self._candles_from_raw(symbol, interval, limit, raw)
+
+    async def fetch_candles_async(self, symbol: str, interval: str = "15", limit: int = 300) -> pd.DataFrame:
+        if not self.async_client.enabled:
+            return self._synthetic_data(limit)
+        missing = await asyncio.to_thread(self.store.bars_to_fetch, symbol, interval, limit)
+        raw = await self.async_client.get_klines(symbol, interval, missing)
+        return await asyncio.to_thread(self._candles_from_raw, symbol, interval, limit, raw)
+
+    def _candles_from_raw(self, symbol: str, interval: str, limit: int, raw: list) -> pd.DataFrame:
         if raw:
-            rows = []
-            for k in raw:
-                rows.append(
-                    {
-                        "timestamp": pd.to_datetime(int(k[0]), unit="ms", utc=True),
-                        "open": float(k[1]),
-                        "high": float(k[2]),
-                        "low": float(k[3]),
-                        "close": float(k[4]),
-                        "volume": float(k[5]),
-                    }
-                )
-            return pd.DataFrame(rows).sort_values("timestamp").reset_index(drop=True)
+            fresh = parse_klines(raw)
+            if self.series is not None:
+                self.series.append(symbol, interval, fresh)
+            merged = self.store.merge(symbol, interval, fresh)
+            return merged.tail(limit).reset_index(drop=True)
+        cached = self.store.load(symbol, interval)
+        if cached is not None:
+            return cached.tail(limit).reset_index(drop=True)
         return self._synthetic_data(limit)
 
+    def load_range(self, symbol: str, interval: str = "15", start: datetime | str | None = None, end: datetime | str | None = None) -> pd.DataFrame:
+        """Archived candles in ``[start, end]`` from the series store (no network)."""
+        if self.series is None:
+            return pd.DataFrame(columns=KLINE_COLUMNS)
+        return self.series.read(symbol, interval, start, end, columns=KLINE_COLUMNS[1:])
+
     def fetch_last_price(self, symbol: str) -> float:
         px = self.client.get_last_price(symbol)
         if px is not None:
             return px
         return float(self._synthetic_data(1)["close"].iloc[-1])
 
+    async def fetch_last_price_async(self, symbol: str) -> float:
+        px = await self.async_client.get_last_price(symbol)
+        if px is not None:
+            return px
+        return float(self._synthetic_data(1)["close"].iloc[-1])
+
     def fetch_orderbook(self, symbol: str, limit: int = 50) -> dict:
         raw = self.client.get_orderbook(symbol=symbol, limit=limit)
+        mid = None if raw else self.fetch_last_price(symbol)
+        return self._summarize_orderbook(raw, mid)
+
+    async def fetch_orderbook_async(self, symbol: str, limit: int = 50) -> dict:
+        raw = await self.async_client.get_orderbook(symbol=symbol, limit=limit)
+        mid = None if raw else await self.fetch_last_price_async(symbol)
+        return self._summarize_orderbook(raw, mid)
+
+    @staticmethod
+    def _summarize_orderbook(raw: dict, mid: float | None) -> dict:
         if raw:
             bids = [[float(px), float(sz)] for px, sz in raw.get("b", [])]
             asks = [[float(px), float(sz)] for px, sz in raw.get("a", [])]
         else:
-            mid = self.fetch_last_price(symbol)
             bids = [[mid - i, 10 + i * 2] for i in range(1, 21)]
             asks = [[mid + i, 9 + i * 2] for i in range(1, 21)]
 
@@ -62,6 +110,9 @@ class MarketDataService:
             "imbalance": imbalance,
         }
 
+    async def aclose(self) -> None:
+        await self.async_client.aclose()
+
     @staticmethod
     def _synthetic_data(limit: int) -> pd.DataFrame:
         np.random.seed(42)
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app.config import settings
+
+TIMESTAMP = "timestamp"
+ITEMSIZE = 8  # int64 timestamps (ns, UTC) and float64 values
+
+
+def _ns(value: datetime | str | int | None) -> int | None:
+    if value is None:
+        return None
+    stamp = pd.Timestamp(value)
+    if stamp.tzinfo is None:
+        stamp = stamp.tz_localize("UTC")
+    return int(stamp.as_unit("ns").value)
+
+
+def _month(ns: int) -> str:
+    return str(np.datetime64(ns, "ns").astype("datetime64[M]"))
+
+
+class SeriesStore:
+    """Append-only columnar store for candles and indicator snapshots.
+
+    Layout is ``root/kind/symbol/interval/YYYY-MM/<column>.bin`` (raw int64 timestamps in ns, raw
+    float64 values) plus ``meta.json`` with the committed row count. Reads memory-map the column
+    files and cut the requested range with ``searchsorted``, so nothing is parsed. A write only
+    rewrites rows from the first timestamp it overlaps onwards (usually just the forming bar) and
+    commits the new row count last.
+    """
+
+    def __init__(self, root: str | None = None) -> None:
+        self.root = Path(root or settings.series_store_dir)
+        self._lock = threading.Lock()
+
+    def _base(self, kind: str, symbol: str, interval: str) -> Path:
+        return self.root / kind / symbol / interval
+
+    def append(self, symbol: str, interval: str, frame: pd.DataFrame, kind: str = "candles") -> int:
+        """Store ``frame`` (a ``timestamp`` column plus numeric columns); later rows win on equal timestamps."""
+        if frame.empty:
+            return 0
+        frame = frame.drop_duplicates(subset=TIMESTAMP, keep="last").sort_values(TIMESTAMP)
+        ts = pd.DatetimeIndex(frame[TIMESTAMP]).as_unit("ns").asi8
+        values = {col: frame[col].to_numpy(dtype=float) for col in frame.columns if col != TIMESTAMP}
+        months = ts.astype("datetime64[ns]").astype("datetime64[M]").astype(np.int64)
+        base = self._base(kind, symbol, interval)
+        with self._lock:
+            for rows in np.split(np.arange(len(ts)), np.flatnonzero(np.diff(months)) + 1):
+                self._write(base / _month(int(ts[rows[0]])), ts[rows], {col: arr[rows] for col, arr in values.items()})
+        return len(ts)
+
+    def read(
+        self,
+        symbol: str,
+        interval: str,
+        start: datetime | str | None = None,
+        end: datetime | str | None = None,
+        columns: list[str] | None = None,
+        kind: str = "candles",
+    ) -> pd.DataFrame:
+        """Rows with ``start <= timestamp <= end`` as a DataFrame with a UTC ``timestamp`` column."""
+        arrays = self.read_arrays(symbol, interval, start, end, columns, kind)
+        frame = pd.DataFrame(arrays)
+        frame[TIMESTAMP] = pd.to_datetime(frame[TIMESTAMP], unit="ns", utc=True)
+        return frame
+
+    def read_arrays(
+        self,
+        symbol: str,
+        interval: str,
+        start: datetime | str | None = None,
+        end: datetime | str | None = None,
+        columns: list[str] | None = None,
+        kind: str = "candles",
+    ) -> dict[str, np.ndarray]:
+        """Like ``read`` but returns plain arrays; ``timestamp`` stays int64 nanoseconds."""
+        lo, hi = _ns(start), _ns(end)
+        parts: list[dict[str, np.ndarray]] = []
+        for path in self._partitions(kind, symbol, interval, lo, hi):
+            meta = self._meta(path)
+            ts = self._column(path, TIMESTAMP, meta["rows"])
+            a = 0 if lo is None else int(np.searchsorted(ts, lo, side="left"))
+            b = len(ts) if hi is None else int(np.searchsorted(ts, hi, side="right"))
+            if a >= b:
+                continue
+            wanted = columns if columns is not None else list(meta["columns"])
+            part = {TIMESTAMP: np.array(ts[a:b])}
+            for col in wanted:
+                part[col] = np.array(self._column(path, col, meta["rows"])[a:b]) if col in meta["columns"] else np.full(b - a, np.nan)
+            parts.append(part)
+
+        names = list(dict.fromkeys(col for part in parts for col in part if col != TIMESTAMP)) if columns is None else columns
+        if not parts:
+            return {TIMESTAMP: np.empty(0, dtype=np.int64), **{col: np.empty(0) for col in names}}
+        return {
+            col: np.concatenate([part.get(col, np.full(len(part[TIMESTAMP]), np.nan)) for part in parts])
+            for col in (TIMESTAMP, *names)
+        }
+
+    def last_timestamp(self, symbol: str, interval: str, kind: str = "candles") -> pd.Timestamp | None:
+        for path in reversed(self._partitions(kind, symbol, interval)):
+            rows = self._meta(path)["rows"]
+            if rows:
+                return pd.Timestamp(int(self._column(path, TIMESTAMP, rows)[-1]), unit="ns", tz="UTC")
+        return None
+
+    def _partitions(self, kind: str, symbol: str, interval: str, lo: int | None = None, hi: int | None = None) -> list[Path]:
+        base = self._base(kind, symbol, interval)
+        if not base.is_dir():
+            return []
+        first = _month(lo) if lo is not None else ""
+        last = _month(hi) if hi is not None else "9999-99"
+        return sorted(p for p in base.iterdir() if p.is_dir() and first <= p.name <= last)
+
+    @staticmethod
+    def _meta(path: Path) -> dict:
+        try:
+            return json.loads((path / "meta.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {"rows": 0, "columns": []}
+
+    @staticmethod
+    def _column(path: Path, name: str, rows: int) -> np.ndarray:
+        dtype = np.int64 if name == TIMESTAMP else np.float64
+        if rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path / f"{name}.bin", dtype=dtype, mode="r", shape=(rows,))
+
+    def _write(self, path: Path, ts: np.ndarray, values: dict[str, np.ndarray]) -> None:
+        meta = self._meta(path)
+        rows, stored_columns = meta["rows"], list(meta["columns"])
+        stored = self._column(path, TIMESTAMP, rows)
+        offset = int(np.searchsorted(stored, ts[0], side="left"))
+        if offset < rows:
+            # Merge the overlapped tail so stored rows between the new timestamps are kept.
+            tail = pd.DataFrame({TIMESTAMP: np.array(stored[offset:])})
+            for col in stored_columns:
+                tail[col] = np.array(self._column(path, col, rows)[offset:])
+            fresh = pd.DataFrame({TIMESTAMP: ts, **values})
+            merged = pd.concat([tail, fresh], ignore_index=True)
+            merged = merged.drop_duplicates(subset=TIMESTAMP, keep="last").sort_values(TIMESTAMP)
+            ts = merged[TIMESTAMP].to_numpy(dtype=np.int64)
+            values = {col: merged[col].to_numpy(dtype=float) for col in merged.columns if col != TIMESTAMP}
+        del stored
+
+        path.mkdir(parents=True, exist_ok=True)
+        for col in values:
+            if col not in stored_columns:
+                np.full(offset, np.nan).tofile(path / f"{col}.bin")
+                stored_columns.append(col)
+        for col in (TIMESTAMP, *stored_columns):
+            data = ts if col == TIMESTAMP else values.get(col, np.full(len(ts), np.nan))
+            file = path / f"{col}.bin"
+            with open(file, "r+b" if file.exists() else "wb") as fh:
+                fh.seek(offset * ITEMSIZE)
+                fh.write(np.ascontiguousarray(data, dtype=np.int64 if col == TIMESTAMP else np.float64).tobytes())
+                fh.truncate()
+
+        tmp = path / "meta.json.tmp"
+        tmp.write_text(json.dumps({"rows": offset + len(ts), "columns": stored_columns}), encoding="utf-8")
+        os.replace(tmp, path / "meta.json")
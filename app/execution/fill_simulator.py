@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.config import settings
+
+Levels = list[list[float]]
+
+
+@dataclass(slots=True)
+class Fill:
+    side: str
+    requested: float
+    filled: float
+    price: float
+    reference: float
+    slippage_bps: float
+    latency_ms: float
+    levels: int
+    complete: bool
+
+
+def walk_book(levels: Levels, qty: float) -> tuple[float, float, int]:
+    """Walk price levels best-first for ``qty``; returns (filled qty, VWAP, levels touched)."""
+    if qty <= 0 or not levels:
+        return 0.0, float(levels[0][0]) if levels else math.nan, 0
+    book = np.asarray(levels, dtype=float)
+    prices, sizes = book[:, 0], book[:, 1]
+    before = np.concatenate(([0.0], np.cumsum(sizes)[:-1]))
+    take = np.clip(qty - before, 0.0, sizes)
+    filled = float(take.sum())
+    if filled <= 0:
+        return 0.0, float(prices[0]), 0
+    return filled, float((take * prices).sum() / filled), int(np.count_nonzero(take))
+
+
+class FillSimulator:
+    """Market-order fills against L2 depth plus a decision-to-fill latency model.
+
+    Books use the ``MarketDataService.fetch_orderbook`` layout (``bids``/``asks`` as [price, size]
+    best-first). During the sampled latency the whole book drifts by a Gaussian move scaled by
+    ``volatility_bps_per_sec``. Without a live book, fills use a depth profile captured from one
+    (``set_profile``), rescaled to the reference price. Size beyond the visible depth is priced
+    at the worst level and reported with ``complete=False``.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float | None = None,
+        latency_jitter_ms: float | None = None,
+        volatility_bps_per_sec: float | None = None,
+        seed: int | None = None,
+    ) -> None:
+        self.latency_ms = settings.fill_latency_ms if latency_ms is None else latency_ms
+        self.latency_jitter_ms = settings.fill_latency_jitter_ms if latency_jitter_ms is None else latency_jitter_ms
+        self.volatility_bps_per_sec = settings.fill_volatility_bps_per_sec if volatility_bps_per_sec is None else volatility_bps_per_sec
+        self.profile: dict[str, np.ndarray] | None = None
+        self._rng = np.random.default_rng(seed)
+
+    def set_profile(self, orderbook: dict) -> None:
+        """Keep ``orderbook`` as relative offsets from mid and notional sizes for book-less fills."""
+        bids, asks = orderbook.get("bids") or [], orderbook.get("asks") or []
+        if not bids or not asks:
+            raise ValueError("Order book profile needs both bids and asks")
+        mid = (bids[0][0] + asks[0][0]) / 2
+        self.profile = {
+            side: np.array([[px / mid - 1, px * sz] for px, sz in levels], dtype=float)
+            for side, levels in (("bids", bids), ("asks", asks))
+        }
+
+    def book_at(self, reference: float) -> dict:
+        if self.profile is None:
+            raise ValueError("No order book given and no depth profile set")
+        return {
+            side: [[reference * (1 + offset), notional / (reference * (1 + offset))] for offset, notional in levels]
+            for side, levels in self.profile.items()
+        }
+
+    def sample_latency_ms(self) -> float:
+        jitter = self._rng.exponential(self.latency_jitter_ms) if self.latency_jitter_ms > 0 else 0.0
+        return float(self.latency_ms + jitter)
+
+    def fill(self, side: str, qty: float, orderbook: dict | None = None, reference: float | None = None) -> Fill:
+        """Simulate a market ``side`` ("buy"/"sell") order of ``qty`` decided at ``reference`` (default: book mid)."""
+        buy = side.lower() in ("buy", "long")
+        if orderbook is None:
+            if reference is None:
+                raise ValueError("reference price is required without an order book")
+            orderbook = self.book_at(reference)
+        bids, asks = orderbook.get("bids") or [], orderbook.get("asks") or []
+        if reference is None:
+            reference = (bids[0][0] + asks[0][0]) / 2 if bids and asks else (asks or bids)[0][0]
+
+        latency = self.sample_latency_ms()
+        sigma = self.volatility_bps_per_sec / 10_000 * math.sqrt(latency / 1000)
+        drift = 1 + (self._rng.normal(0.0, sigma) if sigma > 0 else 0.0)
+        levels = [[px * drift, sz] for px, sz in (asks if buy else bids)]
+        if not levels:
+            raise ValueError(f"Order book has no {'asks' if buy else 'bids'} to fill a {side} order")
+
+        filled, vwap, touched = walk_book(levels, qty)
+        remainder = qty - filled
+        if remainder > 1e-12:
+            vwap = (vwap * filled + levels[-1][0] * remainder) / qty if filled > 0 else levels[-1][0]
+        cost = (vwap / reference - 1) if buy else (1 - vwap / reference)
+        return Fill(
+            side="buy" if buy else "sell",
+            requested=qty,
+            filled=min(filled, qty),
+            price=vwap,
+            reference=reference,
+            slippage_bps=cost * 10_000,
+            latency_ms=latency,
+            levels=touched,
+            complete=remainder <= 1e-12,
+        )
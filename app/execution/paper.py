@@ -1,22 +1,265 @@
 from __future__ import annotations
 
+import heapq
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+from app.config import settings
+from app.execution.fill_simulator import FillSimulator
 from app.models import Position, Signal
 
+MAX_CLOSED_KEPT = 500
+TP_FRACTION = 1 / 3
+
+
+@dataclass(slots=True)
+class _TriggerBook:
+    """Trigger heaps of one symbol, ordered so the next level to be crossed is on top.
+
+    Entries are (key, position_id, tp_hits); stale entries are skipped on pop and compacted away.
+    """
+
+    long_stops: list[tuple[float, int, int]] = field(default_factory=list)  # key -stop
+    long_targets: list[tuple[float, int, int]] = field(default_factory=list)  # key target
+    short_stops: list[tuple[float, int, int]] = field(default_factory=list)  # key stop
+    short_targets: list[tuple[float, int, int]] = field(default_factory=list)  # key -target
+    live: set[int] = field(default_factory=set)
+    stale: int = 0
+
 
 class PaperExecutionEngine:
-    def __init__(self) -> None:
-        self.positions: list[Position] = []
-
-    def open_from_signal(self, signal: Signal, size: float = 1.0) -> Position:
-        position = Position(
-            symbol=signal.symbol,
-            direction=signal.direction,
-            entry=signal.entry,
-            size=size,
-            stop_loss=signal.stop_loss,
-            tp1=signal.tp1,
-            tp2=signal.tp2,
-            tp3=signal.tp3,
+    """Paper positions with SL/TP triggers indexed per symbol.
+
+    A price update only pops the heap entries whose levels were crossed, so its cost does not grow
+    with the number of open positions. Positions scale out in thirds at TP1/TP2/TP3 and the state
+    is persisted as JSON after every change. With a ``FillSimulator`` and an order book, entries
+    and stops fill at the simulated depth-walk price instead of the signal/observed price.
+    """
+
+    def __init__(
+        self,
+        state_path: str | None = None,
+        initial_equity: float | None = None,
+        fill_simulator: FillSimulator | None = None,
+    ) -> None:
+        self.state_path = Path(state_path or settings.paper_state_path)
+        self.fill_simulator = fill_simulator
+        self.equity = settings.paper_initial_equity if initial_equity is None else initial_equity
+        self.positions: dict[int, Position] = {}
+        self.closed: list[Position] = []
+        self._books: dict[str, _TriggerBook] = {}
+        self._next_id = 1
+        self._lock = threading.RLock()
+        self.load()
+
+    def open_from_signal(self, signal: Signal, size: float = 1.0, orderbook: dict | None = None) -> Position:
+        if size <= 0:
+            raise ValueError(f"Paper position size must be positive, got {size}")
+        entry = signal.entry
+        if self.fill_simulator is not None and orderbook is not None:
+            side = "buy" if signal.direction == "LONG" else "sell"
+            entry = self.fill_simulator.fill(side, size, orderbook, reference=signal.entry).price
+        with self._lock:
+            position = Position(
+                symbol=signal.symbol,
+                direction=signal.direction,
+                entry=entry,
+                size=size,
+                stop_loss=signal.stop_loss,
+                tp1=signal.tp1,
+                tp2=signal.tp2,
+                tp3=signal.tp3,
+                opened_at=datetime.now(timezone.utc),
+                realized_pnl=0.0,
+                position_id=self._next_id,
+                remaining=size,
+            )
+            self._next_id += 1
+            self._index(position)
+            self.save()
+            return position
+
+    def risk_size(self, signal: Signal, risk_pct: float | None = None) -> float:
+        """Quantity that loses ``risk_pct`` percent of paper equity if the stop is hit."""
+        distance = abs(signal.entry - signal.stop_loss)
+        if distance <= 0 or self.equity <= 0:
+            return 0.0
+        pct = settings.risk_per_trade_pct if risk_pct is None else risk_pct
+        return self.equity * pct / 100 / distance
+
+    def open_positions(self, symbol: str | None = None) -> list[Position]:
+        with self._lock:
+            return [p for p in self.positions.values() if symbol is None or p.symbol == symbol]
+
+    def on_price(self, symbol: str, price: float, ts: datetime | None = None, orderbook: dict | None = None) -> list[dict]:
+        """Apply a price update; returns the fills it triggered. ``orderbook`` prices stop-outs."""
+        with self._lock:
+            book = self._books.get(symbol)
+            if book is None or not book.live:
+                return []
+            ts = ts or datetime.now(timezone.utc)
+            fills: list[dict] = []
+
+            while book.long_stops and -book.long_stops[0][0] >= price:
+                _, pid, _ = heapq.heappop(book.long_stops)
+                self._stop_out(pid, price, ts, fills, orderbook)
+            while book.short_stops and book.short_stops[0][0] <= price:
+                _, pid, _ = heapq.heappop(book.short_stops)
+                self._stop_out(pid, price, ts, fills, orderbook)
+            while book.long_targets and book.long_targets[0][0] <= price:
+                _, pid, hits = heapq.heappop(book.long_targets)
+                self._take_profit(pid, hits, ts, fills)
+            while book.short_targets and -book.short_targets[0][0] >= price:
+                _, pid, hits = heapq.heappop(book.short_targets)
+                self._take_profit(pid, hits, ts, fills)
+
+            if fills:
+                if book.stale > 2 * len(book.live) + 32:
+                    self._rebuild(symbol)
+                self.save()
+            return fills
+
+    def _index(self, position: Position) -> None:
+        self.positions[position.position_id] = position
+        book = self._books.setdefault(position.symbol, _TriggerBook())
+        book.live.add(position.position_id)
+        if position.direction == "LONG":
+            heapq.heappush(book.long_stops, (-position.stop_loss, position.position_id, 0))
+        else:
+            heapq.heappush(book.short_stops, (position.stop_loss, position.position_id, 0))
+        self._push_target(book, position)
+
+    @staticmethod
+    def _push_target(book: _TriggerBook, position: Position) -> None:
+        target = (position.tp1, position.tp2, position.tp3)[position.tp_hits]
+        if position.direction == "LONG":
+            heapq.heappush(book.long_targets, (target, position.position_id, position.tp_hits))
+        else:
+            heapq.heappush(book.short_targets, (-target, position.position_id, position.tp_hits))
+
+    def _fill(
+        self, position: Position, price: float, qty: float, kind: str, ts: datetime, fills: list[dict], slippage: float = 0.0
+    ) -> None:
+        sign = 1.0 if position.direction == "LONG" else -1.0
+        pnl = sign * (price - position.entry) * qty
+        position.remaining -= qty
+        position.realized_pnl = (position.realized_pnl or 0.0) + pnl
+        self.equity += pnl
+        fills.append(
+            {
+                "position_id": position.position_id,
+                "symbol": position.symbol,
+                "direction": position.direction,
+                "kind": kind,
+                "price": price,
+                "qty": qty,
+                "pnl": pnl,
+                "slippage": slippage,
+                "ts": ts.isoformat(),
+            }
         )
-        self.positions.append(position)
-        return position
+
+    def _close(self, position: Position, reason: str, ts: datetime) -> None:
+        position.status = "closed"
+        position.closed_at = ts
+        position.exit_reason = reason
+        del self.positions[position.position_id]
+        book = self._books[position.symbol]
+        book.live.discard(position.position_id)
+        book.stale += 1  # the other side's heap entry is now dead
+        self.closed.append(position)
+        del self.closed[:-MAX_CLOSED_KEPT]
+
+    def _stop_out(self, pid: int, price: float, ts: datetime, fills: list[dict], orderbook: dict | None) -> None:
+        position = self.positions.get(pid)
+        if position is None:
+            return
+        # Stops fill at market from the observed price, which may be through the level on a gap.
+        filled = price
+        if self.fill_simulator is not None and orderbook is not None:
+            side = "sell" if position.direction == "LONG" else "buy"
+            filled = self.fill_simulator.fill(side, position.remaining, orderbook, reference=price).price
+            # A book older than the trigger can sit on the good side of the stop; never fill better than it.
+            filled = min(filled, position.stop_loss) if position.direction == "LONG" else max(filled, position.stop_loss)
+        qty = position.remaining
+        slippage = (price - filled) * qty if position.direction == "LONG" else (filled - price) * qty
+        self._fill(position, filled, qty, "sl", ts, fills, slippage)
+        self._close(position, "sl" if position.tp_hits == 0 else f"tp{position.tp_hits}+sl", ts)
+
+    def _take_profit(self, pid: int, hits: int, ts: datetime, fills: list[dict]) -> None:
+        position = self.positions.get(pid)
+        if position is None or position.tp_hits != hits:
+            return
+        target = (position.tp1, position.tp2, position.tp3)[hits]
+        qty = position.size * TP_FRACTION if hits < 2 else position.remaining
+        position.tp_hits += 1
+        self._fill(position, target, qty, f"tp{position.tp_hits}", ts, fills)
+        if position.tp_hits == 3:
+            self._close(position, "tp3", ts)
+        else:
+            self._push_target(self._books[position.symbol], position)
+
+    def _rebuild(self, symbol: str) -> None:
+        live = [self.positions[pid] for pid in self._books[symbol].live]
+        self._books[symbol] = _TriggerBook()
+        for position in live:
+            self._index(position)
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            wins = sum(1 for p in self.closed if (p.realized_pnl or 0.0) > 0)
+            return {
+                "open_positions": float(len(self.positions)),
+                "closed_positions": float(len(self.closed)),
+                "wins": float(wins),
+                "losses": float(len(self.closed) - wins),
+                "realized_pnl": float(sum(p.realized_pnl or 0.0 for p in self.closed)),
+                "equity": float(self.equity),
+            }
+
+    def save(self) -> None:
+        with self._lock:
+            state = {
+                "next_id": self._next_id,
+                "equity": self.equity,
+                "open": [self._dump(p) for p in self.positions.values()],
+                "closed": [self._dump(p) for p in self.closed],
+            }
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.state_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(state, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.state_path)
+
+    def load(self) -> None:
+        if not self.state_path.exists():
+            return
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        with self._lock:
+            self._next_id = int(state.get("next_id", 1))
+            self.equity = float(state.get("equity", self.equity))
+            self.closed = [self._restore(item) for item in state.get("closed", [])]
+            for item in state.get("open", []):
+                self._index(self._restore(item))
+
+    @staticmethod
+    def _dump(position: Position) -> dict:
+        payload = asdict(position)
+        for key in ("opened_at", "closed_at"):
+            if payload[key] is not None:
+                payload[key] = payload[key].isoformat()
+        return payload
+
+    @staticmethod
+    def _restore(payload: dict) -> Position:
+        payload = dict(payload)
+        for key in ("opened_at", "closed_at"):
+            if payload.get(key):
+                payload[key] = datetime.fromisoformat(payload[key])
+        return Position(**payload)
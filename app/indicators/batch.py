@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Mapping
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app.indicators.engine import REGISTRY, check_inputs, resolve_features
+from app.indicators.structure import equal_levels, fair_value_gaps, rolling_extreme
+
+if TYPE_CHECKING:
+    from app.indicators.engine import IndicatorEngine
+
+BASE_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+
+
+def _shift(x: np.ndarray, periods: int = 1) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    out[:, periods:] = x[:, :-periods]
+    return out
+
+
+def _rolling(x: np.ndarray, window: int, reduce: Callable[..., np.ndarray], min_periods: int | None = None) -> np.ndarray:
+    """Trailing window reduction along bars; windows shorter than ``min_periods`` stay NaN."""
+    out = np.full(x.shape, np.nan)
+    bars = x.shape[1]
+    if bars >= window:
+        out[:, window - 1 :] = reduce(sliding_window_view(x, window, axis=1), axis=-1)
+    if min_periods is not None:
+        for t in range(min(window - 1, bars)):
+            if t + 1 >= min_periods:
+                out[:, t] = reduce(x[:, : t + 1], axis=-1)
+    return out
+
+
+def _ewm(x: np.ndarray, alpha: float, min_periods: int) -> np.ndarray:
+    """``ewm(alpha, adjust=False)`` per row; leading NaNs are skipped like pandas does."""
+    out = np.full(x.shape, np.nan)
+    value = np.full(x.shape[0], np.nan)
+    count = np.zeros(x.shape[0], dtype=int)
+    for t in range(x.shape[1]):
+        cur = x[:, t]
+        valid = ~np.isnan(cur)
+        value = np.where(valid & (count == 0), cur, np.where(valid, (1.0 - alpha) * value + alpha * cur, value))
+        count += valid
+        out[:, t] = np.where(count >= min_periods, value, np.nan)
+    return out
+
+
+def _ema(x: np.ndarray, span: int) -> np.ndarray:
+    return _ewm(x, 2.0 / (span + 1.0), span)
+
+
+def _div(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return num / den
+
+
+class _BatchFrame:
+    """(symbols x bars) OHLCV arrays plus the indicator columns computed so far."""
+
+    def __init__(self, arrays: dict[str, np.ndarray], engine: IndicatorEngine) -> None:
+        self.high, self.low, self.close, self.volume = arrays["high"], arrays["low"], arrays["close"], arrays["volume"]
+        self.engine = engine
+        self.cols: dict[str, np.ndarray] = {}
+        self._memo: dict[str, object] = {}
+
+    def memo(self, key: str, build: Callable[[], object]) -> object:
+        if key not in self._memo:
+            self._memo[key] = build()
+        return self._memo[key]
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.cols[name]
+
+    @property
+    def prev_close(self) -> np.ndarray:
+        return self.memo("prev_close", lambda: _shift(self.close))  # type: ignore[return-value]
+
+    @property
+    def typical(self) -> np.ndarray:
+        return self.memo("typical", lambda: (self.high + self.low + self.close) / 3.0)  # type: ignore[return-value]
+
+    @property
+    def bb_mean(self) -> np.ndarray:
+        return self.memo("bb_mean", lambda: _rolling(self.close, 20, np.mean))  # type: ignore[return-value]
+
+    @property
+    def bb_std(self) -> np.ndarray:
+        return self.memo("bb_std", lambda: _rolling(self.close, 20, np.std))  # type: ignore[return-value]
+
+    @property
+    def clv(self) -> np.ndarray:
+        def build() -> np.ndarray:
+            clv = _div((self.close - self.low) - (self.high - self.close), self.high - self.low)
+            return np.nan_to_num(clv, nan=0.0, posinf=np.inf, neginf=-np.inf)
+
+        return self.memo("clv", build)  # type: ignore[return-value]
+
+
+def _adx(b: _BatchFrame, window: int = 14) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Vectorized replica of ``ta.trend.ADXIndicator`` including its warm-up conventions."""
+    n, bars = b.close.shape
+    adx = np.zeros((n, bars))
+    adx_pos = np.zeros((n, bars))
+    adx_neg = np.zeros((n, bars))
+    if bars <= window:
+        return adx, adx_pos, adx_neg
+    prev_close = b.prev_close
+    tr = np.fmax(b.high, prev_close) - np.fmin(b.low, prev_close)
+    up = b.high - _shift(b.high)
+    down = _shift(b.low) - b.low
+    pos = np.where((up > down) & (up > 0), np.abs(up), 0.0)
+    neg = np.where((down > up) & (down > 0), np.abs(down), 0.0)
+
+    trs = tr[:, 1 : window + 1].sum(axis=1)
+    dip = pos[:, 1 : window + 1].sum(axis=1)
+    din = neg[:, 1 : window + 1].sum(axis=1)
+    seed = np.zeros(n)
+    value = np.zeros(n)
+    for row in range(window, bars):
+        if row > window:
+            trs = trs - trs / float(window) + tr[:, row]
+            dip = dip - dip / float(window) + pos[:, row]
+            din = din - din / float(window) + neg[:, row]
+        di_pos = np.where(trs != 0, 100 * _div(dip, trs), 0.0)
+        di_neg = np.where(trs != 0, 100 * _div(din, trs), 0.0)
+        total = di_pos + di_neg
+        dx = np.where(total != 0, 100 * np.abs(_div(di_pos - di_neg, total)), 0.0)
+        if row < 2 * window - 1:
+            seed += dx
+        elif row == 2 * window - 1:
+            value = (seed + dx) / window
+        else:
+            value = (value * (window - 1) + dx) / float(window)
+        adx[:, row] = value if row >= 2 * window - 1 else 0.0
+        if row > window:
+            adx_pos[:, row] = di_pos
+            adx_neg[:, row] = di_neg
+    return adx, adx_pos, adx_neg
+
+
+def _atr(b: _BatchFrame, window: int = 14) -> np.ndarray:
+    n, bars = b.close.shape
+    out = np.zeros((n, bars))
+    if bars < window:
+        return out
+    prev_close = b.prev_close
+    tr = np.fmax(np.fmax(b.high - b.low, np.abs(b.high - prev_close)), np.abs(b.low - prev_close))
+    value = tr[:, :window].mean(axis=1)
+    out[:, window - 1] = value
+    for row in range(window, bars):
+        value = (value * (window - 1) + tr[:, row]) / float(window)
+        out[:, row] = value
+    return out
+
+
+def _rsi(b: _BatchFrame, window: int = 14) -> np.ndarray:
+    diff = b.close - b.prev_close
+    up = np.where(diff > 0, diff, 0.0)
+    down = np.where(diff < 0, -diff, 0.0)
+    emaup = _ewm(up, 1 / window, window)
+    emadn = _ewm(down, 1 / window, window)
+    return np.where(emadn == 0, 100.0, 100 - (100 / (1 + _div(emaup, emadn))))
+
+
+def _stoch_k(b: _BatchFrame) -> np.ndarray:
+    smin = _rolling(b.low, 14, np.min)
+    smax = _rolling(b.high, 14, np.max)
+    return _div(100 * (b.close - smin), smax - smin)
+
+
+def _williams_r(b: _BatchFrame) -> np.ndarray:
+    highest = _rolling(b.high, 14, np.max)
+    lowest = _rolling(b.low, 14, np.min)
+    return _div(-100 * (highest - b.close), highest - lowest)
+
+
+def _cci(b: _BatchFrame, window: int = 20) -> np.ndarray:
+    tp = b.typical
+    mean = _rolling(tp, window, np.mean)
+    mad = np.full(tp.shape, np.nan)
+    if tp.shape[1] >= window:
+        view = sliding_window_view(tp, window, axis=1)
+        mad[:, window - 1 :] = np.abs(view - view.mean(axis=-1, keepdims=True)).mean(axis=-1)
+    return _div(tp - mean, 0.015 * mad)
+
+
+def _mfi(b: _BatchFrame, window: int = 14) -> np.ndarray:
+    tp = b.typical
+    prev_tp = _shift(tp)
+    up_down = np.where(tp > prev_tp, 1, np.where(tp < prev_tp, -1, 0))
+    flow = tp * b.volume * up_down
+    positive = _rolling(np.where(flow >= 0.0, flow, 0.0), window, np.sum)
+    negative = np.abs(_rolling(np.where(flow < 0.0, flow, 0.0), window, np.sum))
+    return 100 - (100 / (1 + _div(positive, negative)))
+
+
+def _fib(level: float) -> Callable[[_BatchFrame], np.ndarray]:
+    def compute(b: _BatchFrame) -> np.ndarray:
+        swing_high = b.memo("swing_high", lambda: rolling_extreme(b.high, 100, is_max=True))
+        swing_low = b.memo("swing_low", lambda: rolling_extreme(b.low, 100, is_max=False))
+        return swing_low + level * (swing_high - swing_low)  # type: ignore[operator]
+
+    return compute
+
+
+def _ichimoku_line(b: _BatchFrame, window: int) -> np.ndarray:
+    return 0.5 * (_rolling(b.high, window, np.max) + _rolling(b.low, window, np.min))
+
+
+KERNELS: dict[str, Callable[[_BatchFrame], np.ndarray]] = {
+    # Trend
+    "sma_20": lambda b: _rolling(b.close, 20, np.mean),
+    "sma_50": lambda b: _rolling(b.close, 50, np.mean),
+    "ema_9": lambda b: _ema(b.close, 9),
+    "ema_21": lambda b: _ema(b.close, 21),
+    "ema_200": lambda b: _ema(b.close, 200),
+    "adx": lambda b: b.memo("adx", lambda: _adx(b))[0],  # type: ignore[index]
+    "adx_pos": lambda b: b.memo("adx", lambda: _adx(b))[1],  # type: ignore[index]
+    "adx_neg": lambda b: b.memo("adx", lambda: _adx(b))[2],  # type: ignore[index]
+    "ichimoku_a": lambda b: 0.5 * (_ichimoku_line(b, 9) + _ichimoku_line(b, 26)),
+    "ichimoku_b": lambda b: 0.5 * (_rolling(b.high, 52, np.max, min_periods=1) + _rolling(b.low, 52, np.min, min_periods=1)),
+    "macd": lambda b: b.memo("macd", lambda: _ema(b.close, 12) - _ema(b.close, 26)),  # type: ignore[return-value]
+    "macd_signal": lambda b: _ema(b.memo("macd", lambda: _ema(b.close, 12) - _ema(b.close, 26)), 9),  # type: ignore[arg-type]
+    "macd_hist": lambda b: b["macd"] - b["macd_signal"],
+    # Momentum
+    "rsi": _rsi,
+    "stoch_k": lambda b: b.memo("stoch_k", lambda: _stoch_k(b)),  # type: ignore[return-value]
+    "stoch_d": lambda b: _rolling(b.memo("stoch_k", lambda: _stoch_k(b)), 3, np.mean),  # type: ignore[arg-type]
+    "cci": _cci,
+    "williams_r": _williams_r,
+    "roc": lambda b: _div(b.close - _shift(b.close, 12), _shift(b.close, 12)) * 100,
+    # Volatility
+    "atr": lambda b: b.memo("atr", lambda: _atr(b)),  # type: ignore[return-value]
+    "bb_mid": lambda b: b.bb_mean,
+    "bb_high": lambda b: b.bb_mean + 2 * b.bb_std,
+    "bb_low": lambda b: b.bb_mean - 2 * b.bb_std,
+    "bb_width": lambda b: _div(b["bb_high"] - b["bb_low"], np.where(b["bb_mid"] == 0, np.nan, b["bb_mid"])),
+    "kc_mid": lambda b: _rolling(b.typical, 20, np.mean),
+    "kc_high": lambda b: _rolling(((4 * b.high) - (2 * b.low) + b.close) / 3.0, 20, np.mean, min_periods=1),
+    "kc_low": lambda b: _rolling(((-2 * b.high) + (4 * b.low) + b.close) / 3.0, 20, np.mean, min_periods=1),
+    "donchian_high": lambda b: _rolling(b.high, 20, np.max),
+    "donchian_low": lambda b: _rolling(b.low, 20, np.min),
+    # Volume / flow
+    "obv": lambda b: np.cumsum(np.where(b.close < b.prev_close, -b.volume, b.volume), axis=1),
+    "cmf": lambda b: _div(_rolling(b.clv * b.volume, 20, np.sum), _rolling(b.volume, 20, np.sum)),
+    "mfi": _mfi,
+    "vwap": lambda b: _div(_rolling(b.typical * b.volume, 14, np.sum), _rolling(b.volume, 14, np.sum)),
+    "adi": lambda b: np.cumsum(b.clv * b.volume, axis=1),
+    # SuperTrend approximation + pivots/fib
+    "supertrend_proxy": lambda b: (b.high + b.low) / 2 - (1.5 * b["atr"]),
+    "pivot": lambda b: (_shift(b.high) + _shift(b.low) + b.prev_close) / 3,
+    "pivot_r1": lambda b: 2 * b["pivot"] - _shift(b.low),
+    "pivot_s1": lambda b: 2 * b["pivot"] - _shift(b.high),
+    "fib_382": _fib(0.382),
+    "fib_618": _fib(0.618),
+    # Liquidity & structure helpers
+    "eq_highs": lambda b: equal_levels(b.high, tolerance_bps=b.engine.tolerance_bps, tick_size=b.engine.tick_size),
+    "eq_lows": lambda b: equal_levels(b.low, tolerance_bps=b.engine.tolerance_bps, tick_size=b.engine.tick_size),
+    "fvg_up": lambda b: b.memo("fvg", lambda: fair_value_gaps(b.high, b.low))[0],  # type: ignore[index]
+    "fvg_down": lambda b: b.memo("fvg", lambda: fair_value_gaps(b.high, b.low))[1],  # type: ignore[index]
+}
+
+_missing = set(REGISTRY) - set(KERNELS)
+if _missing:
+    raise RuntimeError(f"Batch kernels missing for: {sorted(_missing)}")
+
+
+def calculate_batch(
+    frames: Mapping[str, pd.DataFrame],
+    engine: IndicatorEngine,
+    features: str | Iterable[str] | None = None,
+) -> dict[str, pd.DataFrame]:
+    """Compute indicators for many symbols at once on (symbols x bars) arrays.
+
+    Meant for callers that already hold every symbol on one bar grid, e.g. the same closed-candle
+    window fetched for a watchlist at one bar close or a stored range read back for a research or
+    backtest sweep; the live scanner streams per symbol instead. All frames must have the same
+    length and, when they carry one, the same ``timestamp`` column; anything else raises
+    ``ValueError`` rather than being aligned by position. Every symbol gets back the same column
+    layout and NaN-row dropping as ``IndicatorEngine.calculate``.
+    """
+    if not frames:
+        return {}
+    names = resolve_features(features)
+    symbols = list(frames)
+    for symbol in symbols:
+        check_inputs(frames[symbol].columns, names)
+    first = symbols[0]
+    bars = len(frames[first])
+    for symbol in symbols[1:]:
+        if len(frames[symbol]) != bars:
+            raise ValueError(f"calculate_batch needs equal-length frames: {first} has {bars} bars, {symbol} has {len(frames[symbol])}")
+    if "timestamp" in frames[first]:
+        stamps = frames[first]["timestamp"].to_numpy()
+        for symbol in symbols[1:]:
+            other = frames[symbol]
+            if "timestamp" not in other or not np.array_equal(other["timestamp"].to_numpy(), stamps):
+                raise ValueError(f"calculate_batch needs frames on the same timestamps: {symbol} differs from {first}")
+    bases = {s: frames[s].reset_index(drop=True) for s in symbols}
+    arrays = {
+        col: np.vstack([bases[s][col].to_numpy(dtype=float) if col in bases[s] else np.full(bars, np.nan) for s in symbols])
+        for col in ("high", "low", "close", "volume")
+    }
+
+    batch = _BatchFrame(arrays, engine)
+    for name in names:
+        batch.cols[name] = KERNELS[name](batch)
+
+    invalid = np.zeros((len(symbols), bars), dtype=bool)
+    for name in names:
+        invalid |= np.isnan(batch.cols[name])
+
+    result: dict[str, pd.DataFrame] = {}
+    for i, symbol in enumerate(symbols):
+        keep = ~invalid[i]
+        base = bases[symbol]
+        columns = {col: base[col].array[keep] for col in base.columns}
+        columns.update({name: batch.cols[name][i][keep] for name in names})
+        out = pd.DataFrame(columns)
+        result[symbol] = out.dropna().reset_index(drop=True)
+    return result
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+
+import pandas as pd
+
+from app.config import settings
+
+CacheKey = tuple[str, str, pd.Timestamp, tuple[str, ...] | str]
+
+
+def _features_key(features: str | Iterable[str] | None) -> tuple[str, ...] | str:
+    if features is None:
+        return "all"
+    if isinstance(features, str):
+        return features
+    return tuple(sorted(features))
+
+
+class FrameCache:
+    """Bounded LRU of computed indicator frames keyed by (symbol, timeframe, last closed bar, features).
+
+    Cached frames are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int | None = None, max_mb: float | None = None) -> None:
+        self.max_entries = max_entries or settings.frame_cache_max_entries
+        self.max_bytes = int((max_mb or settings.frame_cache_max_mb) * 1024 * 1024)
+        self._items: OrderedDict[CacheKey, tuple[pd.DataFrame, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(symbol: str, timeframe: str, last_bar: pd.Timestamp, features: str | Iterable[str] | None) -> CacheKey:
+        return (symbol, timeframe, last_bar, _features_key(features))
+
+    def get(self, symbol: str, timeframe: str, last_bar: pd.Timestamp, features: str | Iterable[str] | None = None) -> pd.DataFrame | None:
+        key = self.key(symbol, timeframe, last_bar, features)
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, symbol: str, timeframe: str, last_bar: pd.Timestamp, features: str | Iterable[str] | None, frame: pd.DataFrame) -> None:
+        key = self.key(symbol, timeframe, last_bar, features)
+        size = int(frame.memory_usage(index=True, deep=False).sum())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._items[key] = (frame, size)
+            self._bytes += size
+            while self._items and (len(self._items) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, evicted) = self._items.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def get_or_compute(
+        self,
+        symbol: str,
+        timeframe: str,
+        candles: pd.DataFrame,
+        features: str | Iterable[str] | None,
+        compute: Callable[[], pd.DataFrame],
+    ) -> pd.DataFrame:
+        if candles.empty:
+            return compute()
+        last_bar = candles["timestamp"].iloc[-1]
+        frame = self.get(symbol, timeframe, last_bar, features)
+        if frame is None:
+            frame = compute()
+            self.put(symbol, timeframe, last_bar, features, frame)
+        return frame
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": float(len(self._items)),
+                "bytes": float(self._bytes),
+                "hits": float(self.hits),
+                "misses": float(self.misses),
+                "evictions": float(self.evictions),
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
@@ -1,75 +1,176 @@
 from __future__ import annotations
 
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+
 import numpy as np
 import pandas as pd
 import ta
 
+from app.indicators.structure import equal_levels, fair_value_gaps, rolling_extreme
+
+Compute = Callable[[pd.DataFrame, "IndicatorEngine"], "pd.Series | np.ndarray"]
+
+
+@dataclass(frozen=True, slots=True)
+class IndicatorSpec:
+    name: str
+    inputs: tuple[str, ...]
+    depends: tuple[str, ...]
+    compute: Compute
+
+
+REGISTRY: dict[str, IndicatorSpec] = {}
+
+
+def _register(name: str, inputs: tuple[str, ...], compute: Compute, depends: tuple[str, ...] = ()) -> None:
+    missing = [dep for dep in depends if dep not in REGISTRY]
+    if missing:
+        raise ValueError(f"{name} depends on unregistered indicators: {missing}")
+    REGISTRY[name] = IndicatorSpec(name=name, inputs=inputs, depends=depends, compute=compute)
+
+
+HLC = ("high", "low", "close")
+HLCV = ("high", "low", "close", "volume")
+
+# Trend
+_register("sma_20", ("close",), lambda d, e: ta.trend.sma_indicator(d["close"], 20))
+_register("sma_50", ("close",), lambda d, e: ta.trend.sma_indicator(d["close"], 50))
+_register("ema_9", ("close",), lambda d, e: ta.trend.ema_indicator(d["close"], 9))
+_register("ema_21", ("close",), lambda d, e: ta.trend.ema_indicator(d["close"], 21))
+_register("ema_200", ("close",), lambda d, e: ta.trend.ema_indicator(d["close"], 200))
+_register("adx", HLC, lambda d, e: ta.trend.adx(d["high"], d["low"], d["close"], 14))
+_register("adx_pos", HLC, lambda d, e: ta.trend.adx_pos(d["high"], d["low"], d["close"], 14))
+_register("adx_neg", HLC, lambda d, e: ta.trend.adx_neg(d["high"], d["low"], d["close"], 14))
+_register("ichimoku_a", ("high", "low"), lambda d, e: ta.trend.ichimoku_a(d["high"], d["low"]))
+_register("ichimoku_b", ("high", "low"), lambda d, e: ta.trend.ichimoku_b(d["high"], d["low"]))
+_register("macd", ("close",), lambda d, e: ta.trend.macd(d["close"]))
+_register("macd_signal", ("close",), lambda d, e: ta.trend.macd_signal(d["close"]))
+_register("macd_hist", (), lambda d, e: d["macd"] - d["macd_signal"], depends=("macd", "macd_signal"))
+
+# Momentum
+_register("rsi", ("close",), lambda d, e: ta.momentum.rsi(d["close"], 14))
+_register("stoch_k", HLC, lambda d, e: ta.momentum.stoch(d["high"], d["low"], d["close"]))
+_register("stoch_d", HLC, lambda d, e: ta.momentum.stoch_signal(d["high"], d["low"], d["close"]))
+_register("cci", HLC, lambda d, e: ta.trend.cci(d["high"], d["low"], d["close"], 20))
+_register("williams_r", HLC, lambda d, e: ta.momentum.williams_r(d["high"], d["low"], d["close"], 14))
+_register("roc", ("close",), lambda d, e: ta.momentum.roc(d["close"], 12))
+
+# Volatility
+_register("atr", HLC, lambda d, e: ta.volatility.average_true_range(d["high"], d["low"], d["close"], 14))
+_register("bb_mid", ("close",), lambda d, e: ta.volatility.bollinger_mavg(d["close"]))
+_register("bb_high", ("close",), lambda d, e: ta.volatility.bollinger_hband(d["close"]))
+_register("bb_low", ("close",), lambda d, e: ta.volatility.bollinger_lband(d["close"]))
+_register(
+    "bb_width",
+    (),
+    lambda d, e: (d["bb_high"] - d["bb_low"]) / d["bb_mid"].replace(0, np.nan),
+    depends=("bb_high", "bb_low", "bb_mid"),
+)
+_register("kc_mid", HLC, lambda d, e: ta.volatility.keltner_channel_mband(d["high"], d["low"], d["close"]))
+_register("kc_high", HLC, lambda d, e: ta.volatility.keltner_channel_hband(d["high"], d["low"], d["close"]))
+_register("kc_low", HLC, lambda d, e: ta.volatility.keltner_channel_lband(d["high"], d["low"], d["close"]))
+_register("donchian_high", HLC, lambda d, e: ta.volatility.donchian_channel_hband(d["high"], d["low"], d["close"]))
+_register("donchian_low", HLC, lambda d, e: ta.volatility.donchian_channel_lband(d["high"], d["low"], d["close"]))
+
+# Volume / flow
+_register("obv", ("close", "volume"), lambda d, e: ta.volume.on_balance_volume(d["close"], d["volume"]))
+_register("cmf", HLCV, lambda d, e: ta.volume.chaikin_money_flow(d["high"], d["low"], d["close"], d["volume"]))
+_register("mfi", HLCV, lambda d, e: ta.volume.money_flow_index(d["high"], d["low"], d["close"], d["volume"]))
+_register("vwap", HLCV, lambda d, e: ta.volume.volume_weighted_average_price(d["high"], d["low"], d["close"], d["volume"]))
+_register("adi", HLCV, lambda d, e: ta.volume.acc_dist_index(d["high"], d["low"], d["close"], d["volume"]))
+
+# SuperTrend approximation + pivots/fib
+_register("supertrend_proxy", ("high", "low"), lambda d, e: (d["high"] + d["low"]) / 2 - (1.5 * d["atr"]), depends=("atr",))
+_register("pivot", HLC, lambda d, e: (d["high"].shift(1) + d["low"].shift(1) + d["close"].shift(1)) / 3)
+_register("pivot_r1", ("low",), lambda d, e: 2 * d["pivot"] - d["low"].shift(1), depends=("pivot",))
+_register("pivot_s1", ("high",), lambda d, e: 2 * d["pivot"] - d["high"].shift(1), depends=("pivot",))
+
+
+def _fib(level: float) -> Compute:
+    def compute(d: pd.DataFrame, e: IndicatorEngine) -> np.ndarray:
+        swing_high = rolling_extreme(d["high"].to_numpy(), 100, is_max=True)
+        swing_low = rolling_extreme(d["low"].to_numpy(), 100, is_max=False)
+        return swing_low + level * (swing_high - swing_low)
+
+    return compute
+
+
+_register("fib_382", ("high", "low"), _fib(0.382))
+_register("fib_618", ("high", "low"), _fib(0.618))
+
+# Liquidity & structure helpers
+_register("eq_highs", ("high",), lambda d, e: equal_levels(d["high"].to_numpy(), tolerance_bps=e.tolerance_bps, tick_size=e.tick_size))
+_register("eq_lows", ("low",), lambda d, e: equal_levels(d["low"].to_numpy(), tolerance_bps=e.tolerance_bps, tick_size=e.tick_size))
+_register("fvg_up", ("high", "low"), lambda d, e: fair_value_gaps(d["high"].to_numpy(), d["low"].to_numpy())[0])
+_register("fvg_down", ("high", "low"), lambda d, e: fair_value_gaps(d["high"].to_numpy(), d["low"].to_numpy())[1])
+
+FEATURE_SETS: dict[str, tuple[str, ...]] = {
+    # Columns read by SignalEngine.evaluate / evaluate paths.
+    "signal": ("ema_9", "ema_21", "ema_200", "macd_hist", "rsi", "adx", "atr", "cmf", "fvg_up", "fvg_down", "eq_highs", "eq_lows"),
+    # Signal columns plus the extra dashboard/scanner snapshot fields.
+    "dashboard": (
+        "ema_9", "ema_21", "ema_200", "macd_hist", "rsi", "adx", "atr", "cmf",
+        "fvg_up", "fvg_down", "eq_highs", "eq_lows", "bb_width", "vwap",
+    ),
+    # Columns read by TradeAdvisor._build_idea.
+    "advisor": ("adx", "rsi", "atr"),
+}
+
+
+def resolve_features(features: str | Iterable[str] | None = None) -> list[str]:
+    """Indicator names needed for ``features`` (a feature-set name or column names), in compute order."""
+    if features is None or features == "all":
+        return list(REGISTRY)
+    if isinstance(features, str):
+        if features not in FEATURE_SETS:
+            raise ValueError(f"Unknown feature set: {features}")
+        requested: Iterable[str] = FEATURE_SETS[features]
+    else:
+        requested = features
+
+    needed: set[str] = set()
+    stack = list(requested)
+    while stack:
+        name = stack.pop()
+        if name in needed:
+            continue
+        if name not in REGISTRY:
+            raise ValueError(f"Unknown indicator: {name}")
+        needed.add(name)
+        stack.extend(REGISTRY[name].depends)
+    return [name for name in REGISTRY if name in needed]
+
+
+def check_inputs(columns: Iterable[str], names: Iterable[str]) -> None:
+    """Raise ``ValueError`` when candle ``columns`` lack an input of the ``names`` indicators."""
+    available = set(columns)
+    missing = sorted({col for name in names for col in REGISTRY[name].inputs} - available)
+    if missing:
+        raise ValueError(f"Candles are missing columns required by the requested indicators: {missing}")
+
 
 class IndicatorEngine:
     """Calculates 30+ deterministic indicators on candle close only."""
 
-    def calculate(self, df: pd.DataFrame) -> pd.DataFrame:
-        out = df.copy()
-        high, low, close, volume = out["high"], out["low"], out["close"], out["volume"]
-
-        # Trend
-        out["sma_20"] = ta.trend.sma_indicator(close, 20)
-        out["sma_50"] = ta.trend.sma_indicator(close, 50)
-        out["ema_9"] = ta.trend.ema_indicator(close, 9)
-        out["ema_21"] = ta.trend.ema_indicator(close, 21)
-        out["ema_200"] = ta.trend.ema_indicator(close, 200)
-        out["adx"] = ta.trend.adx(high, low, close, 14)
-        out["adx_pos"] = ta.trend.adx_pos(high, low, close, 14)
-        out["adx_neg"] = ta.trend.adx_neg(high, low, close, 14)
-        out["ichimoku_a"] = ta.trend.ichimoku_a(high, low)
-        out["ichimoku_b"] = ta.trend.ichimoku_b(high, low)
-        out["macd"] = ta.trend.macd(close)
-        out["macd_signal"] = ta.trend.macd_signal(close)
-        out["macd_hist"] = out["macd"] - out["macd_signal"]
-
-        # Momentum
-        out["rsi"] = ta.momentum.rsi(close, 14)
-        out["stoch_k"] = ta.momentum.stoch(high, low, close)
-        out["stoch_d"] = ta.momentum.stoch_signal(high, low, close)
-        out["cci"] = ta.trend.cci(high, low, close, 20)
-        out["williams_r"] = ta.momentum.williams_r(high, low, close, 14)
-        out["roc"] = ta.momentum.roc(close, 12)
-
-        # Volatility
-        out["atr"] = ta.volatility.average_true_range(high, low, close, 14)
-        out["bb_mid"] = ta.volatility.bollinger_mavg(close)
-        out["bb_high"] = ta.volatility.bollinger_hband(close)
-        out["bb_low"] = ta.volatility.bollinger_lband(close)
-        out["bb_width"] = (out["bb_high"] - out["bb_low"]) / out["bb_mid"].replace(0, np.nan)
-        out["kc_mid"] = ta.volatility.keltner_channel_mband(high, low, close)
-        out["kc_high"] = ta.volatility.keltner_channel_hband(high, low, close)
-        out["kc_low"] = ta.volatility.keltner_channel_lband(high, low, close)
-        out["donchian_high"] = ta.volatility.donchian_channel_hband(high, low, close)
-        out["donchian_low"] = ta.volatility.donchian_channel_lband(high, low, close)
-
-        # Volume / flow
-        out["obv"] = ta.volume.on_balance_volume(close, volume)
-        out["cmf"] = ta.volume.chaikin_money_flow(high, low, close, volume)
-        out["mfi"] = ta.volume.money_flow_index(high, low, close, volume)
-        out["vwap"] = ta.volume.volume_weighted_average_price(high, low, close, volume)
-        out["adi"] = ta.volume.acc_dist_index(high, low, close, volume)
-
-        # SuperTrend approximation + pivots/fib
-        hl2 = (high + low) / 2
-        out["supertrend_proxy"] = hl2 - (1.5 * out["atr"])
-        out["pivot"] = (high.shift(1) + low.shift(1) + close.shift(1)) / 3
-        out["pivot_r1"] = 2 * out["pivot"] - low.shift(1)
-        out["pivot_s1"] = 2 * out["pivot"] - high.shift(1)
-        swing_high = high.rolling(100).max()
-        swing_low = low.rolling(100).min()
-        out["fib_382"] = swing_low + 0.382 * (swing_high - swing_low)
-        out["fib_618"] = swing_low + 0.618 * (swing_high - swing_low)
-
-        # Liquidity & structure helpers
-        out["eq_highs"] = (high.round(2).rolling(10).apply(lambda s: len(set(s)) < 8, raw=False)).fillna(0)
-        out["eq_lows"] = (low.round(2).rolling(10).apply(lambda s: len(set(s)) < 8, raw=False)).fillna(0)
-        out["fvg_up"] = (low.shift(1) > high.shift(2)).astype(int)
-        out["fvg_down"] = (high.shift(1) < low.shift(2)).astype(int)
+    def __init__(self, tolerance_bps: float | None = None, tick_size: float | None = None) -> None:
+        self.tolerance_bps = tolerance_bps
+        self.tick_size = tick_size
 
+    def calculate(self, df: pd.DataFrame, features: str | Iterable[str] | None = None) -> pd.DataFrame:
+        names = resolve_features(features)
+        check_inputs(df.columns, names)
+        out = df.copy()
+        for name in names:
+            out[name] = REGISTRY[name].compute(out, self)
         out = out.dropna().reset_index(drop=True)
         return out
+
+    def calculate_batch(self, frames: Mapping[str, pd.DataFrame], features: str | Iterable[str] | None = None) -> dict[str, pd.DataFrame]:
+        """Same output as ``calculate`` per symbol, computed for all symbols in one vectorized pass.
+
+        The frames must share their bars (same length and timestamps), otherwise ``ValueError``.
+        """
+        from app.indicators.batch import calculate_batch
+
+        return calculate_batch(frames, self, features)
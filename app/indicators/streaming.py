@@ -0,0 +1,387 @@
+from __future__ import annotations
+
+import math
+from collections import deque
+from collections.abc import Iterable
+
+import pandas as pd
+
+from app.indicators.engine import resolve_features
+from app.indicators.structure import count_levels
+
+NAN = float("nan")
+BASE_COLUMNS = ("timestamp", "open", "high", "low", "close", "volume")
+
+
+def _div(num: float, den: float) -> float:
+    if den != 0:
+        return num / den
+    if num == 0 or math.isnan(num):
+        return NAN
+    return math.copysign(math.inf, num)
+
+
+class _Ema:
+    """pandas ``ewm(adjust=False)`` over a stream; leading NaNs are skipped like pandas does."""
+
+    __slots__ = ("alpha", "min_periods", "value", "count")
+
+    def __init__(self, span: int | None = None, alpha: float | None = None, min_periods: int = 0) -> None:
+        self.alpha = alpha if alpha is not None else 2.0 / (span + 1.0)
+        self.min_periods = min_periods
+        self.value = NAN
+        self.count = 0
+
+    def update(self, x: float) -> float:
+        if math.isnan(x):
+            return self.value if self.count >= self.min_periods else NAN
+        self.count += 1
+        self.value = x if self.count == 1 else (1.0 - self.alpha) * self.value + self.alpha * x
+        return self.value if self.count >= self.min_periods else NAN
+
+
+class _Window:
+    """Fixed-size window with a running sum that is re-anchored once per full turnover."""
+
+    __slots__ = ("size", "values", "total", "_evictions")
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.values: deque[float] = deque()
+        self.total = 0.0
+        self._evictions = 0
+
+    def push(self, x: float) -> None:
+        self.values.append(x)
+        self.total += x
+        if len(self.values) > self.size:
+            self.total -= self.values.popleft()
+            self._evictions += 1
+            if self._evictions >= self.size:
+                self.total = math.fsum(self.values)
+                self._evictions = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.size
+
+    def sum(self, min_periods: int | None = None) -> float:
+        need = self.size if min_periods is None else min_periods
+        return self.total if self.values and len(self.values) >= need else NAN
+
+    def mean(self, min_periods: int | None = None) -> float:
+        need = self.size if min_periods is None else min_periods
+        return self.total / len(self.values) if self.values and len(self.values) >= need else NAN
+
+    def std(self) -> float:
+        if not self.full:
+            return NAN
+        mean = self.total / self.size
+        return math.sqrt(sum((v - mean) ** 2 for v in self.values) / self.size)
+
+    def mean_abs_dev(self) -> float:
+        if not self.full:
+            return NAN
+        mean = sum(self.values) / self.size
+        return sum(abs(v - mean) for v in self.values) / self.size
+
+
+class _Extreme:
+    """Rolling max (or min) in amortized O(1) via a monotonic deque."""
+
+    __slots__ = ("size", "is_max", "items", "seen")
+
+    def __init__(self, size: int, is_max: bool) -> None:
+        self.size = size
+        self.is_max = is_max
+        self.items: deque[tuple[int, float]] = deque()
+        self.seen = 0
+
+    def push(self, x: float) -> None:
+        idx = self.seen
+        self.seen += 1
+        if self.is_max:
+            while self.items and self.items[-1][1] <= x:
+                self.items.pop()
+        else:
+            while self.items and self.items[-1][1] >= x:
+                self.items.pop()
+        self.items.append((idx, x))
+        while self.items[0][0] <= idx - self.size:
+            self.items.popleft()
+
+    def value(self, min_periods: int | None = None) -> float:
+        need = self.size if min_periods is None else min_periods
+        return self.items[0][1] if min(self.seen, self.size) >= need and self.items else NAN
+
+
+class _Adx:
+    """Incremental replica of ``ta.trend.ADXIndicator`` (adx, adx_pos, adx_neg)."""
+
+    def __init__(self, window: int = 14) -> None:
+        self.window = window
+        self.bars = 0
+        self.prev: tuple[float, float, float] | None = None
+        self.trs = self.dip = self.din = 0.0
+        self.dx_seed: list[float] = []
+        self.adx = 0.0
+
+    def update(self, high: float, low: float, close: float) -> tuple[float, float, float]:
+        w = self.window
+        row = self.bars
+        self.bars += 1
+        if self.prev is None:
+            self.prev = (high, low, close)
+            return 0.0, 0.0, 0.0
+        prev_high, prev_low, prev_close = self.prev
+        self.prev = (high, low, close)
+
+        tr = max(high, prev_close) - min(low, prev_close)
+        up, down = high - prev_high, prev_low - low
+        pos = abs(up) if (up > down and up > 0) else 0.0
+        neg = abs(down) if (down > up and down > 0) else 0.0
+        if row <= w:
+            self.trs += tr
+            self.dip += pos
+            self.din += neg
+            if row < w:
+                return 0.0, 0.0, 0.0
+        else:
+            self.trs = self.trs - self.trs / float(w) + tr
+            self.dip = self.dip - self.dip / float(w) + pos
+            self.din = self.din - self.din / float(w) + neg
+
+        di_pos = 100 * (self.dip / self.trs) if self.trs != 0 else 0.0
+        di_neg = 100 * (self.din / self.trs) if self.trs != 0 else 0.0
+        dx = 100 * abs((di_pos - di_neg) / (di_pos + di_neg)) if di_pos + di_neg != 0 else 0.0
+
+        if row < 2 * w - 1:
+            self.dx_seed.append(dx)
+        elif row == 2 * w - 1:
+            self.dx_seed.append(dx)
+            self.adx = sum(self.dx_seed) / w
+            self.dx_seed = []
+        else:
+            self.adx = (self.adx * (w - 1) + dx) / float(w)
+
+        if row == w:
+            return self.adx, 0.0, 0.0
+        return self.adx, di_pos, di_neg
+
+
+class _Atr:
+    """Incremental replica of ``ta.volatility.AverageTrueRange`` (zeros during warm-up)."""
+
+    def __init__(self, window: int = 14) -> None:
+        self.window = window
+        self.bars = 0
+        self.seed = 0.0
+        self.value = 0.0
+
+    def update(self, tr: float) -> float:
+        row = self.bars
+        self.bars += 1
+        if row < self.window - 1:
+            self.seed += tr
+            return 0.0
+        if row == self.window - 1:
+            self.value = (self.seed + tr) / self.window
+        else:
+            self.value = (self.value * (self.window - 1) + tr) / float(self.window)
+        return self.value
+
+
+class StreamingIndicators:
+    """Constant-time per-candle state for every column produced by ``IndicatorEngine.calculate``."""
+
+    def __init__(self, keep: int = 64, tolerance_bps: float | None = None, tick_size: float | None = None) -> None:
+        self.keep = keep
+        self.tolerance_bps = tolerance_bps
+        self.tick_size = tick_size
+        self.rows: deque[dict] = deque(maxlen=keep)
+        self.last_timestamp: pd.Timestamp | None = None
+        self._prev: dict | None = None
+        self._prev2: dict | None = None
+
+        self._sma_20, self._sma_50 = _Window(20), _Window(50)
+        self._ema_9, self._ema_21, self._ema_200 = _Ema(9, min_periods=9), _Ema(21, min_periods=21), _Ema(200, min_periods=200)
+        self._adx = _Adx(14)
+        self._ichi_hi9, self._ichi_lo9 = _Extreme(9, True), _Extreme(9, False)
+        self._ichi_hi26, self._ichi_lo26 = _Extreme(26, True), _Extreme(26, False)
+        self._ichi_hi52, self._ichi_lo52 = _Extreme(52, True), _Extreme(52, False)
+        self._macd_fast, self._macd_slow = _Ema(12, min_periods=12), _Ema(26, min_periods=26)
+        self._macd_sign = _Ema(9, min_periods=9)
+
+        self._rsi_up, self._rsi_dn = _Ema(alpha=1 / 14, min_periods=14), _Ema(alpha=1 / 14, min_periods=14)
+        self._stoch_hi, self._stoch_lo = _Extreme(14, True), _Extreme(14, False)
+        self._stoch_d = _Window(3)
+        self._cci_tp = _Window(20)
+        self._closes = deque(maxlen=13)
+
+        self._atr = _Atr(14)
+        self._bb = _Window(20)
+        self._kc_mid, self._kc_high, self._kc_low = _Window(20), _Window(20), _Window(20)
+        self._don_hi, self._don_lo = _Extreme(20, True), _Extreme(20, False)
+
+        self._obv = 0.0
+        self._adi = 0.0
+        self._cmf_mfv, self._cmf_vol = _Window(20), _Window(20)
+        self._mfi_pos, self._mfi_neg = _Window(14), _Window(14)
+        self._vwap_pv, self._vwap_vol = _Window(14), _Window(14)
+
+        self._fib_hi, self._fib_lo = _Extreme(100, True), _Extreme(100, False)
+        self._eq_highs: deque[float] = deque(maxlen=10)
+        self._eq_lows: deque[float] = deque(maxlen=10)
+
+    def update(self, timestamp: pd.Timestamp, open_: float, high: float, low: float, close: float, volume: float) -> dict:
+        prev, prev2 = self._prev, self._prev2
+        prev_close = prev["close"] if prev else NAN
+        row: dict = {"timestamp": timestamp, "open": open_, "high": high, "low": low, "close": close, "volume": volume}
+
+        # Trend
+        self._sma_20.push(close)
+        self._sma_50.push(close)
+        row["sma_20"] = self._sma_20.mean()
+        row["sma_50"] = self._sma_50.mean()
+        row["ema_9"] = self._ema_9.update(close)
+        row["ema_21"] = self._ema_21.update(close)
+        row["ema_200"] = self._ema_200.update(close)
+        row["adx"], row["adx_pos"], row["adx_neg"] = self._adx.update(high, low, close)
+        for ext, x in ((self._ichi_hi9, high), (self._ichi_hi26, high), (self._ichi_hi52, high)):
+            ext.push(x)
+        for ext, x in ((self._ichi_lo9, low), (self._ichi_lo26, low), (self._ichi_lo52, low)):
+            ext.push(x)
+        conv = 0.5 * (self._ichi_hi9.value() + self._ichi_lo9.value())
+        base = 0.5 * (self._ichi_hi26.value() + self._ichi_lo26.value())
+        row["ichimoku_a"] = 0.5 * (conv + base)
+        row["ichimoku_b"] = 0.5 * (self._ichi_hi52.value(1) + self._ichi_lo52.value(1))
+        macd = self._macd_fast.update(close) - self._macd_slow.update(close)
+        row["macd"] = macd
+        row["macd_signal"] = self._macd_sign.update(macd)
+        row["macd_hist"] = row["macd"] - row["macd_signal"]
+
+        # Momentum
+        diff = close - prev_close
+        emaup = self._rsi_up.update(diff if diff > 0 else 0.0)
+        emadn = self._rsi_dn.update(-diff if diff < 0 else 0.0)
+        row["rsi"] = 100.0 if emadn == 0 else 100 - (100 / (1 + _div(emaup, emadn)))
+        self._stoch_hi.push(high)
+        self._stoch_lo.push(low)
+        smax, smin = self._stoch_hi.value(), self._stoch_lo.value()
+        stoch_k = _div(100 * (close - smin), smax - smin)
+        row["stoch_k"] = stoch_k
+        if not math.isnan(stoch_k):
+            self._stoch_d.push(stoch_k)
+        row["stoch_d"] = self._stoch_d.mean()
+        typical = (high + low + close) / 3.0
+        self._cci_tp.push(typical)
+        row["cci"] = _div(typical - self._cci_tp.mean(), 0.015 * self._cci_tp.mean_abs_dev())
+        row["williams_r"] = _div(-100 * (smax - close), smax - smin)
+        self._closes.append(close)
+        past = self._closes[0] if len(self._closes) == self._closes.maxlen else NAN
+        row["roc"] = _div(close - past, past) * 100
+
+        # Volatility
+        true_range = high - low if prev is None else max(high - low, abs(high - prev_close), abs(low - prev_close))
+        row["atr"] = self._atr.update(true_range)
+        self._bb.push(close)
+        bb_mid, bb_std = self._bb.mean(), self._bb.std()
+        row["bb_mid"] = bb_mid
+        row["bb_high"] = bb_mid + 2 * bb_std
+        row["bb_low"] = bb_mid - 2 * bb_std
+        row["bb_width"] = (row["bb_high"] - row["bb_low"]) / bb_mid if bb_mid != 0 else NAN
+        self._kc_mid.push(typical)
+        self._kc_high.push(((4 * high) - (2 * low) + close) / 3.0)
+        self._kc_low.push(((-2 * high) + (4 * low) + close) / 3.0)
+        row["kc_mid"] = self._kc_mid.mean()
+        row["kc_high"] = self._kc_high.mean(1)
+        row["kc_low"] = self._kc_low.mean(1)
+        self._don_hi.push(high)
+        self._don_lo.push(low)
+        row["donchian_high"] = self._don_hi.value()
+        row["donchian_low"] = self._don_lo.value()
+
+        # Volume / flow
+        self._obv += -volume if close < prev_close else volume
+        row["obv"] = self._obv
+        clv = _div((close - low) - (high - close), high - low)
+        clv = 0.0 if math.isnan(clv) else clv
+        self._cmf_mfv.push(clv * volume)
+        self._cmf_vol.push(volume)
+        row["cmf"] = _div(self._cmf_mfv.sum(), self._cmf_vol.sum())
+        prev_typical = (prev["high"] + prev["low"] + prev_close) / 3.0 if prev else NAN
+        up_down = 1 if typical > prev_typical else (-1 if typical < prev_typical else 0)
+        flow = typical * volume * up_down
+        self._mfi_pos.push(flow if flow >= 0.0 else 0.0)
+        self._mfi_neg.push(flow if flow < 0.0 else 0.0)
+        money_ratio = _div(self._mfi_pos.sum(), abs(self._mfi_neg.sum()))
+        row["mfi"] = 100 - (100 / (1 + money_ratio)) if not math.isinf(money_ratio) else 100.0
+        self._vwap_pv.push(typical * volume)
+        self._vwap_vol.push(volume)
+        row["vwap"] = _div(self._vwap_pv.sum(), self._vwap_vol.sum())
+        self._adi += clv * volume
+        row["adi"] = self._adi
+
+        # SuperTrend approximation + pivots/fib
+        row["supertrend_proxy"] = (high + low) / 2 - (1.5 * row["atr"])
+        if prev is not None:
+            row["pivot"] = (prev["high"] + prev["low"] + prev_close) / 3
+            row["pivot_r1"] = 2 * row["pivot"] - prev["low"]
+            row["pivot_s1"] = 2 * row["pivot"] - prev["high"]
+        else:
+            row["pivot"] = row["pivot_r1"] = row["pivot_s1"] = NAN
+        self._fib_hi.push(high)
+        self._fib_lo.push(low)
+        swing_high, swing_low = self._fib_hi.value(), self._fib_lo.value()
+        row["fib_382"] = swing_low + 0.382 * (swing_high - swing_low)
+        row["fib_618"] = swing_low + 0.618 * (swing_high - swing_low)
+
+        # Liquidity & structure helpers
+        self._eq_highs.append(high)
+        self._eq_lows.append(low)
+        full = len(self._eq_highs) == 10
+        row["eq_highs"] = float(full and count_levels(list(self._eq_highs), self.tolerance_bps, self.tick_size) < 8)
+        row["eq_lows"] = float(full and count_levels(list(self._eq_lows), self.tolerance_bps, self.tick_size) < 8)
+        row["fvg_up"] = int(prev is not None and prev2 is not None and prev["low"] > prev2["high"])
+        row["fvg_down"] = int(prev is not None and prev2 is not None and prev["high"] < prev2["low"])
+
+        self._prev2, self._prev = prev, row
+        self.last_timestamp = timestamp
+        if not any(isinstance(v, float) and math.isnan(v) for v in row.values()):
+            self.rows.append(row)
+        return row
+
+    def extend(self, candles: pd.DataFrame) -> None:
+        for ts, o, h, l, c, v in candles.loc[:, list(BASE_COLUMNS)].itertuples(index=False, name=None):
+            self.update(ts, float(o), float(h), float(l), float(c), float(v))
+
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame(list(self.rows))
+
+
+class StreamingIndicatorHub:
+    """Keeps one ``StreamingIndicators`` per (symbol, timeframe) and feeds it only unseen candles."""
+
+    def __init__(self, keep: int = 64) -> None:
+        self.keep = keep
+        self._states: dict[tuple[str, str], StreamingIndicators] = {}
+
+    def sync(self, symbol: str, timeframe: str, candles: pd.DataFrame, features: str | Iterable[str] | None = None) -> pd.DataFrame:
+        key = (symbol, timeframe)
+        state = self._states.get(key)
+        last_ts = state.last_timestamp if state else None
+        if state is None or last_ts is None or candles.empty or last_ts < candles["timestamp"].iloc[0]:
+            state = StreamingIndicators(keep=self.keep)
+            state.extend(candles)
+            self._states[key] = state
+        else:
+            newer = candles[candles["timestamp"] > last_ts]
+            if not newer.empty:
+                state.extend(newer)
+        frame = state.frame()
+        if features is None or frame.empty:
+            return frame
+        return frame[list(BASE_COLUMNS) + resolve_features(features)]
+
+    def reset(self, symbol: str, timeframe: str) -> None:
+        self._states.pop((symbol, timeframe), None)
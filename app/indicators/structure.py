@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app.config import settings
+
+
+def _resolve(tolerance_bps: float | None, tick_size: float | None) -> tuple[float, float]:
+    bps = settings.liquidity_tolerance_bps if tolerance_bps is None else tolerance_bps
+    tick = settings.liquidity_tick_size if tick_size is None else tick_size
+    return max(float(bps), 0.0), max(float(tick), 0.0)
+
+
+def _quantize(values: np.ndarray, bps: float, tick: float) -> np.ndarray:
+    if tick > 0:
+        return np.rint(values / tick) * tick
+    if bps > 0:
+        return values
+    return np.round(values, 2)  # legacy behaviour when no tolerance is configured
+
+
+def equal_levels(
+    values: np.ndarray,
+    window: int = 10,
+    max_distinct: int = 8,
+    tolerance_bps: float | None = None,
+    tick_size: float | None = None,
+) -> np.ndarray:
+    """1.0 where the last ``window`` values hold fewer than ``max_distinct`` distinct price levels.
+
+    Levels are distinct when they differ by more than ``tolerance_bps`` (or by at least one
+    ``tick_size`` after snapping); with neither set, prices are compared after ``round(2)``.
+    Works along the last axis, so a (symbols x bars) array is handled in one pass.
+    """
+    bps, tick = _resolve(tolerance_bps, tick_size)
+    x = np.asarray(values, dtype=float)
+    out = np.zeros(x.shape)
+    if x.shape[-1] < window:
+        return out
+    windows = np.sort(sliding_window_view(_quantize(x, bps, tick), window, axis=-1), axis=-1)
+    gaps = np.diff(windows, axis=-1)
+    threshold = windows[..., :-1] * (bps / 10_000) if bps > 0 else 0.0
+    distinct = 1 + (gaps > threshold).sum(axis=-1)
+    out[..., window - 1 :] = distinct < max_distinct
+    return out
+
+
+def count_levels(values: list[float], tolerance_bps: float | None = None, tick_size: float | None = None) -> int:
+    """Scalar twin of the ``equal_levels`` kernel for a single window (used by the streaming engine)."""
+    bps, tick = _resolve(tolerance_bps, tick_size)
+    if tick > 0:
+        levels = sorted(round(v / tick) * tick for v in values)
+    elif bps > 0:
+        levels = sorted(values)
+    else:
+        levels = sorted(round(v * 100) / 100 for v in values)
+    distinct = 1
+    for prev, cur in zip(levels, levels[1:]):
+        if cur - prev > (prev * (bps / 10_000) if bps > 0 else 0.0):
+            distinct += 1
+    return distinct
+
+
+def fair_value_gaps(high: np.ndarray, low: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    up = np.zeros(high.shape, dtype=int)
+    down = np.zeros(high.shape, dtype=int)
+    if high.shape[-1] > 2:
+        up[..., 2:] = low[..., 1:-1] > high[..., :-2]
+        down[..., 2:] = high[..., 1:-1] < low[..., :-2]
+    return up, down
+
+
+def rolling_extreme(values: np.ndarray, window: int, is_max: bool = True) -> np.ndarray:
+    """Trailing rolling max/min, NaN until the window is full (same as ``Series.rolling(w).max()``)."""
+    x = np.asarray(values, dtype=float)
+    out = np.full(x.shape, np.nan)
+    if x.shape[-1] < window:
+        return out
+    view = sliding_window_view(x, window, axis=-1)
+    out[..., window - 1 :] = view.max(axis=-1) if is_max else view.min(axis=-1)
+    return out
@@ -1,20 +1,33 @@
 from __future__ import annotations
 
 import asyncio
+import csv
+import io
+import json
+from collections.abc import Iterator
 from dataclasses import asdict
 from datetime import datetime, timezone
 
-from fastapi import FastAPI, Query, Request, WebSocket
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from pydantic import BaseModel, field_validator, model_validator
 
 from app.advisor.manual_advisor import TradeAdvisor
 from app.config import settings
+from app.core.bar_clock import closed_candles
+from app.core.outcome_tracker import OutcomeTracker
 from app.core.scanner import ScannerService
+from app.data.backfill import Backfiller
+from app.data.candle_store import INTERVAL_MS
 from app.data.market_data import MarketDataService
+from app.execution.fill_simulator import FillSimulator
+from app.execution.paper import PaperExecutionEngine
+from app.indicators.cache import FrameCache
 from app.indicators.engine import IndicatorEngine
-from app.storage.history_store import HistoryStore
+from app.storage.history_store import EXPORT_COLUMNS, HistoryStore
+from app.storage.write_queue import HistoryWriter
 from app.strategy.signal_engine import SignalEngine
 from app.telegram.bot import TelegramNotifier
 
@@ -22,11 +35,15 @@ app = FastAPI(title=settings.app_name)
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 templates = Jinja2Templates(directory="app/templates")
 
-advisor = TradeAdvisor()
-history = HistoryStore()
 market = MarketDataService()
+frame_cache = FrameCache()
+advisor = TradeAdvisor(market_data=market, frame_cache=frame_cache)
+history = HistoryStore()
+history_writer = HistoryWriter(history)
+outcome_tracker = OutcomeTracker(history)
 indicators = IndicatorEngine()
 signal_engine = SignalEngine()
+paper = PaperExecutionEngine(fill_simulator=FillSimulator()) if settings.mode == "paper" else None
 
 notifier = TelegramNotifier(
     status_provider=lambda: {
@@ -38,22 +55,38 @@ notifier = TelegramNotifier(
     },
     latest_signals_provider=lambda: history.fetch_signals(limit=5),
 )
-scanner = ScannerService(notifier=notifier, history=history)
+scanner = ScannerService(
+    notifier=notifier,
+    history=history,
+    market=market,
+    frame_cache=frame_cache,
+    paper=paper,
+    writer=history_writer,
+    outcomes=outcome_tracker,
+)
 scanner_task: asyncio.Task | None = None
+backfiller = Backfiller(store=market.series)
+backfill_task: asyncio.Task | None = None
 
 
-def build_snapshot(symbol: str, timeframe: str) -> dict:
-    candles = market.fetch_candles(symbol, timeframe, 300)
-    frame = indicators.calculate(candles)
+async def build_snapshot(symbol: str, timeframe: str) -> dict:
+    candles, orderbook = await asyncio.gather(
+        market.fetch_candles_async(symbol, timeframe, 300),
+        market.fetch_orderbook_async(symbol),
+    )
+    closed = closed_candles(candles, timeframe)
+    frame = await asyncio.to_thread(
+        frame_cache.get_or_compute, symbol, timeframe, closed, "dashboard", lambda: indicators.calculate(closed, features="dashboard")
+    )
     row = frame.iloc[-1]
     signal = signal_engine.evaluate(symbol, frame)
     return {
         "symbol": symbol,
         "timeframe": timeframe,
         "timestamp": row["timestamp"].isoformat(),
-        "price": float(row["close"]),
+        "price": float(candles["close"].iloc[-1]),
         "bias": "bullish" if row["ema_21"] > row["ema_200"] else "bearish",
-        "orderbook": market.fetch_orderbook(symbol),
+        "orderbook": orderbook,
         "liquidity": {
             "swing_high": float(frame["high"].tail(50).max()),
             "swing_low": float(frame["low"].tail(50).min()),
@@ -76,6 +109,8 @@ def build_snapshot(symbol: str, timeframe: str) -> dict:
 @app.on_event("startup")
 async def startup_event() -> None:
     global scanner_task
+    history_writer.start()
+    await asyncio.to_thread(outcome_tracker.load)
     await notifier.start_bot_host()
     scanner_task = asyncio.create_task(scanner.run_forever())
 
@@ -85,7 +120,13 @@ async def shutdown_event() -> None:
     scanner.stop()
     if scanner_task:
         scanner_task.cancel()
+    if backfill_task:
+        backfill_task.cancel()
+    await backfiller.aclose()
     await notifier.stop_bot_host()
+    await market.aclose()
+    await history_writer.stop()
+    history.close()
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -103,7 +144,7 @@ async def index(request: Request) -> HTMLResponse:
 
 @app.post("/advisor")
 async def manual_advisor(payload: dict) -> dict:
-    idea = advisor.advise(
+    idea = await advisor.advise_async(
         symbol=payload["symbol"],
         direction=payload["direction"].upper(),
         entry=float(payload["entry"]),
@@ -114,7 +155,7 @@ async def manual_advisor(payload: dict) -> dict:
 
 @app.get("/api/snapshot")
 async def snapshot(symbol: str = Query(default="BTCUSDT"), timeframe: str = Query(default="15")) -> dict:
-    data = build_snapshot(symbol, timeframe)
+    data = await build_snapshot(symbol, timeframe)
     return {
         "ok": True,
         "symbol": symbol,
@@ -125,8 +166,155 @@ async def snapshot(symbol: str = Query(default="BTCUSDT"), timeframe: str = Quer
 
 
 @app.get("/api/history")
-async def signal_history(symbol: str | None = None, limit: int = 100) -> dict:
-    return {"items": history.fetch_signals(symbol=symbol, limit=limit)}
+async def signal_history(
+    symbol: str | None = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+    before_id: int | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> dict:
+    items = history.fetch_signals(symbol=symbol, limit=limit, before_id=before_id, since=since, until=until)
+    return {"items": items, "next_cursor": items[-1]["id"] if len(items) == limit else None}
+
+
+def _export_lines(rows: Iterator[tuple], fmt: str) -> Iterator[str]:
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        for row in rows:
+            writer.writerow(row)
+            if buffer.tell() > 65536:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+        return
+    meta_at = EXPORT_COLUMNS.index("meta_json")
+    fields = [(i, name) for i, name in enumerate(EXPORT_COLUMNS) if i != meta_at]
+    lines: list[str] = []
+    size = 0
+    for row in rows:
+        # meta_json is already JSON text: splice it in instead of a loads/dumps round trip.
+        head = json.dumps({name: row[i] for i, name in fields}, ensure_ascii=False)
+        lines.append(f'{head[:-1]}, "meta": {row[meta_at] or "{}"}}}\n')
+        size += len(lines[-1])
+        if size > 65536:
+            yield "".join(lines)
+            lines, size = [], 0
+    yield "".join(lines)
+
+
+@app.get("/api/history/export")
+async def export_history(
+    format: str = Query(default="ndjson", pattern="^(ndjson|csv)$"),
+    symbol: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> StreamingResponse:
+    rows = history.iter_signals(symbol=symbol, since=since, until=until)
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"signals.{'csv' if format == 'csv' else 'ndjson'}"
+    return StreamingResponse(
+        _export_lines(rows, format), media_type=media_type, headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Naive query datetimes are UTC, as everywhere in the stores."""
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+@app.get("/api/candles")
+async def stored_candles(
+    symbol: str = Query(default="BTCUSDT"),
+    interval: str = Query(default="15"),
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int = Query(default=5000, ge=1, le=100_000),
+    indicators: bool = False,
+) -> dict:
+    if start is not None and end is not None and _as_utc(start) > _as_utc(end):
+        raise HTTPException(status_code=422, detail=f"start must not be after end: {start} > {end}")
+    if market.series is None:
+        return {"symbol": symbol, "interval": interval, "rows": 0, "columns": {}}
+    kind = "indicators" if indicators else "candles"
+    arrays = await asyncio.to_thread(market.series.read_arrays, symbol, interval, start, end, None, kind)
+    columns = {name: values[-limit:] for name, values in arrays.items()}
+    columns["timestamp"] = columns["timestamp"] // 1_000_000  # ms, as on the chart
+    return {
+        "symbol": symbol,
+        "interval": interval,
+        "rows": len(columns["timestamp"]),
+        # NaN (indicator warm-up, absent columns) is not valid JSON
+        "columns": {name: [None if v != v else v for v in values.tolist()] for name, values in columns.items()},
+    }
+
+
+class BackfillRequest(BaseModel):
+    start: datetime
+    end: datetime | None = None
+    symbols: list[str] | None = None
+    intervals: list[str] | None = None
+
+    @field_validator("start", "end")
+    @classmethod
+    def _utc(cls, value: datetime | None) -> datetime | None:
+        return None if value is None else _as_utc(value)
+
+    @field_validator("intervals")
+    @classmethod
+    def _known_intervals(cls, value: list[str] | None) -> list[str] | None:
+        unknown = [interval for interval in value or [] if interval not in INTERVAL_MS]
+        if unknown:
+            raise ValueError(f"Unsupported intervals: {unknown}")
+        return value
+
+    @model_validator(mode="after")
+    def _ordered(self) -> BackfillRequest:
+        end = self.end or datetime.now(timezone.utc)
+        if self.start >= end:
+            raise ValueError(f"start must be before end: {self.start.isoformat()} >= {end.isoformat()}")
+        return self
+
+
+@app.post("/api/backfill")
+async def start_backfill(payload: BackfillRequest) -> dict:
+    global backfill_task
+    if backfill_task is not None and not backfill_task.done():
+        return {"ok": False, "error": "backfill already running", "progress": backfiller.progress()}
+    symbols = payload.symbols or [s.strip() for s in settings.default_symbols.split(",") if s.strip()]
+    intervals = payload.intervals or [settings.default_timeframe]
+    backfill_task = asyncio.create_task(backfiller.run(symbols, intervals, payload.start, payload.end))
+    return {"ok": True, "symbols": symbols, "intervals": intervals}
+
+
+@app.get("/api/backfill")
+async def backfill_status() -> dict:
+    running = backfill_task is not None and not backfill_task.done()
+    error = None
+    if backfill_task is not None and backfill_task.done() and not backfill_task.cancelled() and backfill_task.exception():
+        error = str(backfill_task.exception())
+    return {"running": running, "error": error, "progress": backfiller.progress()}
+
+
+@app.get("/api/stats")
+async def signal_stats() -> dict:
+    return {
+        "stats": history.stats(),
+        "symbols": history.symbol_stats(),
+        "performance": asdict(history.performance_snapshot()),
+    }
+
+
+@app.get("/api/metrics")
+async def metrics() -> dict:
+    return {
+        "frame_cache": frame_cache.stats(),
+        "history_writer": history_writer.stats(),
+        "outcomes": outcome_tracker.stats(),
+        "paper": paper.stats() if paper else None,
+    }
 
 
 @app.get("/health")
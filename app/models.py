@@ -45,6 +45,23 @@ class TradeIdea:
     reasoning: str
 
 
+@dataclass(slots=True)
+class TradeRecord:
+    symbol: str
+    direction: str
+    entry: float
+    exit: float
+    size: float
+    stop_loss: float
+    opened_at: datetime
+    closed_at: datetime
+    pnl: float
+    fees: float
+    r_multiple: float
+    exit_reason: str
+    slippage: float = 0.0
+
+
 @dataclass(slots=True)
 class PerformanceSnapshot:
     total_trades: int = 0
@@ -72,3 +89,8 @@ class Position:
     opened_at: datetime = field(default_factory=datetime.utcnow)
     status: str = "open"
     realized_pnl: Optional[float] = None
+    position_id: int = 0
+    remaining: float = 0.0
+    tp_hits: int = 0
+    closed_at: Optional[datetime] = None
+    exit_reason: str = ""
@@ -2,6 +2,11 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
+import numpy as np
+from numpy.typing import ArrayLike
+
+from app.config import settings
+
 
 @dataclass(slots=True)
 class RiskPlan:
@@ -12,16 +17,88 @@ class RiskPlan:
     rr: float
 
 
+@dataclass(slots=True)
+class RiskPlanBatch:
+    stop_loss: np.ndarray
+    tp1: np.ndarray
+    tp2: np.ndarray
+    tp3: np.ndarray
+    rr: np.ndarray
+    size: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self.stop_loss)
+
+    def plan(self, i: int) -> RiskPlan:
+        return RiskPlan(
+            stop_loss=float(self.stop_loss[i]),
+            tp1=float(self.tp1[i]),
+            tp2=float(self.tp2[i]),
+            tp3=float(self.tp3[i]),
+            rr=float(self.rr[i]),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class RiskParams:
+    atr_mult: float = 0.9
+    min_stop_pct: float = 0.002
+    tp1_r: float = 2.0
+    tp2_r: float = 3.0
+    tp3_r: float = 4.0
+
+
 class RiskEngine:
+    def __init__(self, params: RiskParams | None = None) -> None:
+        self.params = params or RiskParams()
+
     def build_levels(self, direction: str, entry: float, atr: float, liquidity_level: float) -> RiskPlan:
-        atr_buffer = max(atr * 0.9, entry * 0.002)
+        p = self.params
+        atr_buffer = max(atr * p.atr_mult, entry * p.min_stop_pct)
         if direction.upper() == "LONG":
             stop = min(liquidity_level, entry - atr_buffer)
             risk = entry - stop
-            tp1, tp2, tp3 = entry + 2 * risk, entry + 3 * risk, entry + 4 * risk
+            tp1, tp2, tp3 = entry + p.tp1_r * risk, entry + p.tp2_r * risk, entry + p.tp3_r * risk
         else:
             stop = max(liquidity_level, entry + atr_buffer)
             risk = stop - entry
-            tp1, tp2, tp3 = entry - 2 * risk, entry - 3 * risk, entry - 4 * risk
+            tp1, tp2, tp3 = entry - p.tp1_r * risk, entry - p.tp2_r * risk, entry - p.tp3_r * risk
         rr = abs((tp2 - entry) / (entry - stop)) if entry != stop else 0.0
         return RiskPlan(stop_loss=stop, tp1=tp1, tp2=tp2, tp3=tp3, rr=rr)
+
+    def build_levels_batch(
+        self,
+        direction: ArrayLike,
+        entry: ArrayLike,
+        atr: ArrayLike,
+        liquidity_level: ArrayLike,
+        equity: float | ArrayLike | None = None,
+        risk_pct: float | None = None,
+    ) -> RiskPlanBatch:
+        """``build_levels`` over arrays, element-for-element identical to the scalar path.
+
+        With ``equity`` set, ``size`` holds the quantity risking ``risk_pct`` (default
+        ``settings.risk_per_trade_pct``) percent of equity between entry and stop; 0 where the stop
+        sits on the entry.
+        """
+        p = self.params
+        entry = np.asarray(entry, dtype=float)
+        atr = np.asarray(atr, dtype=float)
+        liquidity_level = np.asarray(liquidity_level, dtype=float)
+        long = np.char.upper(np.asarray(direction).astype(str)) == "LONG"
+
+        atr_buffer = np.maximum(atr * p.atr_mult, entry * p.min_stop_pct)
+        stop = np.where(long, np.minimum(liquidity_level, entry - atr_buffer), np.maximum(liquidity_level, entry + atr_buffer))
+        risk = np.where(long, entry - stop, stop - entry)
+        sign = np.where(long, 1.0, -1.0)
+        tp1, tp2, tp3 = (entry + sign * (r * risk) for r in (p.tp1_r, p.tp2_r, p.tp3_r))
+        distance = entry - stop
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rr = np.where(distance != 0, np.abs((tp2 - entry) / distance), 0.0)
+
+        size = None
+        if equity is not None:
+            pct = settings.risk_per_trade_pct if risk_pct is None else risk_pct
+            with np.errstate(divide="ignore", invalid="ignore"):
+                size = np.where(distance != 0, np.asarray(equity, dtype=float) * pct / 100 / np.abs(distance), 0.0)
+        return RiskPlanBatch(stop_loss=stop, tp1=tp1, tp2=tp2, tp3=tp3, rr=rr, size=size)
@@ -2,26 +2,194 @@ from __future__ import annotations
 
 import json
 import sqlite3
-from dataclasses import asdict
-from datetime import datetime, timedelta
+import threading
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
 
 from app.config import settings
-from app.models import Signal
+from app.models import PerformanceSnapshot, Signal
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000",
+)
+
+INSERT_SIGNAL = """
+    INSERT INTO signal_history (
+        created_at, symbol, direction, entry, stop_loss,
+        tp1, tp2, tp3, rr, confidence, why, meta_json
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+SIGNAL_COLUMNS = "created_at,symbol,direction,entry,stop_loss,tp1,tp2,tp3,rr,confidence,why,meta_json"
+OUTCOME_COLUMNS = "outcome,tp_hits,r_multiple,mae_r,mfe_r,time_to_outcome_sec,resolved_at"
+EXPORT_COLUMNS = ("id", *SIGNAL_COLUMNS.split(","), *OUTCOME_COLUMNS.split(","))
+# Outcome columns added to databases created before outcomes were tracked (NULL outcome = unresolved).
+OUTCOME_SCHEMA = {
+    "outcome": "TEXT",
+    "tp_hits": "INTEGER",
+    "r_multiple": "REAL",
+    "mae_r": "REAL",
+    "mfe_r": "REAL",
+    "time_to_outcome_sec": "REAL",
+    "resolved_at": "TEXT",
+}
+WIN_OUTCOMES = ("tp1", "tp2", "tp3")
+UPDATE_OUTCOME = """
+    UPDATE signal_history
+    SET outcome = ?, tp_hits = ?, r_multiple = ?, mae_r = ?, mfe_r = ?, time_to_outcome_sec = ?, resolved_at = ?
+    WHERE symbol = ? AND created_at = ? AND outcome IS NULL
+"""
+
+# Running aggregates kept by insert triggers, so stats never scan signal_history. Hour and day buckets
+# are the first 13 and 10 characters of the ISO created_at ("YYYY-MM-DDTHH", "YYYY-MM-DD").
+STATS_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS signal_stats (
+        symbol TEXT NOT NULL,
+        direction TEXT NOT NULL,
+        signals INTEGER NOT NULL,
+        confidence_sum REAL NOT NULL,
+        PRIMARY KEY (symbol, direction)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS signal_stats_hourly (
+        bucket TEXT PRIMARY KEY,
+        signals INTEGER NOT NULL,
+        confidence_sum REAL NOT NULL
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_signal_history_stats AFTER INSERT ON signal_history
+    BEGIN
+        INSERT INTO signal_stats (symbol, direction, signals, confidence_sum)
+        VALUES (NEW.symbol, NEW.direction, 1, NEW.confidence)
+        ON CONFLICT (symbol, direction) DO UPDATE SET
+            signals = signals + 1, confidence_sum = confidence_sum + excluded.confidence_sum;
+        INSERT INTO signal_stats_hourly (bucket, signals, confidence_sum)
+        VALUES (substr(NEW.created_at, 1, 13), 1, NEW.confidence)
+        ON CONFLICT (bucket) DO UPDATE SET
+            signals = signals + 1, confidence_sum = confidence_sum + excluded.confidence_sum;
+    END
+    """,
+)
+DAILY_STATS_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS signal_stats_daily (
+        bucket TEXT PRIMARY KEY,
+        signals INTEGER NOT NULL,
+        confidence_sum REAL NOT NULL
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_signal_history_stats_daily AFTER INSERT ON signal_history
+    BEGIN
+        INSERT INTO signal_stats_daily (bucket, signals, confidence_sum)
+        VALUES (substr(NEW.created_at, 1, 10), 1, NEW.confidence)
+        ON CONFLICT (bucket) DO UPDATE SET
+            signals = signals + 1, confidence_sum = confidence_sum + excluded.confidence_sum;
+    END
+    """,
+)
+BACKFILL_DAILY_STATS = """
+    INSERT INTO signal_stats_daily (bucket, signals, confidence_sum)
+    SELECT substr(created_at, 1, 10), COUNT(*), SUM(confidence) FROM signal_history GROUP BY 1
+"""
+OUTCOME_STATS_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS signal_outcome_stats (
+        outcome TEXT PRIMARY KEY,
+        signals INTEGER NOT NULL,
+        r_sum REAL NOT NULL
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_signal_history_outcome AFTER UPDATE OF outcome ON signal_history
+    WHEN OLD.outcome IS NULL AND NEW.outcome IS NOT NULL
+    BEGIN
+        INSERT INTO signal_outcome_stats (outcome, signals, r_sum)
+        VALUES (NEW.outcome, 1, COALESCE(NEW.r_multiple, 0))
+        ON CONFLICT (outcome) DO UPDATE SET signals = signals + 1, r_sum = r_sum + excluded.r_sum;
+    END
+    """,
+)
+BACKFILL_OUTCOME_STATS = """
+    INSERT INTO signal_outcome_stats (outcome, signals, r_sum)
+    SELECT outcome, COUNT(*), SUM(COALESCE(r_multiple, 0)) FROM signal_history WHERE outcome IS NOT NULL GROUP BY outcome
+"""
+BACKFILL_STATS = (
+    """
+    INSERT INTO signal_stats (symbol, direction, signals, confidence_sum)
+    SELECT symbol, direction, COUNT(*), SUM(confidence) FROM signal_history GROUP BY symbol, direction
+    """,
+    """
+    INSERT INTO signal_stats_hourly (bucket, signals, confidence_sum)
+    SELECT substr(created_at, 1, 13), COUNT(*), SUM(confidence) FROM signal_history GROUP BY 1
+    """,
+)
+STATS_WINDOWS = {"24h": timedelta(days=1), "7d": timedelta(days=7), "30d": timedelta(days=30)}
+
+
+def _iso(value: datetime | str) -> str:
+    """Normalise a bound to naive UTC ISO text for comparison with ``created_at``.
+
+    ``created_at`` holds UTC ISO text, with a ``+00:00`` suffix for aware timestamps (SignalEngine)
+    and without one for naive ``datetime.utcnow`` defaults. A naive bound orders correctly against
+    both forms, since the suffix only sorts a row after a bound for the same instant.
+    """
+    stamp = datetime.fromisoformat(value) if isinstance(value, str) else value
+    if stamp.tzinfo is not None:
+        stamp = stamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return stamp.isoformat()
 
 
 class HistoryStore:
+    """SQLite signal history: one long-lived writer connection plus a reader connection per thread (WAL)."""
+
     def __init__(self, db_path: str | None = None) -> None:
         self.db_path = db_path or settings.history_db_path
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._write_lock = threading.Lock()
+        self._local = threading.local()
+        self._readers: list[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._writer = self._connect(check_same_thread=False)
         self._init_db()
 
-    def _conn(self) -> sqlite3.Connection:
-        return sqlite3.connect(self.db_path)
+    def _connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=check_same_thread, cached_statements=256)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    def close(self) -> None:
+        with self._readers_lock:
+            readers, self._readers = self._readers, []
+        for conn in readers:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                pass  # owned by another thread; it is released with that thread
+        with self._write_lock:
+            self._writer.close()
 
     def _init_db(self) -> None:
-        with self._conn() as conn:
+        with self._write_lock, self._writer as conn:
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS signal_history (
@@ -41,73 +209,254 @@ class HistoryStore:
                 )
                 """
             )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_signal_history_symbol_id ON signal_history (symbol, id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_signal_history_created_at ON signal_history (created_at)")
+            fresh = conn.execute("SELECT name FROM sqlite_master WHERE name = 'signal_stats'").fetchone() is None
+            for statement in STATS_SCHEMA:
+                conn.execute(statement)
+            if fresh:
+                # First start on a database written before the aggregates existed.
+                for statement in BACKFILL_STATS:
+                    conn.execute(statement)
+            fresh = conn.execute("SELECT name FROM sqlite_master WHERE name = 'signal_stats_daily'").fetchone() is None
+            for statement in DAILY_STATS_SCHEMA:
+                conn.execute(statement)
+            if fresh:
+                conn.execute(BACKFILL_DAILY_STATS)
+
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(signal_history)")}
+            for column, kind in OUTCOME_SCHEMA.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE signal_history ADD COLUMN {column} {kind}")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_signal_history_open ON signal_history (created_at) WHERE outcome IS NULL")
+            fresh = conn.execute("SELECT name FROM sqlite_master WHERE name = 'signal_outcome_stats'").fetchone() is None
+            for statement in OUTCOME_STATS_SCHEMA:
+                conn.execute(statement)
+            if fresh:
+                conn.execute(BACKFILL_OUTCOME_STATS)
 
     def save_signal(self, signal: Signal, meta: dict[str, Any] | None = None) -> None:
-        payload = asdict(signal)
-        payload["created_at"] = signal.created_at.isoformat()
-        meta_json = json.dumps(meta or {}, ensure_ascii=False)
-        with self._conn() as conn:
-            conn.execute(
-                """
-                INSERT INTO signal_history (
-                    created_at, symbol, direction, entry, stop_loss,
-                    tp1, tp2, tp3, rr, confidence, why, meta_json
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    payload["created_at"],
-                    signal.symbol,
-                    signal.direction,
-                    signal.entry,
-                    signal.stop_loss,
-                    signal.tp1,
-                    signal.tp2,
-                    signal.tp3,
-                    signal.rr,
-                    signal.confidence,
-                    signal.why,
-                    meta_json,
-                ),
-            )
+        self.save_signals([(signal, meta)])
 
-    def fetch_signals(self, symbol: str | None = None, limit: int = 100) -> list[dict[str, Any]]:
-        query = "SELECT created_at,symbol,direction,entry,stop_loss,tp1,tp2,tp3,rr,confidence,why,meta_json FROM signal_history"
-        params: list[Any] = []
-        if symbol:
-            query += " WHERE symbol = ?"
-            params.append(symbol)
-        query += " ORDER BY id DESC LIMIT ?"
-        params.append(limit)
+    def save_signals(self, items: list[tuple[Signal, dict[str, Any] | None]]) -> None:
+        """Insert many signals in one transaction."""
+        rows = [
+            (
+                signal.created_at.isoformat(),
+                signal.symbol,
+                signal.direction,
+                signal.entry,
+                signal.stop_loss,
+                signal.tp1,
+                signal.tp2,
+                signal.tp3,
+                signal.rr,
+                signal.confidence,
+                signal.why,
+                json.dumps(meta or {}, ensure_ascii=False),
+            )
+            for signal, meta in items
+        ]
+        if not rows:
+            return
+        with self._write_lock, self._writer as conn:
+            conn.executemany(INSERT_SIGNAL, rows)
 
-        with self._conn() as conn:
-            rows = conn.execute(query, params).fetchall()
+    def fetch_signals(
+        self,
+        symbol: str | None = None,
+        limit: int = 100,
+        before_id: int | None = None,
+        since: datetime | str | None = None,
+        until: datetime | str | None = None,
+    ) -> list[dict[str, Any]]:
+        """Newest-first page of signals; pass the last item's ``id`` as ``before_id`` for the next page."""
+        where, params = self._filters(symbol, since, until)
+        if before_id is not None:
+            where.append("id < ?")
+            params.append(before_id)
+        rows = self._reader().execute(
+            f"SELECT id,{SIGNAL_COLUMNS},{OUTCOME_COLUMNS} FROM signal_history {self._where(where)} ORDER BY id DESC LIMIT ?",
+            (*params, limit),
+        ).fetchall()
 
         result = []
         for r in rows:
             result.append(
                 {
-                    "created_at": r[0],
-                    "symbol": r[1],
-                    "direction": r[2],
-                    "entry": r[3],
-                    "stop_loss": r[4],
-                    "tp1": r[5],
-                    "tp2": r[6],
-                    "tp3": r[7],
-                    "rr": r[8],
-                    "confidence": r[9],
-                    "why": r[10],
-                    "meta": json.loads(r[11] or "{}"),
+                    "id": r[0],
+                    "created_at": r[1],
+                    "symbol": r[2],
+                    "direction": r[3],
+                    "entry": r[4],
+                    "stop_loss": r[5],
+                    "tp1": r[6],
+                    "tp2": r[7],
+                    "tp3": r[8],
+                    "rr": r[9],
+                    "confidence": r[10],
+                    "why": r[11],
+                    "meta": json.loads(r[12] or "{}"),
+                    "outcome": r[13],
+                    "tp_hits": r[14],
+                    "r_multiple": r[15],
+                    "mae_r": r[16],
+                    "mfe_r": r[17],
+                    "time_to_outcome_sec": r[18],
+                    "resolved_at": r[19],
                 }
             )
         return result
 
+    def iter_signals(
+        self,
+        symbol: str | None = None,
+        since: datetime | str | None = None,
+        until: datetime | str | None = None,
+        after_id: int | None = None,
+        batch_size: int = 1000,
+    ) -> Iterator[tuple]:
+        """Oldest-first raw rows (``EXPORT_COLUMNS`` order, meta_json left as text) in keyset batches.
+
+        Each batch is its own short query, so no read transaction is held between batches and the
+        generator can be consumed from any thread.
+        """
+        where, params = self._filters(symbol, since, until)
+        where.append("id > ?")
+        last_id = after_id or 0
+        sql = f"SELECT id,{SIGNAL_COLUMNS},{OUTCOME_COLUMNS} FROM signal_history {self._where(where)} ORDER BY id LIMIT ?"
+        while True:
+            rows = self._reader().execute(sql, (*params, last_id, batch_size)).fetchall()
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][0]
+
+    @staticmethod
+    def _filters(symbol: str | None, since: datetime | str | None, until: datetime | str | None) -> tuple[list[str], list[Any]]:
+        where: list[str] = []
+        params: list[Any] = []
+        if symbol:
+            where.append("symbol = ?")
+            params.append(symbol)
+        if since is not None:
+            where.append("created_at >= ?")
+            params.append(_iso(since))
+        if until is not None:
+            where.append("created_at < ?")
+            params.append(_iso(until))
+        return where, params
+
+    @staticmethod
+    def _where(clauses: list[str]) -> str:
+        return f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
     def stats(self) -> dict[str, float]:
-        with self._conn() as conn:
-            total = conn.execute("SELECT COUNT(*) FROM signal_history").fetchone()[0]
-            avg_conf = conn.execute("SELECT COALESCE(AVG(confidence),0) FROM signal_history").fetchone()[0]
-            last_day = conn.execute(
-                "SELECT COUNT(*) FROM signal_history WHERE created_at >= ?",
-                ((datetime.utcnow() - timedelta(days=1)).isoformat(),),
-            ).fetchone()[0]
-        return {"total_signals": float(total), "avg_confidence": float(avg_conf), "signals_last_24h": float(last_day)}
+        """Totals from the aggregate tables; the 24h/7d/30d windows are exact (see ``_window_signals``)."""
+        conn = self._reader()
+        rows = conn.execute("SELECT direction, SUM(signals), SUM(confidence_sum) FROM signal_stats GROUP BY direction").fetchall()
+        by_direction = {direction: count for direction, count, _ in rows}
+        total = sum(by_direction.values())
+        confidence_sum = sum(value for _, _, value in rows)
+        result = {
+            "total_signals": float(total),
+            "avg_confidence": float(confidence_sum / total) if total else 0.0,
+            "long_signals": float(by_direction.get("LONG", 0)),
+            "short_signals": float(by_direction.get("SHORT", 0)),
+        }
+        now = datetime.utcnow()
+        for label, span in STATS_WINDOWS.items():
+            result[f"signals_last_{label}"] = float(self._window_signals(conn, now - span))
+        result.update(self._outcome_stats(conn))
+        return result
+
+    @staticmethod
+    def _window_signals(conn: sqlite3.Connection, since: datetime) -> int:
+        """Signals created at or after ``since`` (naive UTC).
+
+        Whole days after the boundary day come from the day buckets, the rest of the boundary day
+        from its hour buckets (at most 23) and the boundary hour from the raw rows (an index range
+        on ``created_at``), so a 30d window reads about 30 + 23 aggregate rows.
+        """
+        hour = since.replace(minute=0, second=0, microsecond=0)
+        next_day = (hour.replace(hour=0) + timedelta(days=1)).strftime("%Y-%m-%d")
+        days = conn.execute(
+            "SELECT COALESCE(SUM(signals), 0) FROM signal_stats_daily WHERE bucket > ?", (since.strftime("%Y-%m-%d"),)
+        ).fetchone()[0]
+        hours = conn.execute(
+            "SELECT COALESCE(SUM(signals), 0) FROM signal_stats_hourly WHERE bucket > ? AND bucket < ?",
+            (since.strftime("%Y-%m-%dT%H"), next_day),
+        ).fetchone()[0]
+        partial = conn.execute(
+            "SELECT COUNT(*) FROM signal_history WHERE created_at >= ? AND created_at < ?",
+            (_iso(since), _iso(hour + timedelta(hours=1))),
+        ).fetchone()[0]
+        return days + hours + partial
+
+    def _outcome_stats(self, conn: sqlite3.Connection) -> dict[str, float]:
+        outcomes = {outcome: (count, r_sum) for outcome, count, r_sum in conn.execute("SELECT outcome, signals, r_sum FROM signal_outcome_stats")}
+        wins = sum(outcomes.get(outcome, (0, 0.0))[0] for outcome in WIN_OUTCOMES)
+        losses = outcomes.get("sl", (0, 0.0))[0]
+        closed = wins + losses
+        return {
+            "resolved_signals": float(sum(count for count, _ in outcomes.values())),
+            "wins": float(wins),
+            "losses": float(losses),
+            "expired": float(outcomes.get("expired", (0, 0.0))[0]),
+            "winrate": round(wins / closed * 100, 2) if closed else 0.0,
+            "avg_r": float(sum(r_sum for _, r_sum in outcomes.values()) / closed) if closed else 0.0,
+        }
+
+    def performance_snapshot(self, snapshot: PerformanceSnapshot | None = None) -> PerformanceSnapshot:
+        """Fill wins/losses/winrate of a PerformanceSnapshot from resolved signal outcomes."""
+        snapshot = snapshot or PerformanceSnapshot()
+        outcome = self._outcome_stats(self._reader())
+        snapshot.wins = int(outcome["wins"])
+        snapshot.losses = int(outcome["losses"])
+        snapshot.total_trades = snapshot.wins + snapshot.losses
+        snapshot.winrate = outcome["winrate"]
+        return snapshot
+
+    def open_signals(self, since: datetime | str) -> list[dict[str, Any]]:
+        """Unresolved signals created at or after ``since``, oldest first."""
+        rows = self._reader().execute(
+            "SELECT created_at, symbol, direction, entry, stop_loss, tp1, tp2, tp3 FROM signal_history "
+            "WHERE outcome IS NULL AND created_at >= ? ORDER BY created_at",
+            (_iso(since),),
+        ).fetchall()
+        keys = ("created_at", "symbol", "direction", "entry", "stop_loss", "tp1", "tp2", "tp3")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def save_outcomes(self, outcomes: list[dict[str, Any]]) -> None:
+        """Write resolutions keyed by (symbol, created_at); already resolved rows are left alone."""
+        rows = [
+            (
+                item["outcome"],
+                item["tp_hits"],
+                item["r_multiple"],
+                item["mae_r"],
+                item["mfe_r"],
+                item["time_to_outcome_sec"],
+                item["resolved_at"],
+                item["symbol"],
+                item["created_at"],
+            )
+            for item in outcomes
+        ]
+        if not rows:
+            return
+        with self._write_lock, self._writer as conn:
+            conn.executemany(UPDATE_OUTCOME, rows)
+
+    def symbol_stats(self) -> dict[str, dict[str, float]]:
+        """Per-symbol signal counts by direction and average confidence."""
+        result: dict[str, dict[str, float]] = {}
+        for symbol, direction, count, confidence_sum in self._reader().execute(
+            "SELECT symbol, direction, signals, confidence_sum FROM signal_stats ORDER BY symbol"
+        ):
+            entry = result.setdefault(symbol, {"total_signals": 0.0, "long_signals": 0.0, "short_signals": 0.0, "avg_confidence": 0.0})
+            previous = entry["total_signals"]
+            entry["total_signals"] = previous + count
+            entry[f"{direction.lower()}_signals"] = float(count)
+            entry["avg_confidence"] = (entry["avg_confidence"] * previous + confidence_sum) / entry["total_signals"]
+        return result
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any
+
+from app.config import settings
+from app.models import Signal
+from app.storage.history_store import HistoryStore
+
+Item = tuple[Signal, dict[str, Any] | None]
+
+logger = logging.getLogger(__name__)
+SHUTDOWN_ATTEMPTS = 3
+
+
+class HistoryWriter:
+    """Write-behind queue for HistoryStore.
+
+    ``submit`` only enqueues (waiting when the queue is full, which is the backpressure); a
+    background task commits batches of up to ``batch_size`` signals in one transaction at least
+    every ``flush_interval`` seconds, off the event loop. ``stop`` drains and flushes the queue.
+
+    A failed batch is retried with exponential backoff (capped at ``retry_backoff_max``) and only
+    acknowledged once committed; meanwhile the queue fills up and ``submit`` blocks. During
+    ``stop`` a batch gets ``SHUTDOWN_ATTEMPTS`` tries before it is logged and counted as dropped.
+    """
+
+    def __init__(
+        self,
+        history: HistoryStore,
+        batch_size: int | None = None,
+        flush_interval: float | None = None,
+        max_queue: int | None = None,
+        retry_backoff: float | None = None,
+        retry_backoff_max: float | None = None,
+    ) -> None:
+        self.history = history
+        self.batch_size = max(batch_size or settings.history_batch_size, 1)
+        self.flush_interval = settings.history_flush_interval_sec if flush_interval is None else flush_interval
+        self.retry_backoff = settings.history_retry_backoff_sec if retry_backoff is None else retry_backoff
+        self.retry_backoff_max = settings.history_retry_backoff_max_sec if retry_backoff_max is None else retry_backoff_max
+        self._queue: asyncio.Queue[Item] = asyncio.Queue(maxsize=max_queue or settings.history_queue_max)
+        self._task: asyncio.Task | None = None
+        self._closing = False
+        self.written = 0
+        self.batches = 0
+        self.failures = 0
+        self.dropped = 0
+        self.last_flush_ms = 0.0
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._closing = False
+            self._task = asyncio.create_task(self._run())
+
+    async def submit(self, signal: Signal, meta: dict[str, Any] | None = None) -> None:
+        if self._closing:
+            raise RuntimeError("HistoryWriter is stopped")
+        await self._queue.put((signal, meta))
+
+    async def _next_batch(self) -> list[Item]:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._closing:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _flush(self, batch: list[Item]) -> None:
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(self.history.save_signals, batch)
+                break
+            except Exception:
+                attempt += 1
+                self.failures += 1
+                if self._closing and attempt >= SHUTDOWN_ATTEMPTS:
+                    logger.exception("Dropping %d history rows after %d failed writes during shutdown", len(batch), attempt)
+                    self.dropped += len(batch)
+                    self._done(batch)
+                    return
+                delay = min(self.retry_backoff * 2 ** (attempt - 1), self.retry_backoff_max)
+                logger.exception("History write of %d rows failed (attempt %d), retrying in %.2fs", len(batch), attempt, delay)
+                await asyncio.sleep(delay)
+        self._done(batch)
+        self.written += len(batch)
+        self.batches += 1
+        self.last_flush_ms = (time.perf_counter() - started) * 1000
+
+    def _done(self, batch: list[Item]) -> None:
+        for _ in batch:
+            self._queue.task_done()
+
+    async def _run(self) -> None:
+        while True:
+            await self._flush(await self._next_batch())
+
+    async def flush(self) -> None:
+        """Wait until everything submitted so far is committed."""
+        await self._queue.join()
+
+    async def stop(self) -> None:
+        self._closing = True
+        if self._task is not None:
+            await self._queue.join()
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Anything left (e.g. the task was never started) is written synchronously here.
+        leftover: list[Item] = []
+        while not self._queue.empty():
+            leftover.append(self._queue.get_nowait())
+        if leftover:
+            await self._flush(leftover)
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "queued": float(self._queue.qsize()),
+            "written": float(self.written),
+            "batches": float(self.batches),
+            "failures": float(self.failures),
+            "dropped": float(self.dropped),
+            "last_flush_ms": self.last_flush_ms,
+        }
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 
 
@@ -31,3 +32,35 @@ def detect_structure(df: pd.DataFrame) -> dict:
         "bos": bos,
         "choch": choch,
     }
+
+
+def detect_structure_all(df: pd.DataFrame) -> pd.DataFrame:
+    """``detect_structure`` for every bar at once; rows with fewer than 5 bars of history are ``valid=False``."""
+    high, low, close = df["high"], df["low"], df["close"]
+    h2, h4 = high.shift(2), high.shift(4)
+    l2, l4 = low.shift(2), low.shift(4)
+
+    hh = (high > h2) & (h2 > h4)
+    hl = (low > l2) & (l2 > l4)
+    lh = (high < h2) & (h2 < h4)
+    ll = (low < l2) & (l2 < l4)
+
+    prior_high = high.shift(1).rolling(5, min_periods=1).max()
+    prior_low = low.shift(1).rolling(5, min_periods=1).min()
+    bos = (close > prior_high) | (close < prior_low)
+    choch = (hh & ll) | (lh & hl)
+
+    trend = np.where(hh & hl, "bullish", np.where(lh & ll, "bearish", "range"))
+    return pd.DataFrame(
+        {
+            "trend": trend,
+            "hh": hh,
+            "hl": hl,
+            "lh": lh,
+            "ll": ll,
+            "bos": bos,
+            "choch": choch,
+            "valid": np.arange(len(df)) >= 4,
+        },
+        index=df.index,
+    )
@@ -1,18 +1,60 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import datetime, timezone
 
+import numpy as np
 import pandas as pd
 
 from app.config import settings
 from app.models import Signal
-from app.risk.risk_engine import RiskEngine
-from app.strategy.market_structure import detect_structure
+from app.risk.risk_engine import RiskEngine, RiskParams
+from app.strategy.market_structure import detect_structure, detect_structure_all
+
+# Bit i of the ``reasons`` mask returned by ``evaluate_all`` stands for REASONS[i].
+REASONS = (
+    "HTF/LTF trend alignment",
+    "Clean BOS with no CHoCH conflict",
+    "Fresh FVG imbalance",
+    "Healthy volatility regime",
+    "Strong trend strength (ADX)",
+    "Volume flow confirms move",
+    "Session filter passed",
+    "Liquidity pool identified",
+)
+
+
+def reasons_text(mask: int) -> str:
+    return "; ".join(reason for bit, reason in enumerate(REASONS) if int(mask) >> bit & 1)
+
+
+@dataclass(frozen=True, slots=True)
+class SignalParams:
+    rsi_long: float = 52.0
+    rsi_short: float = 48.0
+    adx_min: float = 18.0
+    adx_strong: float = 22.0
+    volatility_min: float = 0.002
+    volatility_max: float = 0.03
+    liquidity_lookback: int = 8
+    trend_weight: int = 18
+    bos_weight: int = 16
+    fvg_weight: int = 12
+    volatility_weight: int = 12
+    adx_weight: int = 12
+    flow_weight: int = 10
+    liquidity_weight: int = 10
+    confidence_threshold: float | None = None  # None -> settings.confidence_threshold
+
+    @property
+    def threshold(self) -> float:
+        return settings.confidence_threshold if self.confidence_threshold is None else self.confidence_threshold
 
 
 class SignalEngine:
-    def __init__(self) -> None:
-        self.risk_engine = RiskEngine()
+    def __init__(self, params: SignalParams | None = None, risk_params: RiskParams | None = None) -> None:
+        self.params = params or SignalParams()
+        self.risk_engine = RiskEngine(risk_params)
 
     def evaluate(self, symbol: str, df: pd.DataFrame) -> Signal | None:
         row = df.iloc[-1]
@@ -22,11 +64,12 @@ class SignalEngine:
             return None
 
         confidence, why = self._confidence_and_why(row, structure, direction)
-        if confidence < settings.confidence_threshold:
+        if confidence < self.params.threshold:
             return None
 
         entry = float(row["close"])
-        liquidity = float(df["low"].tail(8).min()) if direction == "LONG" else float(df["high"].tail(8).max())
+        lookback = self.params.liquidity_lookback
+        liquidity = float(df["low"].tail(lookback).min()) if direction == "LONG" else float(df["high"].tail(lookback).max())
         plan = self.risk_engine.build_levels(direction, entry, float(row["atr"]), liquidity)
 
         return Signal(
@@ -43,21 +86,105 @@ class SignalEngine:
             created_at=datetime.now(timezone.utc),
         )
 
-    @staticmethod
-    def _direction_from_layers(row: pd.Series, structure: dict) -> str | None:
+    def evaluate_all(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Per-bar ``evaluate`` for the whole frame in one pass.
+
+        Row ``i`` matches ``evaluate(symbol, df.iloc[: i + 1])``: ``signal`` is True where that call
+        returns a Signal, and the level columns are NaN elsewhere.
+        """
+        p = self.params
+        structure = detect_structure_all(df)
+        close = df["close"].to_numpy(dtype=float)
+        atr = df["atr"].to_numpy(dtype=float)
+        ema_9, ema_21, ema_200 = (df[col].to_numpy(dtype=float) for col in ("ema_9", "ema_21", "ema_200"))
+        macd_hist = df["macd_hist"].to_numpy(dtype=float)
+        rsi = df["rsi"].to_numpy(dtype=float)
+        adx = df["adx"].to_numpy(dtype=float)
+        cmf = df["cmf"].to_numpy(dtype=float)
+        valid = structure["valid"].to_numpy()
+        trend = structure["trend"].to_numpy()
+
+        long = (
+            valid & (trend == "bullish") & (ema_9 > ema_21) & (ema_21 > ema_200) & (macd_hist > 0) & (rsi > p.rsi_long) & (adx > p.adx_min)
+        )
+        short = (
+            valid
+            & ~long
+            & (trend == "bearish")
+            & (ema_9 < ema_21)
+            & (ema_21 < ema_200)
+            & (macd_hist < 0)
+            & (rsi < p.rsi_short)
+            & (adx > p.adx_min)
+        )
+        has_direction = long | short
+
+        hour = df["timestamp"].dt.tz_convert("UTC").dt.hour.to_numpy()
+        session = np.where((hour >= 6) & (hour <= 16), 12, np.where(hour <= 5, 5, 8))
+        ratio = np.divide(atr, close, out=np.full(len(df), np.nan), where=close != 0)
+        layers = (
+            np.where(long, ema_21 > ema_200, ema_21 < ema_200),
+            (structure["bos"] & ~structure["choch"]).to_numpy(),
+            (long & (df["fvg_up"].to_numpy() > 0)) | (short & (df["fvg_down"].to_numpy() > 0)),
+            (atr > 0) & (p.volatility_min < ratio) & (ratio < p.volatility_max),
+            adx > p.adx_strong,
+            (long & (cmf > 0)) | (short & (cmf < 0)),
+            np.ones(len(df), dtype=bool),
+            (long & (df["eq_lows"].to_numpy() > 0)) | (short & (df["eq_highs"].to_numpy() > 0)),
+        )
+        weights = (p.trend_weight, p.bos_weight, p.fvg_weight, p.volatility_weight, p.adx_weight, p.flow_weight, 0, p.liquidity_weight)
+
+        score = session.copy()
+        mask = np.zeros(len(df), dtype=np.int64)
+        for bit, (hit, weight) in enumerate(zip(layers, weights)):
+            score += np.where(hit, weight, 0)
+            mask |= hit.astype(np.int64) << bit
+        confidence = np.where(has_direction, np.minimum(score.astype(float), 99.0), np.nan)
+        mask = np.where(has_direction, mask, 0)
+        signal = has_direction & (confidence >= p.threshold)
+
+        out = pd.DataFrame(
+            {
+                "direction": np.where(long, "LONG", np.where(short, "SHORT", None)),
+                "signal": signal,
+                "confidence": confidence,
+                "reasons": mask,
+            },
+            index=df.index,
+        )
+        out = pd.concat([structure.drop(columns="valid"), out], axis=1)
+
+        rows = np.flatnonzero(signal)
+        pool_low = df["low"].rolling(p.liquidity_lookback, min_periods=1).min().to_numpy()
+        pool_high = df["high"].rolling(p.liquidity_lookback, min_periods=1).max().to_numpy()
+        plans = self.risk_engine.build_levels_batch(
+            np.where(long[rows], "LONG", "SHORT"),
+            close[rows],
+            atr[rows],
+            np.where(long[rows], pool_low[rows], pool_high[rows]),
+        )
+        columns = {"entry": close[rows], "stop_loss": plans.stop_loss, "tp1": plans.tp1, "tp2": plans.tp2, "tp3": plans.tp3, "rr": plans.rr}
+        for col, planned in columns.items():
+            values = np.full(len(df), np.nan)
+            values[rows] = planned
+            out[col] = values
+        return out
+
+    def _direction_from_layers(self, row: pd.Series, structure: dict) -> str | None:
+        p = self.params
         bullish = (
             structure["trend"] == "bullish"
             and row["ema_9"] > row["ema_21"] > row["ema_200"]
             and row["macd_hist"] > 0
-            and row["rsi"] > 52
-            and row["adx"] > 18
+            and row["rsi"] > p.rsi_long
+            and row["adx"] > p.adx_min
         )
         bearish = (
             structure["trend"] == "bearish"
             and row["ema_9"] < row["ema_21"] < row["ema_200"]
             and row["macd_hist"] < 0
-            and row["rsi"] < 48
-            and row["adx"] > 18
+            and row["rsi"] < p.rsi_short
+            and row["adx"] > p.adx_min
         )
         if bullish:
             return "LONG"
@@ -75,32 +202,33 @@ class SignalEngine:
         return 8
 
     def _confidence_and_why(self, row: pd.Series, structure: dict, direction: str) -> tuple[float, str]:
+        p = self.params
         score = 0
         reasons = []
 
         trend_ok = (row["ema_21"] > row["ema_200"]) if direction == "LONG" else (row["ema_21"] < row["ema_200"])
         if trend_ok:
-            score += 18
+            score += p.trend_weight
             reasons.append("HTF/LTF trend alignment")
 
         if structure["bos"] and not structure["choch"]:
-            score += 16
+            score += p.bos_weight
             reasons.append("Clean BOS with no CHoCH conflict")
 
         if (direction == "LONG" and row["fvg_up"] > 0) or (direction == "SHORT" and row["fvg_down"] > 0):
-            score += 12
+            score += p.fvg_weight
             reasons.append("Fresh FVG imbalance")
 
-        if row["atr"] > 0 and 0.002 < (row["atr"] / row["close"]) < 0.03:
-            score += 12
+        if row["atr"] > 0 and p.volatility_min < (row["atr"] / row["close"]) < p.volatility_max:
+            score += p.volatility_weight
             reasons.append("Healthy volatility regime")
 
-        if row["adx"] > 22:
-            score += 12
+        if row["adx"] > p.adx_strong:
+            score += p.adx_weight
             reasons.append("Strong trend strength (ADX)")
 
         if (direction == "LONG" and row["cmf"] > 0) or (direction == "SHORT" and row["cmf"] < 0):
-            score += 10
+            score += p.flow_weight
             reasons.append("Volume flow confirms move")
 
         session_bonus = self._session_score(row["timestamp"])
@@ -109,7 +237,7 @@ class SignalEngine:
 
         liq = (row["eq_lows"] > 0 and direction == "LONG") or (row["eq_highs"] > 0 and direction == "SHORT")
         if liq:
-            score += 10
+            score += p.liquidity_weight
             reasons.append("Liquidity pool identified")
 
         confidence = min(float(score), 99.0)
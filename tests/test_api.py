@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory) -> TestClient:
+    root = tmp_path_factory.mktemp("api")
+    patch = pytest.MonkeyPatch()
+    patch.setattr(settings, "history_db_path", str(root / "history.db"))
+    patch.setattr(settings, "series_store_dir", str(root / "series"))
+    patch.setattr(settings, "backfill_checkpoint_path", str(root / "backfill.json"))
+    patch.setattr(settings, "paper_state_path", str(root / "paper.json"))
+    patch.setattr(settings, "candle_cache_dir", str(root / "candles"))
+    main = importlib.import_module("app.main")
+    yield TestClient(main.app)  # no lifespan: the scanner and writer are not started
+    patch.undo()
+
+
+@pytest.mark.parametrize("path", ["/api/history", "/api/history/export"])
+@pytest.mark.parametrize("query", ["since=garbage", "until=2024-13-01"])
+def test_history_rejects_bad_bounds(client: TestClient, path: str, query: str) -> None:
+    assert client.get(f"{path}?{query}").status_code == 422
+
+
+@pytest.mark.parametrize("query", ["since=2024-01-01", "since=2024-01-01T00:00:00Z&until=2024-02-01T00:00:00"])
+def test_history_accepts_iso_bounds(client: TestClient, query: str) -> None:
+    assert client.get(f"/api/history?{query}").json() == {"items": [], "next_cursor": None}
+    assert client.get(f"/api/history/export?{query}").status_code == 200
+
+
+@pytest.mark.parametrize(
+    "query",
+    ["start=garbage", "end=2024-13-01", "start=2024-02-01&end=2024-01-01", "limit=0"],
+    ids=["bad-start", "bad-end", "start-after-end", "zero-limit"],
+)
+def test_candles_rejects_bad_query(client: TestClient, query: str) -> None:
+    assert client.get(f"/api/candles?{query}").status_code == 422
+
+
+def test_candles_reads_stored_range(client: TestClient) -> None:
+    import pandas as pd
+
+    from app.main import market
+
+    frame = pd.DataFrame({"timestamp": pd.date_range("2024-01-01", periods=4, freq="15min", tz="UTC"), "close": [1.0, 2.0, 3.0, 4.0]})
+    market.series.append("APIUSDT", "15", frame)
+    body = client.get("/api/candles?symbol=APIUSDT&start=2024-01-01T00:15:00&end=2024-01-01T00:30:00Z").json()
+    assert body["rows"] == 2
+    assert body["columns"]["close"] == [2.0, 3.0]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {},
+        {"start": "not a date"},
+        {"start": "2024-02-01", "end": "2024-01-01"},
+        {"start": "2024-01-01", "end": "2024-01-01T00:00:00Z"},
+        {"start": "2999-01-01"},
+        {"start": "2024-01-01", "intervals": ["7"]},
+    ],
+    ids=["missing-start", "bad-start", "start-after-end", "empty-range", "future-start", "bad-interval"],
+)
+def test_backfill_rejects_bad_request(client: TestClient, body: dict) -> None:
+    assert client.post("/api/backfill", json=body).status_code == 422
+
+
+def test_backfill_starts_with_parsed_bounds(client: TestClient, monkeypatch) -> None:
+    from app import main
+
+    calls = []
+
+    def run(symbols, intervals, start, end):
+        calls.append((symbols, intervals, start, end))  # recorded when the task is created
+        return asyncio.sleep(0)
+
+    monkeypatch.setattr(main.backfiller, "run", run)
+    body = client.post("/api/backfill", json={"start": "2024-01-01", "symbols": ["ETHUSDT"], "intervals": ["60"]}).json()
+    assert body == {"ok": True, "symbols": ["ETHUSDT"], "intervals": ["60"]}
+    assert calls and calls[0][2].isoformat() == "2024-01-01T00:00:00+00:00" and calls[0][3] is None
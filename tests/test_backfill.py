@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import httpx
+import numpy as np
+
+from app.data.backfill import Backfiller
+from app.data.bybit_async import AsyncBybitClient
+from app.data.series_store import SeriesStore
+
+STEP = 60_000  # interval "1"
+FIRST = 1_704_067_200_000  # 2024-01-01T00:00:00Z
+BARS = 350
+
+
+class _KlineServer:
+    """Stand-in for /v5/market/kline: newest-first pages of at most ``limit`` bars in [start, end]."""
+
+    def __init__(self, fail_on: int | None = None) -> None:
+        self.fail_on = fail_on
+        self.requests: list[dict[str, int]] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        params = {key: int(request.url.params[key]) for key in ("start", "end", "limit")}
+        self.requests.append(params)
+        if len(self.requests) == self.fail_on:
+            return httpx.Response(400, json={"retCode": 10001, "retMsg": "bad request"})
+        opens = [FIRST + i * STEP for i in range(BARS)]
+        page = [t for t in opens if params["start"] <= t <= params["end"]][-params["limit"] :]
+        rows = [[str(t), "1", "2", "0.5", str((t - FIRST) // STEP), "10", "10"] for t in reversed(page)]
+        return httpx.Response(200, json={"retCode": 0, "result": {"list": rows}})
+
+
+def _backfiller(server: _KlineServer, tmp_path) -> Backfiller:
+    client = AsyncBybitClient(base_url="http://bybit.test", transport=httpx.MockTransport(server), enabled=True)
+    return Backfiller(
+        client=client,
+        store=SeriesStore(str(tmp_path / "series")),
+        checkpoint_path=str(tmp_path / "backfill.json"),
+        requests_per_sec=1000,
+        concurrency=2,
+        page_size=100,
+        flush_rows=100,
+    )
+
+
+def _run(backfiller: Backfiller) -> dict:
+    async def scenario() -> dict:
+        try:
+            return await backfiller.run(["BTCUSDT"], ["1"], FIRST, FIRST + (BARS - 1) * STEP)
+        finally:
+            await backfiller.aclose()
+
+    return asyncio.run(scenario())
+
+
+def _stored_closes(tmp_path) -> np.ndarray:
+    return SeriesStore(str(tmp_path / "series")).read_arrays("BTCUSDT", "1", columns=["close"])["close"]
+
+
+def test_pages_backwards_into_the_store(tmp_path) -> None:
+    server = _KlineServer()
+    state = _run(_backfiller(server, tmp_path))["BTCUSDT:1"]
+
+    # Each page ends 1 ms before the oldest bar of the previous one.
+    ends = [FIRST + (BARS - 1) * STEP] + [FIRST + (BARS - 100 * i) * STEP - 1 for i in range(1, 4)]
+    assert [r["end"] for r in server.requests] == ends
+    assert state["done"] and state["rows"] == BARS and state["pages"] == 4
+    np.testing.assert_array_equal(_stored_closes(tmp_path), np.arange(BARS, dtype=float))
+
+
+def test_failure_checkpoints_progress_and_resume_continues(tmp_path) -> None:
+    failing = _KlineServer(fail_on=3)
+    state = _run(_backfiller(failing, tmp_path))["BTCUSDT:1"]
+
+    assert not state["done"] and "400" in state["error"]
+    saved = json.loads((tmp_path / "backfill.json").read_text(encoding="utf-8"))["BTCUSDT:1"]
+    assert saved["rows"] == 200 and saved["cursor"] == FIRST + (BARS - 200) * STEP - 1
+    np.testing.assert_array_equal(_stored_closes(tmp_path), np.arange(BARS - 200, BARS, dtype=float))
+
+    server = _KlineServer()
+    state = _run(_backfiller(server, tmp_path))["BTCUSDT:1"]
+    assert server.requests[0]["end"] == saved["cursor"]  # resumes where the checkpoint left off
+    assert state["done"] and state["rows"] == BARS and state["error"] is None
+    np.testing.assert_array_equal(_stored_closes(tmp_path), np.arange(BARS, dtype=float))
+
+    again = _KlineServer()
+    _run(_backfiller(again, tmp_path))
+    assert again.requests == []  # finished range is not fetched again
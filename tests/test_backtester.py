@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.backtest.backtester import Backtester
+
+LONG_LEVELS = ("LONG", 100.0, 95.0, 110.0, 120.0, 130.0)
+
+
+def _bars(rows: list[tuple[float, float, float, float]], start: str = "2024-01-01") -> pd.DataFrame:
+    frame = pd.DataFrame(rows, columns=["open", "high", "low", "close"])
+    frame.insert(0, "timestamp", pd.date_range(start, periods=len(rows), freq="15min", tz="UTC"))
+    return frame
+
+
+def _signals(n: int, at: dict[int, tuple], confidence: dict[int, float] | None = None) -> pd.DataFrame:
+    out = pd.DataFrame(
+        {
+            "signal": np.zeros(n, dtype=bool),
+            "direction": np.full(n, None, dtype=object),
+            "confidence": np.full(n, np.nan),
+            **{col: np.full(n, np.nan) for col in ("entry", "stop_loss", "tp1", "tp2", "tp3")},
+        }
+    )
+    for row, (direction, *levels) in at.items():
+        out.loc[row, ["signal", "direction", "confidence"]] = [True, direction, (confidence or {}).get(row, 90.0)]
+        out.loc[row, ["entry", "stop_loss", "tp1", "tp2", "tp3"]] = levels
+    return out
+
+
+def _backtester(**kwargs) -> Backtester:
+    options = {"initial_equity": 1000.0, "warmup": 0, "fee_bps": 0.0, "slippage_bps": 0.0, "risk_per_trade_pct": 1.0}
+    return Backtester(**{**options, **kwargs})
+
+
+def test_stop_fills_first_when_a_bar_touches_stop_and_target() -> None:
+    bars = _bars([(100, 100, 100, 100), (100, 131, 94, 100), (100, 100, 100, 100)])
+    result = _backtester().simulate("X", bars, _signals(3, {0: LONG_LEVELS}))
+    (trade,) = result["ledger"]
+    assert trade.exit_reason == "sl" and trade.exit == 95.0
+    assert trade.size == pytest.approx(2.0)  # 1% of 1000 over a 5.0 stop distance
+    assert trade.pnl == pytest.approx(-10.0) and trade.r_multiple == pytest.approx(-1.0)
+    assert trade.closed_at == bars["timestamp"].iloc[1]
+
+
+def test_stop_gap_fills_at_the_open() -> None:
+    bars = _bars([(100, 100, 100, 100), (90, 91, 89, 90)])
+    (trade,) = _backtester().simulate("X", bars, _signals(2, {0: LONG_LEVELS}))["ledger"]
+    assert trade.exit == 90.0 and trade.pnl == pytest.approx(-20.0)
+
+
+def test_targets_scale_out_in_thirds() -> None:
+    bars = _bars([(100, 100, 100, 100), (100, 112, 99, 111), (111, 125, 105, 120), (120, 121, 96, 100), (100, 131, 99, 130)])
+    (trade,) = _backtester().simulate("X", bars, _signals(5, {0: LONG_LEVELS}))["ledger"]
+    assert trade.exit_reason == "tp1+tp2+tp3"
+    assert trade.pnl == pytest.approx(2 / 3 * 10 + 2 / 3 * 20 + 2 / 3 * 30)
+    assert trade.closed_at == bars["timestamp"].iloc[4]
+
+
+def test_one_bar_can_run_through_several_targets_and_short_mirrors_long() -> None:
+    bars = _bars([(100, 100, 100, 100), (100, 100, 69, 70)])
+    short = ("SHORT", 100.0, 105.0, 90.0, 80.0, 70.0)
+    (trade,) = _backtester().simulate("X", bars, _signals(2, {0: short}))["ledger"]
+    assert trade.exit_reason == "tp1+tp2+tp3" and trade.pnl == pytest.approx(2 / 3 * (10 + 20 + 30))
+
+
+def test_stop_after_tp1_closes_the_remainder() -> None:
+    bars = _bars([(100, 100, 100, 100), (100, 112, 99, 111), (111, 111, 94, 95)])
+    (trade,) = _backtester().simulate("X", bars, _signals(3, {0: LONG_LEVELS}))["ledger"]
+    assert trade.exit_reason == "tp1+sl"
+    assert trade.pnl == pytest.approx(2 / 3 * 10 - 4 / 3 * 5)
+
+
+def test_open_trade_is_closed_at_the_last_close() -> None:
+    bars = _bars([(100, 100, 100, 100), (100, 104, 99, 103)])
+    (trade,) = _backtester().simulate("X", bars, _signals(2, {0: LONG_LEVELS}))["ledger"]
+    assert trade.exit_reason == "end" and trade.exit == 103.0 and trade.pnl == pytest.approx(6.0)
+
+
+def test_fees_and_slippage() -> None:
+    bars = _bars([(100, 100, 100, 100), (100, 112, 99, 111), (111, 111, 94, 95)])
+    result = _backtester(fee_bps=10.0, slippage_bps=20.0).simulate("X", bars, _signals(3, {0: LONG_LEVELS}))
+    (trade,) = result["ledger"]
+    size = 2.0  # sized on the signal entry, not the slipped fill
+    entry = 100.0 * 1.002
+    stop = 95.0 * 0.998  # market exit pays slippage; targets are limit fills and do not
+    gross = (110.0 - entry) * size / 3 + (stop - entry) * size * 2 / 3
+    fees = (entry * size + 110.0 * size / 3 + stop * size * 2 / 3) * 0.001
+    assert trade.entry == pytest.approx(entry)
+    assert trade.fees == pytest.approx(fees)
+    assert trade.slippage == pytest.approx((entry - 100.0) * size + (95.0 - stop) * size * 2 / 3)
+    assert trade.pnl == pytest.approx(gross - fees)
+    assert result["ending_equity"] == pytest.approx(round(1000.0 + gross - fees, 2))
+    assert result["fees"] == pytest.approx(round(fees, 4))
+
+
+def test_warmup_and_max_open_positions_skip_signals() -> None:
+    bars = _bars([(100, 100, 100, 100)] * 6)
+    signals = _signals(6, {0: LONG_LEVELS, 2: LONG_LEVELS, 3: LONG_LEVELS})
+    result = _backtester(warmup=1, max_open_positions=1).simulate("X", bars, signals)
+    (trade,) = result["ledger"]  # bar 0 is warmup, bar 3 finds bar 2's trade still open
+    assert trade.opened_at == bars["timestamp"].iloc[2] and trade.exit_reason == "end"
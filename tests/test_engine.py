@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from app.indicators.engine import IndicatorEngine
+from tests.test_streaming_parity import _candles
+
+
+def test_missing_input_columns_are_rejected() -> None:
+    candles = _candles(300, seed=1, base=100.0, step=0.4).drop(columns="volume")
+    with pytest.raises(ValueError, match="volume"):
+        IndicatorEngine().calculate(candles, features="signal")
+    with pytest.raises(ValueError, match="volume"):
+        IndicatorEngine().calculate_batch({"A": candles}, features="signal")
+    # The advisor set reads only high/low/close.
+    assert not IndicatorEngine().calculate(candles, features="advisor").empty
+
+
+def test_advisor_set_matches_dashboard_values() -> None:
+    candles = _candles(300, seed=2, base=100.0, step=0.4)
+    advisor = IndicatorEngine().calculate(candles, features="advisor")
+    dashboard = IndicatorEngine().calculate(candles, features="dashboard")
+    last = advisor.iloc[-1]
+    assert list(advisor.columns) == ["timestamp", "open", "high", "low", "close", "volume", "adx", "rsi", "atr"]
+    for col in ("adx", "rsi", "atr"):
+        assert last[col] == pytest.approx(dashboard.iloc[-1][col])
+
+
+def test_calculate_batch_matches_calculate_per_symbol() -> None:
+    frames = {f"S{i}": _candles(400, seed=i, base=base, step=base * 0.004) for i, base in enumerate((1.0, 100.0, 65000.0))}
+    stamps = frames["S0"]["timestamp"]
+    for frame in frames.values():
+        frame["timestamp"] = stamps
+    batch = IndicatorEngine().calculate_batch(frames, features="dashboard")
+    for symbol, frame in frames.items():
+        expected = IndicatorEngine().calculate(frame, features="dashboard")
+        pd.testing.assert_frame_equal(batch[symbol], expected, rtol=1e-9)
+
+
+def test_calculate_batch_rejects_unaligned_frames() -> None:
+    a = _candles(300, seed=1, base=100.0, step=0.4)
+    with pytest.raises(ValueError, match="equal-length"):
+        IndicatorEngine().calculate_batch({"A": a, "B": a.iloc[1:]})
+    shifted = a.assign(timestamp=a["timestamp"] + pd.Timedelta(minutes=15))
+    with pytest.raises(ValueError, match="same timestamps"):
+        IndicatorEngine().calculate_batch({"A": a, "B": shifted})
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import pytest
+
+from app.execution.fill_simulator import FillSimulator, walk_book
+
+BOOK = {
+    "bids": [[99.0, 1.0], [98.0, 2.0], [97.0, 3.0]],
+    "asks": [[101.0, 1.0], [102.0, 2.0], [103.0, 3.0]],
+}
+
+
+def _simulator() -> FillSimulator:
+    return FillSimulator(latency_ms=0.0, latency_jitter_ms=0.0, volatility_bps_per_sec=0.0, seed=1)
+
+
+def test_walk_book_partial_depth() -> None:
+    filled, vwap, touched = walk_book(BOOK["asks"], 2.5)
+    assert filled == pytest.approx(2.5) and touched == 2
+    assert vwap == pytest.approx((101.0 * 1.0 + 102.0 * 1.5) / 2.5)
+    assert walk_book(BOOK["asks"], 0.5) == (0.5, 101.0, 1)
+    assert walk_book([], 1.0)[0] == 0.0
+
+
+def test_fill_walks_the_side_of_the_order() -> None:
+    buy = _simulator().fill("buy", 2.5, BOOK)
+    assert buy.complete and buy.levels == 2 and buy.filled == pytest.approx(2.5)
+    assert buy.price == pytest.approx((101.0 + 102.0 * 1.5) / 2.5)
+    assert buy.reference == 100.0 and buy.slippage_bps == pytest.approx((buy.price / 100.0 - 1) * 10_000)
+
+    sell = _simulator().fill("sell", 3.0, BOOK, reference=99.0)
+    assert sell.price == pytest.approx((99.0 + 98.0 * 2.0) / 3.0)
+    assert sell.slippage_bps == pytest.approx((1 - sell.price / 99.0) * 10_000)
+
+
+def test_book_too_thin_prices_the_rest_at_the_worst_level() -> None:
+    fill = _simulator().fill("buy", 10.0, BOOK)
+    assert not fill.complete
+    assert fill.filled == pytest.approx(6.0) and fill.levels == 3
+    assert fill.price == pytest.approx((101.0 + 102.0 * 2 + 103.0 * 3 + 103.0 * 4) / 10.0)
+
+
+def test_missing_side_and_missing_profile_raise() -> None:
+    with pytest.raises(ValueError, match="no asks"):
+        _simulator().fill("buy", 1.0, {"bids": BOOK["bids"], "asks": []})
+    with pytest.raises(ValueError, match="no depth profile"):
+        _simulator().fill("sell", 1.0, reference=100.0)
+
+
+def test_profile_is_rescaled_to_the_reference() -> None:
+    simulator = _simulator()
+    simulator.set_profile(BOOK)
+    book = simulator.book_at(200.0)
+    assert book["asks"][0][0] == pytest.approx(202.0)
+    assert book["asks"][0][0] * book["asks"][0][1] == pytest.approx(101.0)  # notional is kept
+    assert simulator.fill("buy", 0.1, reference=200.0).price == pytest.approx(202.0)
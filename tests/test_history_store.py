@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models import Signal
+from app.storage.history_store import HistoryStore
+
+
+def _signal(created_at: datetime) -> Signal:
+    return Signal("BTCUSDT", "LONG", 100.0, 99.0, 101.0, 102.0, 103.0, 2.0, 90.0, "test", created_at=created_at)
+
+
+@pytest.mark.parametrize("aware", [True, False], ids=["aware", "naive"])
+def test_stats_windows_are_exact(tmp_path, aware: bool) -> None:
+    store = HistoryStore(str(tmp_path / "history.db"))
+    # One signal per minute for the last 30 hours, 30s off the minute so the window edge is clear;
+    # the 24h boundary falls inside an hour bucket.
+    now = datetime.now(timezone.utc) - timedelta(seconds=30)
+    stamps = [now - timedelta(minutes=i) for i in range(30 * 60)]
+    if not aware:
+        stamps = [stamp.replace(tzinfo=None) for stamp in stamps]
+    store.save_signals([(_signal(stamp), None) for stamp in stamps])
+
+    stats = store.stats()
+    assert stats["total_signals"] == 30 * 60
+    assert stats["signals_last_24h"] == 24 * 60
+    assert stats["signals_last_7d"] == 30 * 60
+    store.close()
+
+
+def test_long_windows_read_day_buckets(tmp_path) -> None:
+    store = HistoryStore(str(tmp_path / "history.db"))
+    # One signal every 10 minutes for 40 days: the 7d and 30d boundaries fall mid-day and mid-hour.
+    now = datetime.now(timezone.utc) - timedelta(seconds=30)
+    store.save_signals([(_signal(now - timedelta(minutes=10 * i)), None) for i in range(40 * 144)])
+
+    stats = store.stats()
+    assert stats["signals_last_24h"] == 144
+    assert stats["signals_last_7d"] == 7 * 144
+    assert stats["signals_last_30d"] == 30 * 144
+    days = store._reader().execute("SELECT COUNT(*), SUM(signals) FROM signal_stats_daily").fetchone()
+    assert days[0] in (40, 41) and days[1] == 40 * 144
+    store.close()
+
+
+def test_day_buckets_are_backfilled_on_reopen(tmp_path) -> None:
+    path = str(tmp_path / "history.db")
+    store = HistoryStore(path)
+    now = datetime.now(timezone.utc) - timedelta(seconds=30)
+    store.save_signals([(_signal(now - timedelta(hours=i)), None) for i in range(10 * 24)])
+    with store._connect() as conn:
+        # A database written before the day buckets existed.
+        conn.execute("DROP TRIGGER trg_signal_history_stats_daily")
+        conn.execute("DROP TABLE signal_stats_daily")
+    store.close()
+
+    store = HistoryStore(path)
+    assert store.stats()["signals_last_7d"] == 7 * 24
+    store.save_signal(_signal(datetime.now(timezone.utc)))
+    assert store.stats()["signals_last_30d"] == 10 * 24 + 1
+    store.close()
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from app.core.outcome_tracker import OutcomeTracker
+from app.models import Signal
+from app.storage.history_store import HistoryStore
+
+
+def test_resolution_is_stored_with_a_utc_resolved_at(tmp_path) -> None:
+    history = HistoryStore(str(tmp_path / "history.db"))
+    created = datetime(2024, 1, 1, 10, 5, tzinfo=timezone.utc)
+    signal = Signal("BTCUSDT", "LONG", 100.0, 99.0, 101.0, 102.0, 103.0, 2.0, 90.0, "test", created_at=created)
+    history.save_signal(signal)
+    tracker = OutcomeTracker(history, timeframe="15", expiry_hours=24)
+    tracker.track(signal)
+
+    candles = pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2024-01-01 10:00", periods=3, freq="15min", tz="UTC"),
+            "high": [100.5, 101.5, 100.2],
+            "low": [99.5, 99.8, 98.5],
+            "close": [100.2, 100.9, 98.8],
+        }
+    )
+    (outcome,) = tracker.on_candles("BTCUSDT", candles)
+    assert outcome["outcome"] == "tp1"
+    assert outcome["resolved_at"] == "2024-01-01T10:45:00+00:00"
+    assert outcome["resolved_at"] > outcome["created_at"]
+    assert outcome["time_to_outcome_sec"] == 40 * 60
+
+    history.save_outcomes([outcome])
+    (row,) = history.fetch_signals(limit=1)
+    assert row["outcome"] == "tp1" and row["resolved_at"] == outcome["resolved_at"]
+    history.close()
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import pytest
+
+from app.execution.paper import PaperExecutionEngine
+from app.models import Signal
+
+
+def _signal(direction: str, entry: float, stop: float, tps: tuple[float, float, float], symbol: str = "BTCUSDT") -> Signal:
+    return Signal(symbol, direction, entry, stop, *tps, 2.0, 90.0, "test")
+
+
+@pytest.fixture
+def engine(tmp_path) -> PaperExecutionEngine:
+    return PaperExecutionEngine(state_path=str(tmp_path / "paper.json"), initial_equity=1000.0)
+
+
+def test_triggers_fire_in_level_order_and_only_when_crossed(engine: PaperExecutionEngine) -> None:
+    a = engine.open_from_signal(_signal("LONG", 100.0, 95.0, (110.0, 120.0, 130.0)))
+    b = engine.open_from_signal(_signal("LONG", 100.0, 98.0, (105.0, 120.0, 130.0)))
+    c = engine.open_from_signal(_signal("SHORT", 100.0, 103.0, (90.0, 80.0, 70.0)))
+    engine.open_from_signal(_signal("LONG", 100.0, 50.0, (200.0, 300.0, 400.0), symbol="ETHUSDT"))
+
+    assert engine.on_price("BTCUSDT", 99.0) == []
+    fills = engine.on_price("BTCUSDT", 94.0)
+    assert [(f["position_id"], f["kind"]) for f in fills] == [(b.position_id, "sl"), (a.position_id, "sl")]
+    assert set(engine.positions) == {c.position_id, 4}
+
+    fills = engine.on_price("BTCUSDT", 85.0)
+    assert [(f["position_id"], f["kind"]) for f in fills] == [(c.position_id, "tp1")]
+    assert engine.on_price("ETHUSDT", 60.0) == []
+
+
+def test_tp1_scales_out_a_third_then_stop_closes_the_rest(engine: PaperExecutionEngine) -> None:
+    position = engine.open_from_signal(_signal("LONG", 100.0, 95.0, (110.0, 120.0, 130.0)), size=3.0)
+
+    (tp1,) = engine.on_price("BTCUSDT", 111.0)
+    assert tp1["kind"] == "tp1" and tp1["price"] == 110.0 and tp1["qty"] == pytest.approx(1.0)
+    assert tp1["pnl"] == pytest.approx(10.0)
+    assert position.remaining == pytest.approx(2.0) and position.status == "open"
+    assert engine.on_price("BTCUSDT", 111.0) == []  # TP1 is not filled twice
+
+    (stop,) = engine.on_price("BTCUSDT", 95.0)
+    assert stop["kind"] == "sl" and stop["qty"] == pytest.approx(2.0) and stop["pnl"] == pytest.approx(-10.0)
+    assert position.exit_reason == "tp1+sl" and not engine.positions
+    assert engine.equity == pytest.approx(1000.0)
+
+
+def test_all_targets_close_the_position(engine: PaperExecutionEngine) -> None:
+    position = engine.open_from_signal(_signal("SHORT", 100.0, 105.0, (90.0, 80.0, 70.0)), size=3.0)
+    fills = engine.on_price("BTCUSDT", 65.0)
+    assert [f["kind"] for f in fills] == ["tp1", "tp2", "tp3"]
+    assert sum(f["qty"] for f in fills) == pytest.approx(3.0)
+    assert position.exit_reason == "tp3" and position.realized_pnl == pytest.approx(60.0)
+
+
+def test_state_reloads_with_working_triggers(engine: PaperExecutionEngine, tmp_path) -> None:
+    kept = engine.open_from_signal(_signal("LONG", 100.0, 95.0, (110.0, 120.0, 130.0)), size=3.0)
+    closed = engine.open_from_signal(_signal("SHORT", 100.0, 101.0, (90.0, 80.0, 70.0)))
+    engine.on_price("BTCUSDT", 102.0)  # stops the short
+    engine.on_price("BTCUSDT", 110.0)  # TP1 of the long
+
+    reloaded = PaperExecutionEngine(state_path=str(tmp_path / "paper.json"))
+    assert reloaded.equity == pytest.approx(engine.equity)
+    assert [p.position_id for p in reloaded.closed] == [closed.position_id]
+    (restored,) = reloaded.open_positions()
+    assert restored.position_id == kept.position_id and restored.tp_hits == 1 and restored.remaining == pytest.approx(2.0)
+
+    assert reloaded.on_price("BTCUSDT", 110.0) == []  # TP1 stays filled
+    (tp2,) = reloaded.on_price("BTCUSDT", 120.0)
+    assert tp2["kind"] == "tp2" and tp2["position_id"] == kept.position_id
+    assert reloaded.open_from_signal(_signal("LONG", 1.0, 0.5, (2.0, 3.0, 4.0))).position_id == closed.position_id + 1
+
+
+def test_zero_risk_signal_is_not_opened(engine: PaperExecutionEngine) -> None:
+    flat = _signal("LONG", 100.0, 100.0, (110.0, 120.0, 130.0))
+    assert engine.risk_size(flat) == 0.0
+    with pytest.raises(ValueError):
+        engine.open_from_signal(flat, size=engine.risk_size(flat))
+    assert not engine.positions
+    assert engine.risk_size(_signal("LONG", 100.0, 95.0, (110.0, 120.0, 130.0)), risk_pct=1.0) == pytest.approx(2.0)
+
+
+def test_stop_fill_from_a_stale_book_is_not_better_than_the_stop(tmp_path) -> None:
+    from app.execution.fill_simulator import FillSimulator
+
+    simulator = FillSimulator(latency_ms=0.0, latency_jitter_ms=0.0, volatility_bps_per_sec=0.0)
+    engine = PaperExecutionEngine(state_path=str(tmp_path / "paper.json"), initial_equity=1000.0, fill_simulator=simulator)
+    long = engine.open_from_signal(_signal("LONG", 100.0, 95.0, (110.0, 120.0, 130.0)), size=2.0)
+    short = engine.open_from_signal(_signal("SHORT", 100.0, 105.0, (90.0, 80.0, 70.0), symbol="ETHUSDT"), size=2.0)
+    stale = {"bids": [[99.0, 10.0]], "asks": [[101.0, 10.0]]}
+
+    (fill,) = engine.on_price("BTCUSDT", 94.0, orderbook=stale)
+    assert fill["price"] == 95.0 and fill["pnl"] == pytest.approx(-10.0)
+    (fill,) = engine.on_price("ETHUSDT", 106.0, orderbook=stale)
+    assert fill["price"] == 105.0 and fill["pnl"] == pytest.approx(-10.0)
+    assert long.exit_reason == short.exit_reason == "sl"
+
+    deep = {"bids": [[94.0, 1.0], [93.0, 10.0]], "asks": [[94.5, 1.0]]}
+    thin = engine.open_from_signal(_signal("LONG", 100.0, 95.0, (110.0, 120.0, 130.0)), size=2.0)
+    (fill,) = engine.on_price("BTCUSDT", 94.5, orderbook=deep)  # a real book below the stop still slips
+    assert fill["price"] == pytest.approx(93.5) and thin.status == "closed"
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import pytest
+
+from app.backtest.portfolio import PortfolioBacktester
+from tests.test_backtester import LONG_LEVELS, _bars, _signals
+
+FLAT = [(100.0, 100.0, 100.0, 100.0)] * 6
+
+
+def _portfolio(**kwargs) -> PortfolioBacktester:
+    options = {"initial_equity": 1000.0, "warmup": 0, "fee_bps": 0.0, "slippage_bps": 0.0, "risk_per_trade_pct": 1.0}
+    return PortfolioBacktester(**{**options, **kwargs})
+
+
+def test_max_open_positions_rejects_the_weakest_entries() -> None:
+    frames = {symbol: _bars(FLAT) for symbol in ("AAA", "BBB", "CCC")}
+    signals = {
+        "AAA": _signals(6, {1: LONG_LEVELS}, confidence={1: 70.0}),
+        "BBB": _signals(6, {1: LONG_LEVELS}, confidence={1: 95.0}),
+        "CCC": _signals(6, {1: LONG_LEVELS}, confidence={1: 85.0}),
+    }
+    result = _portfolio(max_open_positions=2, max_portfolio_risk_pct=100.0).simulate_portfolio(frames, signals)
+    assert sorted(trade.symbol for trade in result["ledger"]) == ["BBB", "CCC"]
+    assert result["skipped"] == {"max_open_positions": 1}
+    assert result["max_concurrent"] == 2
+
+
+def test_portfolio_risk_cap_rejects_entries_until_risk_is_released() -> None:
+    frames = {
+        "AAA": _bars(FLAT[:2] + [(100.0, 100.0, 94.0, 95.0)] + FLAT[:3]),  # AAA is stopped out on bar 2
+        "BBB": _bars(FLAT),
+        "CCC": _bars(FLAT),
+    }
+    signals = {
+        "AAA": _signals(6, {1: LONG_LEVELS}),
+        "BBB": _signals(6, {1: LONG_LEVELS}),
+        "CCC": _signals(6, {1: LONG_LEVELS, 4: LONG_LEVELS}),
+    }
+    result = _portfolio(max_open_positions=10, max_portfolio_risk_pct=2.5).simulate_portfolio(frames, signals)
+    opened = sorted((trade.opened_at, trade.symbol) for trade in result["ledger"])
+    times = frames["CCC"]["timestamp"]
+    assert opened == [(times.iloc[1], "AAA"), (times.iloc[1], "BBB"), (times.iloc[4], "CCC")]
+    assert result["skipped"] == {"max_portfolio_risk_pct": 1}
+    aaa = next(trade for trade in result["ledger"] if trade.symbol == "AAA")
+    assert aaa.exit_reason == "sl" and aaa.pnl == pytest.approx(-10.0)
+
+
+def test_max_positions_per_symbol() -> None:
+    frames = {"AAA": _bars(FLAT)}
+    signals = {"AAA": _signals(6, {1: LONG_LEVELS, 2: LONG_LEVELS})}
+    result = _portfolio(max_open_positions=5, max_portfolio_risk_pct=100.0).simulate_portfolio(frames, signals)
+    assert len(result["ledger"]) == 1 and result["skipped"] == {"max_positions_per_symbol": 1}
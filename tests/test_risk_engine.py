@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.execution.paper import PaperExecutionEngine
+from app.models import Signal
+from app.risk.risk_engine import RiskEngine, RiskParams
+
+
+def _inputs(n: int, seed: int) -> tuple[np.ndarray, ...]:
+    rng = np.random.default_rng(seed)
+    entry = rng.uniform(0.01, 70_000, n)
+    atr = entry * rng.uniform(0.0, 0.02, n)
+    direction = rng.choice(["LONG", "SHORT", "long", "Short"], n)
+    sign = np.where(np.char.upper(direction) == "LONG", -1.0, 1.0)
+    # Liquidity pools on both sides of the ATR stop, so both branches of min/max are taken.
+    liquidity = entry + sign * entry * rng.uniform(0.0, 0.03, n)
+    return direction, entry, atr, liquidity
+
+
+@pytest.mark.parametrize("params", [RiskParams(), RiskParams(atr_mult=1.5, min_stop_pct=0.0, tp1_r=1.0, tp2_r=2.5, tp3_r=5.0)])
+def test_batch_levels_match_scalar_path(params: RiskParams) -> None:
+    engine = RiskEngine(params)
+    direction, entry, atr, liquidity = _inputs(2000, seed=1)
+    batch = engine.build_levels_batch(direction, entry, atr, liquidity)
+    assert len(batch) == len(entry)
+    for i in range(len(entry)):
+        assert batch.plan(i) == engine.build_levels(str(direction[i]), float(entry[i]), float(atr[i]), float(liquidity[i])), i
+
+
+def test_stop_on_entry_is_degenerate_in_both_paths() -> None:
+    engine = RiskEngine(RiskParams(min_stop_pct=0.0))
+    direction = np.array(["LONG", "SHORT"])
+    entry = np.array([100.0, 100.0])
+    batch = engine.build_levels_batch(direction, entry, np.zeros(2), entry, equity=1000.0, risk_pct=1.0)
+    for i in range(2):
+        scalar = engine.build_levels(str(direction[i]), 100.0, 0.0, 100.0)
+        assert scalar.stop_loss == 100.0 and scalar.rr == 0.0
+        assert batch.plan(i) == scalar
+    np.testing.assert_array_equal(batch.size, [0.0, 0.0])
+
+
+def test_batch_size_matches_scalar_sizing(tmp_path) -> None:
+    engine = RiskEngine()
+    direction, entry, atr, liquidity = _inputs(500, seed=2)
+    equity = np.random.default_rng(3).uniform(10.0, 1e6, len(entry))
+    batch = engine.build_levels_batch(direction, entry, atr, liquidity, equity=equity, risk_pct=0.75)
+    paper = PaperExecutionEngine(state_path=str(tmp_path / "paper.json"))
+    for i in range(len(entry)):
+        paper.equity = float(equity[i])
+        plan = batch.plan(i)
+        signal = Signal("X", str(direction[i]).upper(), float(entry[i]), plan.stop_loss, plan.tp1, plan.tp2, plan.tp3, plan.rr, 90.0, "")
+        assert batch.size[i] == paper.risk_size(signal, risk_pct=0.75), i
+
+    single = engine.build_levels_batch(direction, entry, atr, liquidity, equity=1000.0, risk_pct=0.75)
+    np.testing.assert_array_equal(single.size, 1000.0 * 0.75 / 100 / np.abs(entry - single.stop_loss))
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from app.config import settings
+from app.core.scanner import ScannerService
+
+
+class _Notifier:
+    def __init__(self) -> None:
+        self.events: list[str] = []
+
+    async def send_event(self, message: str) -> None:
+        self.events.append(message)
+
+    async def send_signal(self, signal) -> None:
+        pass
+
+
+class _Market:
+    series = None
+
+    async def fetch_candles_async(self, symbol: str, interval: str, limit: int) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "timestamp": pd.date_range("2024-01-01", periods=5, freq="15min", tz="UTC"),
+                "open": 1.0,
+                "high": 1.0,
+                "low": 1.0,
+                "close": 1.0,
+                "volume": 1.0,
+            }
+        )
+
+    async def fetch_orderbook_async(self, symbol: str) -> dict:
+        return {}
+
+
+def test_timed_out_queued_analysis_does_not_block_the_symbol(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "scan_symbol_timeout_sec", 0.1)
+    notifier = _Notifier()
+    scanner = ScannerService(notifier, history=None, market=_Market())
+    analysed: list[str] = []
+
+    def analyze(symbol: str, timeframe: str, candles: pd.DataFrame):
+        analysed.append(symbol)
+        raise RuntimeError("analysed")
+
+    scanner._analyze = analyze
+
+    async def scenario() -> None:
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=1))
+        release = threading.Event()
+        busy = loop.run_in_executor(None, release.wait)  # the only worker is taken
+        semaphore = asyncio.Semaphore(1)
+
+        await scanner._scan_guarded("BTCUSDT", semaphore)  # analysis queued behind ``busy``, then timed out
+        assert notifier.events == ["Scanner timeout: BTCUSDT took longer than 0.1s"]
+        release.set()
+        await busy
+        assert analysed == []
+
+        await scanner._scan_guarded("BTCUSDT", semaphore)
+        assert analysed == ["BTCUSDT"]
+        assert notifier.events[-1] == "Scanner error (BTCUSDT): analysed"
+
+    asyncio.run(scenario())
+
+
+def test_symbol_is_skipped_while_its_analysis_still_runs(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "scan_symbol_timeout_sec", 0.1)
+    scanner = ScannerService(_Notifier(), history=None, market=_Market())
+    release = threading.Event()
+    analysed: list[str] = []
+
+    def analyze(symbol: str, timeframe: str, candles: pd.DataFrame):
+        analysed.append(symbol)
+        release.wait()
+        raise RuntimeError("analysed")
+
+    scanner._analyze = analyze
+
+    async def scenario() -> None:
+        semaphore = asyncio.Semaphore(1)
+        await scanner._scan_guarded("BTCUSDT", semaphore)  # times out while the worker runs
+        await scanner._scan_guarded("BTCUSDT", semaphore)  # skipped: lock still held
+        assert analysed == ["BTCUSDT"]
+        release.set()
+        await asyncio.sleep(0.05)
+        await scanner._scan_guarded("BTCUSDT", semaphore)
+        assert analysed == ["BTCUSDT", "BTCUSDT"]
+
+    asyncio.run(scenario())
+
+
+def test_zero_size_signal_does_not_open_a_paper_position(tmp_path) -> None:
+    from app.execution.paper import PaperExecutionEngine
+    from app.models import Signal
+
+    class _History:
+        def __init__(self) -> None:
+            self.saved: list[Signal] = []
+
+        def save_signal(self, signal: Signal, meta: dict | None = None) -> None:
+            self.saved.append(signal)
+
+    history = _History()
+    paper = PaperExecutionEngine(state_path=str(tmp_path / "paper.json"), initial_equity=1000.0)
+    scanner = ScannerService(_Notifier(), history=history, market=_Market(), paper=paper)
+    columns = ("ema_21", "ema_200", "rsi", "adx", "atr", "macd_hist", "bb_width", "vwap", "fvg_up", "fvg_down")
+    frame = pd.DataFrame(
+        {"timestamp": [pd.Timestamp("2024-01-01 01:00", tz="UTC")], "high": [1.0], "low": [1.0], **{c: [0.0] for c in columns}}
+    )
+    signal = Signal("BTCUSDT", "LONG", 1.0, 1.0, 1.1, 1.2, 1.3, 0.0, 95.0, "flat stop")
+    scanner._analyze = lambda symbol, timeframe, candles: (frame, signal)
+
+    asyncio.run(scanner.scan_symbol("BTCUSDT"))
+    assert history.saved == [signal]
+    assert not paper.positions
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from app.data.series_store import SeriesStore
+
+
+def _frame(start: str, periods: int, offset: float = 0.0) -> pd.DataFrame:
+    ts = pd.date_range(start, periods=periods, freq="1h", tz="UTC")
+    values = np.arange(periods, dtype=float) + offset
+    return pd.DataFrame({"timestamp": ts, "close": values, "volume": values * 10})
+
+
+def test_round_trip_across_month_partitions(tmp_path) -> None:
+    store = SeriesStore(str(tmp_path))
+    frame = _frame("2024-01-31 20:00", 10)  # spills into February
+    assert store.append("BTCUSDT", "60", frame) == 10
+    assert sorted(p.name for p in (tmp_path / "candles" / "BTCUSDT" / "60").iterdir()) == ["2024-01", "2024-02"]
+
+    pd.testing.assert_frame_equal(store.read("BTCUSDT", "60"), frame.assign(timestamp=frame["timestamp"].dt.as_unit("ns")))
+    window = store.read("BTCUSDT", "60", start="2024-01-31 23:00", end="2024-02-01 01:00")
+    assert window["close"].tolist() == [3.0, 4.0, 5.0]
+    arrays = store.read_arrays("BTCUSDT", "60", columns=["close", "missing"])
+    assert arrays["timestamp"].dtype == np.int64
+    assert np.isnan(arrays["missing"]).all()
+    assert store.last_timestamp("BTCUSDT", "60") == frame["timestamp"].iloc[-1]
+    assert store.read("ETHUSDT", "60").empty
+
+
+def test_overlapping_append_rewrites_only_the_tail(tmp_path) -> None:
+    store = SeriesStore(str(tmp_path))
+    store.append("BTCUSDT", "60", _frame("2024-03-01", 10))
+    # Rows 6..12: 6-9 overlap and win, 10-12 are new; a new column is NaN-filled for older rows.
+    update = _frame("2024-03-01 06:00", 7, offset=100.0).assign(oi=1.0)
+    store.append("BTCUSDT", "60", update)
+
+    got = store.read("BTCUSDT", "60")
+    assert len(got) == 13
+    assert got["timestamp"].is_monotonic_increasing and got["timestamp"].is_unique
+    assert got["close"].tolist() == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0] + [100.0 + i for i in range(7)]
+    assert np.isnan(got["oi"].iloc[:6]).all() and (got["oi"].iloc[6:] == 1.0).all()
+
+    # A sparse update in the middle keeps the stored rows between its timestamps.
+    sparse = _frame("2024-03-01 02:00", 1, offset=-1.0)
+    store.append("BTCUSDT", "60", pd.concat([sparse, _frame("2024-03-01 04:00", 1, offset=-2.0)]))
+    got = store.read("BTCUSDT", "60")
+    assert len(got) == 13
+    assert got["close"].tolist()[:6] == [0.0, 1.0, -1.0, 3.0, -2.0, 5.0]
+    assert got["close"].iloc[-1] == 106.0
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.indicators.engine import IndicatorEngine
+from app.strategy.signal_engine import SignalEngine, SignalParams, reasons_text
+from tests.test_streaming_parity import _candles
+
+
+@pytest.mark.parametrize(("seed", "threshold"), [(0, 40), (1, 40), (2, 70), (3, 70)])
+def test_evaluate_all_is_bit_identical_to_per_bar_evaluate(seed: int, threshold: float) -> None:
+    frame = IndicatorEngine().calculate(_candles(1200, seed=seed, base=100.0, step=0.4), features="signal")
+    engine = SignalEngine(SignalParams(confidence_threshold=threshold))
+    batch = engine.evaluate_all(frame)
+    assert len(batch) == len(frame)
+
+    signals = 0
+    for i in range(len(frame)):
+        if i < 4:
+            assert not batch["signal"].iloc[i]  # detect_structure needs five bars
+            continue
+        signal = engine.evaluate("TEST", frame.iloc[: i + 1])
+        row = batch.iloc[i]
+        assert bool(row["signal"]) == (signal is not None), i
+        if signal is None:
+            assert np.isnan(row["entry"]) and np.isnan(row["stop_loss"])
+            continue
+        signals += 1
+        assert row["direction"] == signal.direction
+        assert row["confidence"] == signal.confidence
+        assert reasons_text(row["reasons"]) == signal.why
+        for col in ("entry", "stop_loss", "tp1", "tp2", "tp3", "rr"):
+            assert row[col] == getattr(signal, col), (i, col)
+    assert signals > 0
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.indicators.engine import IndicatorEngine
+from app.indicators.streaming import BASE_COLUMNS, StreamingIndicators
+
+BARS = 600
+
+
+def _candles(n: int, seed: int, base: float, step: float) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = np.maximum(np.cumsum(rng.normal(0, step, n)) + base, step)
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    high = np.maximum(open_, close) + rng.uniform(0, step, n)
+    low = np.minimum(open_, close) - rng.uniform(0, step, n)
+    return pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2024-01-01", periods=n, freq="15min", tz="UTC"),
+            "open": open_,
+            "high": high,
+            "low": low,
+            "close": close,
+            "volume": rng.uniform(100, 2500, n),
+        }
+    )
+
+
+def _stream(candles: pd.DataFrame) -> tuple[StreamingIndicators, list[dict]]:
+    state = StreamingIndicators(keep=len(candles))
+    rows = []
+    for ts, o, h, l, c, v in candles.loc[:, list(BASE_COLUMNS)].itertuples(index=False, name=None):
+        rows.append(state.update(ts, float(o), float(h), float(l), float(c), float(v)))
+    return state, rows
+
+
+@pytest.mark.parametrize(
+    ("base", "step"),
+    [(1.0, 0.004), (100.0, 0.4), (65000.0, 35.0)],
+    ids=["scale-1", "scale-100", "scale-65000"],
+)
+def test_streaming_matches_batch_bar_by_bar(base: float, step: float) -> None:
+    candles = _candles(BARS, seed=int(base), base=base, step=step)
+    expected = IndicatorEngine().calculate(candles)
+    state, _ = _stream(candles)
+    got = state.frame()
+
+    assert len(got) == len(expected)
+    assert (got["timestamp"].to_numpy() == expected["timestamp"].to_numpy()).all()
+    shared = [col for col in expected.columns if col != "timestamp" and col in got.columns]
+    assert set(shared) == set(expected.columns) - {"timestamp"}
+    for col in shared:
+        want = expected[col].to_numpy(dtype=float)
+        np.testing.assert_allclose(
+            got[col].to_numpy(dtype=float),
+            want,
+            rtol=1e-8,
+            atol=1e-8 * max(np.abs(want).max(), 1.0),
+            err_msg=col,
+        )
+
+
+@pytest.mark.parametrize("base", [1.0, 65000.0])
+def test_streaming_warmup_boundary(base: float) -> None:
+    candles = _candles(BARS, seed=7, base=base, step=base * 0.0005)
+    expected = IndicatorEngine().calculate(candles)
+    state, rows = _stream(candles)
+
+    first = int(np.flatnonzero(candles["timestamp"] == expected["timestamp"].iloc[0])[0])
+    assert first > 0
+    # The bar before the first complete batch row still has an indicator in warmup...
+    assert any(isinstance(v, float) and math.isnan(v) for v in rows[first - 1].values())
+    # ...and from that row on every streamed bar is complete and kept.
+    for row in rows[first:]:
+        assert not any(isinstance(v, float) and math.isnan(v) for v in row.values())
+    assert state.frame()["timestamp"].iloc[0] == expected["timestamp"].iloc[0]
+    for col in ("ema_200", "rsi", "atr", "macd", "bb_width", "vwap"):
+        assert rows[first][col] == pytest.approx(expected[col].iloc[0], rel=1e-8, abs=1e-12)
+
+
+def test_streaming_short_history_stays_in_warmup() -> None:
+    candles = _candles(150, seed=3, base=100.0, step=0.4)
+    state, _ = _stream(candles)
+    assert IndicatorEngine().calculate(candles).empty
+    assert state.frame().empty
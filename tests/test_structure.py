@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app.indicators.structure import count_levels, equal_levels, fair_value_gaps, rolling_extreme
+
+
+def _prices(n: int = 500, seed: int = 0, base: float = 100.0, step: float = 0.03) -> pd.Series:
+    # Steps of a few cents so rounded windows regularly repeat levels and both outcomes occur.
+    rng = np.random.default_rng(seed)
+    return pd.Series(np.round(base + np.cumsum(rng.normal(0, step, n)), 6))
+
+
+def _legacy_equal(series: pd.Series) -> np.ndarray:
+    return series.round(2).rolling(10).apply(lambda s: len(set(s)) < 8, raw=False).fillna(0).to_numpy()
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_equal_levels_matches_legacy_rolling_apply(seed: int) -> None:
+    prices = _prices(seed=seed)
+    expected = _legacy_equal(prices)
+    assert 0 < expected.sum() < len(expected) - 9
+    np.testing.assert_array_equal(equal_levels(prices.to_numpy(), tolerance_bps=0, tick_size=0), expected)
+
+
+def test_equal_levels_handles_symbols_by_bars() -> None:
+    rows = np.stack([_prices(seed=seed).to_numpy() for seed in range(3)])
+    expected = np.stack([_legacy_equal(pd.Series(row)) for row in rows])
+    np.testing.assert_array_equal(equal_levels(rows, tolerance_bps=0, tick_size=0), expected)
+
+
+def test_equal_levels_short_input() -> None:
+    assert not equal_levels(np.arange(9.0), tolerance_bps=0, tick_size=0).any()
+
+
+def test_tick_mode_snaps_to_tick() -> None:
+    prices = _prices(seed=4, base=0.5, step=0.003)
+    tick = 0.001
+    snapped = pd.Series(np.rint(prices.to_numpy() / tick) * tick)
+    expected = snapped.rolling(10).apply(lambda s: len(set(s)) < 8, raw=True).fillna(0).to_numpy()
+    np.testing.assert_array_equal(equal_levels(prices.to_numpy(), tick_size=tick), expected)
+    # round(2) would merge every level of a sub-dollar symbol.
+    assert not np.array_equal(_legacy_equal(prices), expected)
+
+
+def test_bps_mode_merges_levels_within_tolerance() -> None:
+    window = np.array([100.0, 100.004, 100.008, 100.5, 101.0, 101.5, 102.0, 102.5, 103.0, 103.5])
+    # 0.4 bps apart: one level at 1 bps, three at 0.1 bps.
+    assert count_levels(list(window), tolerance_bps=1.0, tick_size=0) == 8
+    assert count_levels(list(window), tolerance_bps=0.1, tick_size=0) == 10
+    assert equal_levels(window, tolerance_bps=1.0, tick_size=0)[-1] == 0.0
+    assert equal_levels(window, tolerance_bps=5.0, tick_size=0)[-1] == 0.0
+    merged = np.concatenate([window[:3], window[:3] + 0.002, window[6:]])
+    assert count_levels(list(merged), tolerance_bps=1.0, tick_size=0) < 8
+    assert equal_levels(merged, tolerance_bps=1.0, tick_size=0)[-1] == 1.0
+
+
+@pytest.mark.parametrize(
+    ("bps", "tick"),
+    [(0.0, 0.0), (2.0, 0.0), (10.0, 0.0), (0.0, 0.01), (0.0, 0.05)],
+    ids=["round2", "bps-2", "bps-10", "tick-0.01", "tick-0.05"],
+)
+def test_count_levels_agrees_with_equal_levels(bps: float, tick: float) -> None:
+    prices = _prices(seed=5).to_numpy()
+    expected = np.zeros(len(prices))
+    for end, window in enumerate(sliding_window_view(prices, 10), start=9):
+        expected[end] = count_levels(list(window), tolerance_bps=bps, tick_size=tick) < 8
+    np.testing.assert_array_equal(equal_levels(prices, tolerance_bps=bps, tick_size=tick), expected)
+
+
+def test_fair_value_gaps_match_shift_masks() -> None:
+    rng = np.random.default_rng(6)
+    mid = 100 + np.cumsum(rng.normal(0, 1.0, 400))
+    high = pd.Series(mid + rng.uniform(0, 0.8, 400))
+    low = pd.Series(mid - rng.uniform(0, 0.8, 400))
+    up, down = fair_value_gaps(high.to_numpy(), low.to_numpy())
+    expected_up = (low.shift(1) > high.shift(2)).astype(int).to_numpy()
+    expected_down = (high.shift(1) < low.shift(2)).astype(int).to_numpy()
+    assert expected_up.any() and expected_down.any()
+    np.testing.assert_array_equal(up, expected_up)
+    np.testing.assert_array_equal(down, expected_down)
+
+
+def test_rolling_extreme_matches_pandas_rolling() -> None:
+    values = _prices(n=450, seed=7, step=0.3)
+    np.testing.assert_array_equal(rolling_extreme(values.to_numpy(), 100, is_max=True), values.rolling(100).max().to_numpy())
+    np.testing.assert_array_equal(rolling_extreme(values.to_numpy(), 100, is_max=False), values.rolling(100).min().to_numpy())
+    assert np.isnan(rolling_extreme(values.to_numpy()[:99], 100)).all()
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.storage.write_queue import SHUTDOWN_ATTEMPTS, HistoryWriter
+
+
+class _FlakyHistory:
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+        self.calls = 0
+        self.saved: list = []
+
+    def save_signals(self, items: list) -> None:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise OSError("database is locked")
+        self.saved.extend(items)
+
+
+def _writer(history: _FlakyHistory) -> HistoryWriter:
+    return HistoryWriter(history, batch_size=10, flush_interval=0.01, retry_backoff=0.001, retry_backoff_max=0.004)
+
+
+def test_failed_batch_is_retried_not_dropped() -> None:
+    async def scenario() -> None:
+        history = _FlakyHistory(failures=4)
+        writer = _writer(history)
+        writer.start()
+        for i in range(5):
+            await writer.submit(f"signal-{i}")
+        await asyncio.wait_for(writer.flush(), timeout=2)
+        assert [item[0] for item in history.saved] == [f"signal-{i}" for i in range(5)]
+        stats = writer.stats()
+        assert stats["written"] == 5 and stats["failures"] == 4 and stats["dropped"] == 0
+        await writer.stop()
+
+    asyncio.run(scenario())
+
+
+def test_stop_gives_up_on_a_broken_store() -> None:
+    async def scenario() -> None:
+        history = _FlakyHistory(failures=10**6)
+        writer = _writer(history)
+        writer.start()
+        await writer.submit("signal")
+        await asyncio.sleep(0.05)
+        await asyncio.wait_for(writer.stop(), timeout=2)
+        assert history.saved == [] and writer.dropped == 1 and writer.failures >= SHUTDOWN_ATTEMPTS
+
+    asyncio.run(scenario())